@@ -1,14 +1,70 @@
 
+import os
 import streamlit as st
+from application_pages.instrumentation import process_memory, shared_metrics, start_metrics_server
 st.set_page_config(page_title="QuLab: Risk-Adjusted Return (RARORAC) Calculator", layout="wide")
+shared_metrics.begin_rerun()
 
-# Initialize session state variables
-if 'saved_scenarios' not in st.session_state:
-    st.session_state.saved_scenarios = {}
-if 'current_rarorac_params' not in st.session_state:
-    st.session_state.current_rarorac_params = {}
-if 'current_rarorac_results' not in st.session_state:
-    st.session_state.current_rarorac_results = {}
+# Heavy modules (pandas, numpy, altair) are imported by the code that needs them, not here,
+# so the title and sidebar reach the browser before they load. Python keeps every imported
+# module in sys.modules, so the page modules are only loaded once per process, not per rerun.
+
+@st.cache_resource
+def open_scenario_repository(path):
+    """Opens the on-disk scenario repository once per process."""
+    from application_pages.scenario_repository import ScenarioRepository
+    return ScenarioRepository(path)
+
+@st.cache_resource
+def open_metrics_endpoint(port):
+    """Starts the Prometheus-style /metrics endpoint once per process."""
+    return start_metrics_server(shared_metrics, port=port)
+
+def display_performance_panel(rerun):
+    """Sidebar panel with the timings and memory of the rerun that just finished."""
+    with st.sidebar.expander("Performance", expanded=True):
+        st.caption(f"This rerun: {rerun.seconds * 1000:,.1f} ms")
+        rows = [{"Operation": name, "Calls": calls, "Total (ms)": round(total * 1000, 2)} for name, calls, total in rerun.totals()]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        for name, value in rerun.counters.items():
+            st.caption(f"{name}: {value:,}")
+        caches = shared_metrics.cache_stats()
+        if caches:
+            # Shared by every session, so these count since the server started
+            st.dataframe([{"Cache": name, "Entries": stats["Entries"], "Hits": stats["Hits"], "Misses": stats["Misses"],
+                           "Evictions": stats["Evictions"], "Hit Rate": f"{stats['Hit_Rate']:.0%}"}
+                          for name, stats in caches.items()], hide_index=True)
+        memory = process_memory()
+        if memory["resident"] is not None:
+            st.caption(f"Process memory: {memory['resident'] / 2**20:,.0f} MiB (peak {memory['peak_resident'] / 2**20:,.0f} MiB)")
+        if 'saved_scenarios' in st.session_state:
+            st.caption(f"Saved scenarios: {st.session_state.saved_scenarios.nbytes() / 2**20:,.2f} MiB")
+
+def display_jobs_panel(jobs):
+    """Sidebar list of this session's background jobs, with Cancel for running ones."""
+    active = jobs.active()
+    with st.sidebar.expander(f"Background Jobs ({len(active)} running)", expanded=bool(active)):
+        for job in reversed(jobs.jobs()):
+            if job.finished:
+                st.caption(f"{job.name}: {job.status} after {job.seconds:,.1f} s")
+                continue
+            st.progress(job.progress, text=f"{job.name}: {job.message or job.status}")
+            if st.button("Cancel", key=f"cancel_background_job_{job.id}", disabled=job.cancel_requested):
+                job.cancel()
+                st.rerun()
+        if len(active) < len(jobs) and st.button("Clear Finished Jobs"):
+            jobs.clear_finished()
+            st.rerun()
+
+# Set RARORAC_SCENARIO_DB to a SQLite file path to keep saved scenarios between sessions
+scenario_db = os.environ.get("RARORAC_SCENARIO_DB")
+# Set RARORAC_METRICS_PORT to serve timings in Prometheus text format at /metrics,
+# or RARORAC_METRICS_FILE to rewrite them to a file after every rerun
+metrics_port = os.environ.get("RARORAC_METRICS_PORT")
+metrics_file = os.environ.get("RARORAC_METRICS_FILE")
+if metrics_port:
+    open_metrics_endpoint(int(metrics_port))
 
 st.sidebar.image("https://www.quantuniversity.com/assets/img/logo5.jpg")
 st.sidebar.divider()
@@ -17,6 +73,18 @@ st.divider()
 
 page = st.sidebar.selectbox(label="Navigation", options=["RARORAC Calculator & Scenarios", "Portfolio Quality Visualization"])
 
+# Initialize session state variables
+if 'saved_scenarios' not in st.session_state:
+    from application_pages.scenario_store import ScenarioStore
+    st.session_state.saved_scenarios = ScenarioStore(open_scenario_repository(scenario_db) if scenario_db else None)
+if 'current_rarorac_params' not in st.session_state:
+    st.session_state.current_rarorac_params = {}
+if 'current_rarorac_results' not in st.session_state:
+    st.session_state.current_rarorac_results = {}
+if 'background_jobs' not in st.session_state:
+    from application_pages.background_jobs import JobRegistry
+    st.session_state.background_jobs = JobRegistry()
+
 if page == "RARORAC Calculator & Scenarios":
     from application_pages.page1 import run_page1
     run_page1()
@@ -34,6 +102,16 @@ st.markdown(r"""
 """)
 
 
+show_performance = st.sidebar.checkbox("Show Performance Panel", value=False, key="show_performance_panel",
+                                       help="Timings and memory use of each rerun, for diagnosing slow pages.")
+rerun = shared_metrics.end_rerun()
+if metrics_file:
+    shared_metrics.write_prometheus_file(metrics_file)
+if show_performance:
+    display_performance_panel(rerun)
+if len(st.session_state.background_jobs):
+    display_jobs_panel(st.session_state.background_jobs)
+
 # License
 st.caption('''
 ---
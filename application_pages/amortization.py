@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, check_deal_columns, deal_outcome_labels
+
+AMORTIZATION_TYPES = ['bullet', 'linear', 'annuity']
+DEFAULT_PERIODS_PER_YEAR = 12
+# Working memory for the deals x periods balance matrix; a 1M-deal, 360-month book is scored in chunks
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Float64 matrices of one chunk alive at the same time while scoring
+_LIVE_MATRICES = 3
+
+LIFETIME_RESULT_COLUMNS = [
+    'Lifetime_Income',
+    'Lifetime_Operating_Costs',
+    'Lifetime_Expected_Loss',
+    'Lifetime_Net_Risk_Adjusted_Reward',
+    'Capital_Years',
+    'Lifetime_RARORAC',
+    'Discounted_RARORAC',
+    'Meets_Hurdle',
+]
+
+
+def amortization_codes(amortization, size):
+    """Index into AMORTIZATION_TYPES for each deal, from one type name, an array of names or an array of codes."""
+    if isinstance(amortization, str):
+        if amortization not in AMORTIZATION_TYPES:
+            raise ValueError(f"Unknown amortization type '{amortization}'; expected one of {', '.join(AMORTIZATION_TYPES)}.")
+        return np.full(size, AMORTIZATION_TYPES.index(amortization), dtype=np.int8)
+    values = np.asarray(amortization)
+    if values.dtype.kind in 'iu':
+        if len(values) and (values.min() < 0 or values.max() >= len(AMORTIZATION_TYPES)):
+            raise ValueError("Amortization codes must index AMORTIZATION_TYPES.")
+        return values.astype(np.int8, copy=False)
+    names, inverse = np.unique(values.astype(str), return_inverse=True)
+    unknown = [name for name in names if name not in AMORTIZATION_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown amortization type(s): {', '.join(unknown)}.")
+    return np.array([AMORTIZATION_TYPES.index(name) for name in names], dtype=np.int8)[inverse]
+
+
+def opening_balances(loan_amount, interest_rate, term_periods, amortization='annuity', periods_per_year=DEFAULT_PERIODS_PER_YEAR, num_periods=None):
+    """Outstanding balance at the start of each period, as a deals x periods matrix (zero after maturity).
+
+    - bullet: the full amount is outstanding until it is repaid at maturity
+    - linear: equal principal repayments every period
+    - annuity: equal total payments, so principal repaid grows as interest falls
+    """
+    loan_amount = np.asarray(loan_amount, dtype=np.float64).reshape(-1)
+    term = np.asarray(term_periods, dtype=np.int64).reshape(-1)
+    rate = np.broadcast_to(np.asarray(interest_rate, dtype=np.float64), loan_amount.shape) / periods_per_year
+    term = np.broadcast_to(term, loan_amount.shape)
+    codes = amortization_codes(amortization, len(loan_amount))
+    if num_periods is None:
+        num_periods = int(term.max()) if len(term) else 0
+
+    # Payments already made at the start of each period, 0 for the first
+    paid = np.arange(num_periods, dtype=np.float64)
+    term = term.astype(np.float64)
+    # Zero-rate annuities repay like linear loans
+    kinds = np.where((codes == AMORTIZATION_TYPES.index('annuity')) & (rate == 0), AMORTIZATION_TYPES.index('linear'), codes)
+    balance = None
+    for code, kind in enumerate(AMORTIZATION_TYPES):
+        rows = kinds == code
+        if rows.all():
+            balance = _remaining_share(kind, rate, term, paid)
+            break
+        if rows.any():
+            if balance is None:
+                balance = np.empty((len(loan_amount), num_periods))
+            balance[rows] = _remaining_share(kind, rate[rows], term[rows], paid)
+    if balance is None:
+        balance = np.empty((0, num_periods))
+    if len(term) and term.min() < num_periods:
+        balance *= paid < term[:, np.newaxis]
+    balance *= loan_amount[:, np.newaxis]
+    return balance
+
+
+def _remaining_share(kind, rate, term, paid):
+    """Share of the loan still outstanding after each number of payments, for deals of one amortization type."""
+    if kind == 'bullet':
+        return np.ones((len(term), len(paid)))
+    if kind == 'linear':
+        return 1 - paid[np.newaxis, :] / term[:, np.newaxis]
+    # Annuity: (g^T - g^k) / (g^T - 1) with g = 1 + periodic rate, computed in place on the g^k matrix
+    log_growth = np.log1p(rate)
+    total_growth = np.exp(log_growth * term)[:, np.newaxis]
+    share = np.exp(np.multiply.outer(log_growth, paid))
+    share -= total_growth
+    share *= 1 / (1 - total_growth)
+    return share
+
+
+def period_cash_flows(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor,
+                      term_periods, amortization='annuity', periods_per_year=DEFAULT_PERIODS_PER_YEAR):
+    """Period-by-period schedule for each deal, as deals x periods matrices.
+
+    Interest and expected loss accrue on the opening balance at the annual rate over
+    periods_per_year; fees are received in the first period; capital is held against
+    the opening balance for the period.
+    """
+    balance = opening_balances(loan_amount, interest_rate, term_periods, amortization, periods_per_year)
+    column = lambda values: np.asarray(values, dtype=np.float64).reshape(-1, 1)
+    interest = balance * column(interest_rate) / periods_per_year
+    income = interest.copy()
+    if income.shape[1]:
+        income[:, 0] += column(fees)[:, 0]
+    operating_costs = income * column(operating_cost_ratio)
+    expected_loss = balance * column(expected_loss_rate) / periods_per_year
+    principal = balance - np.concatenate([balance[:, 1:], np.zeros((balance.shape[0], 1))], axis=1)
+    return {
+        'Opening_Balance': balance,
+        'Principal_Repaid': principal,
+        'Interest_Income': interest,
+        'Income_From_Deal': income,
+        'Operating_Costs': operating_costs,
+        'Expected_Loss': expected_loss,
+        'Net_Risk_Adjusted_Reward': income - operating_costs - expected_loss,
+        'Risk_Adjusted_Capital': balance * column(ul_capital_factor),
+    }
+
+
+def _chunk_rows(num_periods, memory_budget):
+    return max(1, memory_budget // max(1, num_periods * 8 * _LIVE_MATRICES))
+
+
+def calculate_lifetime_rarorac_batch(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate,
+                                     term_periods, amortization='annuity', periods_per_year=DEFAULT_PERIODS_PER_YEAR, discount_rate=None,
+                                     memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Lifetime and discounted RARORAC of amortizing deals, vectorized over a deals x periods balance matrix.
+
+    Lifetime_RARORAC is total net risk-adjusted reward over capital-years held
+    (capital x time outstanding), so a one-period annual bullet loan gives the same
+    RARORAC as calculate_rarorac_metrics. Discounted_RARORAC discounts both reward and
+    capital-years at discount_rate per year (default: each deal's hurdle rate).
+
+    Every per-period quantity is linear in the opening balance, so only the balance
+    matrix is built, memory_budget bytes at a time, and each chunk is reduced to its
+    plain and discounted row sums.
+    """
+    loan_amount = np.asarray(loan_amount, dtype=np.float64).reshape(-1)
+    n = len(loan_amount)
+    full = lambda values: np.broadcast_to(np.asarray(values, dtype=np.float64), (n,))
+    interest_rate, fees, operating_cost_ratio = full(interest_rate), full(fees), full(operating_cost_ratio)
+    expected_loss_rate, ul_capital_factor, hurdle_rate = full(expected_loss_rate), full(ul_capital_factor), full(hurdle_rate)
+    discount_rate = hurdle_rate if discount_rate is None else full(discount_rate)
+    term = np.broadcast_to(np.asarray(term_periods, dtype=np.int64), (n,))
+    if n and term.min() < 1:
+        raise ValueError("Every deal needs a term of at least one period.")
+    codes = amortization_codes(amortization, n)
+
+    balance_sum = np.empty(n)
+    discounted_balance_sum = np.empty(n)
+    first_discount = (1 + discount_rate / periods_per_year) ** -1.0
+    num_periods = int(term.max()) if n else 0
+    step = _chunk_rows(num_periods, memory_budget)
+    periods = np.arange(1, num_periods + 1, dtype=np.float64)
+    # With one discount rate for the whole book, a single discount curve is applied to every chunk
+    shared_discount = None
+    if n and np.all(discount_rate == discount_rate[0]):
+        shared_discount = np.exp(-np.log1p(discount_rate[0] / periods_per_year) * periods)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        rows = slice(start, stop)
+        # Every chunk spans all periods, so each deal's sums do not depend on how the book was chunked
+        balance = opening_balances(loan_amount[rows], interest_rate[rows], term[rows], codes[rows],
+                                   periods_per_year, num_periods)
+        balance_sum[rows] = balance.sum(axis=1)
+        # Cash flows arrive at the end of each period
+        if shared_discount is not None:
+            discounted_balance_sum[rows] = balance @ shared_discount
+        else:
+            discount = np.exp(np.multiply.outer(-np.log1p(discount_rate[rows] / periods_per_year), periods))
+            discounted_balance_sum[rows] = np.einsum('ij,ij->i', balance, discount)
+            del discount
+        del balance
+
+    periodic_rate = interest_rate / periods_per_year
+    income = periodic_rate * balance_sum + fees
+    operating_costs = income * operating_cost_ratio
+    expected_loss = expected_loss_rate / periods_per_year * balance_sum
+    reward = income - operating_costs - expected_loss
+    capital_years = ul_capital_factor * balance_sum / periods_per_year
+
+    discounted_income = periodic_rate * discounted_balance_sum + fees * first_discount
+    discounted_reward = discounted_income * (1 - operating_cost_ratio) - expected_loss_rate / periods_per_year * discounted_balance_sum
+    discounted_capital_years = ul_capital_factor * discounted_balance_sum / periods_per_year
+
+    # Same rule as the single-period calculator: zero capital gives an infinite RARORAC
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lifetime_rarorac = np.where(capital_years == 0, np.inf, reward / capital_years)
+        discounted_rarorac = np.where(discounted_capital_years == 0, np.inf, discounted_reward / discounted_capital_years)
+
+    return {
+        'Lifetime_Income': income,
+        'Lifetime_Operating_Costs': operating_costs,
+        'Lifetime_Expected_Loss': expected_loss,
+        'Lifetime_Net_Risk_Adjusted_Reward': reward,
+        'Capital_Years': capital_years,
+        'Lifetime_RARORAC': lifetime_rarorac,
+        'Discounted_RARORAC': discounted_rarorac,
+        'Meets_Hurdle': lifetime_rarorac >= hurdle_rate,
+    }
+
+
+def score_lifetime_frame(deals, amortization='annuity', periods_per_year=DEFAULT_PERIODS_PER_YEAR, discount_rate=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Lifetime results for a DataFrame with the seven calculator inputs plus a term_periods column.
+
+    An 'amortization' column, if present, gives each deal's schedule type and overrides the
+    amortization argument; a 'discount_rate' column likewise overrides discount_rate.
+    """
+    if not isinstance(deals, pd.DataFrame):
+        raise TypeError("Deals must be a pandas DataFrame.")
+    check_deal_columns(deals)
+    if 'term_periods' not in deals.columns:
+        raise ValueError("Deals are missing required columns: term_periods")
+    if 'amortization' in deals.columns:
+        amortization = deals['amortization'].to_numpy()
+    if 'discount_rate' in deals.columns:
+        discount_rate = deals['discount_rate'].to_numpy()
+    metrics = calculate_lifetime_rarorac_batch(
+        *(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS), deals['term_periods'].to_numpy(),
+        amortization=amortization, periods_per_year=periods_per_year, discount_rate=discount_rate, memory_budget=memory_budget
+    )
+    results = pd.DataFrame(metrics, index=deals.index, columns=LIFETIME_RESULT_COLUMNS, copy=False)
+    results['Deal_Outcome'] = deal_outcome_labels(metrics['Meets_Hurdle'])
+    return results
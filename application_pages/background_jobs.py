@@ -0,0 +1,204 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads shared by every session; NumPy releases the GIL in its kernels, so a couple keep the UI responsive
+DEFAULT_JOB_WORKERS = int(os.environ.get("RARORAC_JOB_WORKERS", "2"))
+# Finished jobs kept per session before the oldest are dropped
+DEFAULT_MAX_FINISHED_JOBS = 20
+
+JOB_STATUSES = ['queued', 'running', 'done', 'failed', 'cancelled']
+
+_job_ids = itertools.count(1)
+_executors_lock = threading.Lock()
+_thread_pool = None
+
+
+def job_thread_pool():
+    """Process-wide thread pool the jobs of every session run on, created on first use."""
+    global _thread_pool
+    with _executors_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=DEFAULT_JOB_WORKERS, thread_name_prefix="rarorac-job")
+        return _thread_pool
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by JobContext.report once the job has been cancelled."""
+
+
+class JobContext:
+    """Handed to a job function so it can report progress and notice cancellation."""
+
+    def __init__(self, job):
+        self._job = job
+
+    @property
+    def cancelled(self):
+        return self._job.cancel_requested
+
+    def report(self, progress, message=None):
+        """Records progress (0-1) and an optional message; raises JobCancelled if the job was cancelled."""
+        self._job.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self._job.message = message
+        if self.cancelled:
+            raise JobCancelled()
+
+
+class Job:
+    """One background computation: its status, progress and, once finished, its result or the exception it raised.
+
+    The worker thread and the script thread (cancelling) can both end a job, so status
+    changes happen under a lock and the first one wins.
+    """
+
+    def __init__(self, name, key=None):
+        self.id = next(_job_ids)
+        self.name = name
+        self.key = key
+        self.status = 'queued'
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._result = None
+        self._future = None
+        self._cancel_requested = threading.Event()
+        # Reentrant, so _run can end the job while holding it
+        self._lock = threading.RLock()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_requested.is_set()
+
+    @property
+    def seconds(self):
+        """Run time so far, or in total once finished; 0 while queued."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def result(self):
+        """The job's return value once it is done; None before that or if it failed or was cancelled."""
+        return self._result if self.status == 'done' else None
+
+    def cancel(self):
+        """Asks the job to stop: a queued job never starts, a running one stops at its next progress report."""
+        self._cancel_requested.set()
+        if self._future is not None and self._future.cancel():
+            self._finish('cancelled')
+
+    def _run(self, function, args, kwargs):
+        with self._lock:
+            if self.finished or self._cancel_requested.is_set():
+                self._finish('cancelled')
+                return
+            self.status = 'running'
+            self.started_at = time.time()
+        try:
+            result = function(JobContext(self), *args, **kwargs)
+        except JobCancelled:
+            self._finish('cancelled')
+        except Exception as exc:
+            # Drop the traceback so the job does not keep the failed call's arrays alive
+            self._finish('failed', error=exc.with_traceback(None))
+        else:
+            self._finish('done', result=result)
+
+    def _finish(self, status, result=None, error=None):
+        """Ends the job unless it has already ended; the result, error and status change together."""
+        with self._lock:
+            if self.finished:
+                return
+            self._result = result
+            self.error = error
+            if status == 'done':
+                self.progress = 1.0
+            self.finished_at = time.time()
+            self.status = status
+
+
+class JobRegistry:
+    """The background jobs of one Streamlit session, kept in st.session_state across reruns.
+
+    submit() runs function(context, *args, **kwargs) on the shared thread pool and returns
+    at once; a later rerun looks the job up by key to show its progress or collect its
+    result. Jobs only write to their own Job object, and end it under the job's lock,
+    so the script thread can read it without locking.
+    """
+
+    def __init__(self, max_finished=DEFAULT_MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs = {}
+
+    def submit(self, name, function, *args, key=None, replace=False, executor=None, **kwargs):
+        """Starts a job on a thread.
+
+        If an unfinished job with the same key exists, it is returned instead, or with
+        replace=True cancelled and superseded by the new one (e.g. when the settings changed).
+        """
+        existing = self._unfinished(key, replace)
+        if existing is not None:
+            return existing
+        job = self._add(Job(name, key))
+        job._future = (executor or job_thread_pool()).submit(job._run, function, args, kwargs)
+        return job
+
+    def _unfinished(self, key, replace):
+        """The running job to hand back instead of starting a new one, if any; with replace, cancels it."""
+        existing = self.get(key) if key is not None else None
+        if existing is None or existing.finished or existing.cancel_requested:
+            return None
+        if replace:
+            existing.cancel()
+            return None
+        return existing
+
+    def get(self, key):
+        """The most recently submitted job with this key, or None."""
+        for job in reversed(list(self._jobs.values())):
+            if job.key == key:
+                return job
+        return None
+
+    def __getitem__(self, job_id):
+        return self._jobs[job_id]
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def jobs(self):
+        """All jobs, oldest first."""
+        return list(self._jobs.values())
+
+    def active(self):
+        return [job for job in self._jobs.values() if not job.finished]
+
+    def cancel(self, job_id):
+        self._jobs[job_id].cancel()
+
+    def remove(self, job_id):
+        """Forgets a job, cancelling it first if it is still running."""
+        job = self._jobs.pop(job_id)
+        job.cancel()
+
+    def clear_finished(self):
+        for job_id in [job.id for job in self._jobs.values() if job.finished]:
+            del self._jobs[job_id]
+
+    def _add(self, job):
+        self._jobs[job.id] = job
+        # Keep finished results from piling up in session memory
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+        return job
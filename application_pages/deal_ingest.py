@@ -0,0 +1,199 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, RARORAC_RESULT_COLUMNS, check_deal_columns, score_deals_frame
+from application_pages.amortization import score_lifetime_frame
+from application_pages.hurdle_solver import solve_break_even_frame
+from application_pages.rarorac_parallel import MIN_ROWS_PER_WORKER, effective_workers, score_deals_frame_parallel
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+CSV_SUFFIXES = ('.csv',)
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+# score_lifetime_frame's outcome columns, renamed so they sit next to the single-period ones
+LIFETIME_OUTCOME_COLUMNS = {'Meets_Hurdle': 'Lifetime_Meets_Hurdle', 'Deal_Outcome': 'Lifetime_Deal_Outcome'}
+
+
+def _file_format(path):
+    """Infers 'csv' or 'parquet' from a file name."""
+    suffix = os.path.splitext(str(path))[1].lower()
+    if suffix in CSV_SUFFIXES:
+        return 'csv'
+    if suffix in PARQUET_SUFFIXES:
+        return 'parquet'
+    raise ValueError(f"Unsupported deal file type '{suffix}'. Use .csv or .parquet.")
+
+
+def _import_pyarrow():
+    """Imports pyarrow, which is only needed for Parquet files."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Reading or writing Parquet deal files requires pyarrow (pip install pyarrow).") from exc
+    return pa, pq
+
+
+def iter_deal_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields a deal file as DataFrames of at most chunk_size rows, never loading the whole file."""
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive.")
+    input_dtypes = {col: np.float64 for col in RARORAC_INPUT_COLUMNS}
+
+    if _file_format(path) == 'csv':
+        with pd.read_csv(path, chunksize=chunk_size, dtype=input_dtypes) as reader:
+            for chunk in reader:
+                yield chunk
+    else:
+        _, pq = _import_pyarrow()
+        parquet_file = pq.ParquetFile(path)
+        # Checked up front, as the dtype cast below would otherwise fail on the first missing column
+        check_deal_columns(pd.DataFrame(columns=parquet_file.schema_arrow.names))
+        if parquet_file.metadata.num_rows == 0:
+            # Like read_csv on a header-only file, yield one empty chunk so the columns carry through
+            yield parquet_file.schema_arrow.empty_table().to_pandas().astype(input_dtypes)
+            return
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas().astype(input_dtypes)
+
+
+class _CsvResultWriter:
+    """Appends scored chunks to a CSV file, writing the header once."""
+
+    def __init__(self, path, empty_columns):
+        self.path = path
+        self.empty_columns = empty_columns
+        self.header_written = False
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='a' if self.header_written else 'w', header=not self.header_written, index=False)
+        self.header_written = True
+
+    def close(self):
+        if not self.header_written:
+            # Empty input still produces a file with the expected header
+            pd.DataFrame(columns=self.empty_columns).to_csv(self.path, index=False)
+
+
+class _ParquetResultWriter:
+    """Appends scored chunks to a Parquet file as one row group per chunk."""
+
+    def __init__(self, path, empty_columns):
+        self.pa, self.pq = _import_pyarrow()
+        self.path = path
+        self.empty_columns = empty_columns
+        self.writer = None
+
+    def write(self, frame):
+        if self.writer is None:
+            table = self.pa.Table.from_pandas(frame, preserve_index=False)
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        else:
+            # Cast later chunks to the first chunk's schema so column types cannot drift
+            table = self.pa.Table.from_pandas(frame, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        else:
+            # Empty input still produces a file with the expected columns and no rows
+            types = {'deal_id': self.pa.int64(), 'Meets_Hurdle': self.pa.bool_(), 'Deal_Outcome': self.pa.string()}
+            schema = self.pa.schema([(col, types.get(col, self.pa.float64())) for col in self.empty_columns])
+            self.pq.write_table(schema.empty_table(), self.path)
+
+
+def open_frame_writer(path, empty_columns):
+    """Opens an incremental CSV or Parquet writer: call write(frame) per chunk, then close().
+
+    empty_columns is the header written if close() is reached without any write().
+    """
+    if _file_format(path) == 'csv':
+        return _CsvResultWriter(path, empty_columns)
+    return _ParquetResultWriter(path, empty_columns)
+
+
+def default_chunk_size(workers=1):
+    """The chunk size used when none is given: large enough to give every worker MIN_ROWS_PER_WORKER deals."""
+    return max(DEFAULT_CHUNK_SIZE, workers * MIN_ROWS_PER_WORKER) if workers > 1 else DEFAULT_CHUNK_SIZE
+
+
+def score_deal_file(input_path, output_path, chunk_size=None, progress_callback=None, workers=1, break_even=False, lifetime=False):
+    """Scores a CSV or Parquet deal file chunk by chunk and streams the results to output_path.
+
+    chunk_size defaults to default_chunk_size(workers). With break_even=True the break-even
+    pricing columns from hurdle_solver are added as well. With lifetime=True the file also
+    needs a term_periods column (and optionally amortization and discount_rate columns), and
+    the lifetime results from amortization.score_lifetime_frame are added.
+    """
+    if chunk_size is None:
+        chunk_size = default_chunk_size(workers)
+    return score_deal_chunks(iter_deal_chunks(input_path, chunk_size), output_path, progress_callback, workers, break_even, lifetime)
+
+
+def _scored_frame(chunk, results, break_even, lifetime):
+    """Joins a chunk with its scores (and break-even and lifetime columns) in output column order."""
+    parts = [chunk, results]
+    if break_even:
+        parts.append(solve_break_even_frame(chunk))
+    if lifetime:
+        parts.append(score_lifetime_frame(chunk).rename(columns=LIFETIME_OUTCOME_COLUMNS))
+    return pd.concat(parts, axis=1)
+
+
+def score_deal_chunks(chunks, output_path, progress_callback=None, workers=1, break_even=False, lifetime=False):
+    """Scores an iterable of deal DataFrames (from a file or a generator) and streams the results to output_path.
+
+    With workers > 1 each chunk is split across the workers, at least MIN_ROWS_PER_WORKER
+    deals apiece; chunks too small to split are scored in this process. A RuntimeWarning
+    says so if the first chunk cannot keep every worker busy.
+    """
+    writer = open_frame_writer(output_path, empty_columns=RARORAC_INPUT_COLUMNS)
+    executor = None
+
+    total_deals = 0
+    deals_meeting_hurdle = 0
+    chunks_seen = False
+    try:
+        for chunk in chunks:
+            chunk_workers = effective_workers(len(chunk), workers) if workers > 1 else 1
+            # The first chunk has the full chunk size; later short ones (the last) are expected
+            if total_deals == 0 and chunk_workers < workers:
+                warnings.warn(
+                    f"Chunks of {len(chunk):,} deals keep only {chunk_workers} of {workers} workers busy; "
+                    f"use chunks of at least {workers * MIN_ROWS_PER_WORKER:,} deals to use them all.",
+                    RuntimeWarning, stacklevel=2
+                )
+            if chunk_workers == 1:
+                results = score_deals_frame(chunk)
+            else:
+                if executor is None:
+                    # One pool for the whole file so workers are not restarted for every chunk
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                results = score_deals_frame_parallel(chunk, workers=workers, executor=executor)
+            writer.write(_scored_frame(chunk, results, break_even, lifetime))
+            total_deals += len(chunk)
+            deals_meeting_hurdle += int(results['Meets_Hurdle'].sum())
+            if progress_callback is not None:
+                progress_callback(total_deals)
+            chunks_seen = True
+        if not chunks_seen:
+            # Score an empty book so the output has exactly the columns and types of a non-empty run
+            columns = RARORAC_INPUT_COLUMNS + (['term_periods'] if lifetime else [])
+            empty = pd.DataFrame({col: np.empty(0) for col in columns})
+            writer.write(_scored_frame(empty, score_deals_frame(empty), break_even, lifetime))
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        'Total_Deals': total_deals,
+        'Deals_Meeting_Hurdle': deals_meeting_hurdle,
+        'Deals_Below_Hurdle': total_deals - deals_meeting_hurdle
+    }
@@ -0,0 +1,255 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import calculate_rarorac_metrics_batch, check_deal_columns, deal_outcome_labels
+
+DEFAULT_NUM_SCENARIOS = 100_000
+DEFAULT_CONFIDENCE = 0.999
+DEFAULT_LGD = 0.45
+# Scenarios per task and obligors per block; one block holds about 9 bytes per obligor x scenario
+DEFAULT_SCENARIO_CHUNK = 1024
+DEFAULT_OBLIGOR_CHUNK = 8192
+CAPITAL_MEASURES = ['es', 'var']
+
+ECONOMIC_CAPITAL_COLUMNS = [
+    'Probability_Of_Default',
+    'Asset_Correlation',
+    'Expected_Loss',
+    'ES_Contribution',
+    'Economic_Capital',
+    'Economic_Capital_Factor',
+]
+
+
+def basel_asset_correlation(probability_of_default):
+    """Basel IRB corporate asset correlation: 24% for the safest obligors, falling to 12% as PD rises."""
+    weight = (1 - np.exp(-50 * np.asarray(probability_of_default, dtype=np.float64))) / (1 - math.exp(-50))
+    return 0.12 * weight + 0.24 * (1 - weight)
+
+
+def _default_thresholds(probability_of_default):
+    """Standard normal quantile of each PD, computed once per distinct PD; a PD of 0 never defaults and 1 always does."""
+    unique, inverse = np.unique(probability_of_default, return_inverse=True)
+    quantile = NormalDist().inv_cdf
+    thresholds = [-math.inf if pd_ <= 0 else math.inf if pd_ >= 1 else quantile(pd_) for pd_ in unique.tolist()]
+    return np.array(thresholds)[inverse]
+
+
+class _Obligors:
+    """Per-obligor model constants in the form the simulation kernel uses them.
+
+    Thresholds and loadings are float32, as the shocks they are compared with; losses stay
+    float64 so portfolio losses are summed in double precision.
+    """
+
+    def __init__(self, exposure_at_loss, probability_of_default, asset_correlation):
+        scale = np.sqrt(1 - asset_correlation)
+        # Obligor i defaults when sqrt(rho) Z + sqrt(1 - rho) eps < Phi^-1(PD), i.e. eps < threshold - loading * Z
+        self.threshold = (_default_thresholds(probability_of_default) / scale).astype(np.float32)
+        self.loading = (np.sqrt(asset_correlation) / scale).astype(np.float32)
+        self.loss = np.asarray(exposure_at_loss, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.threshold)
+
+
+def _simulate_chunk(obligors, factor, seed, obligor_chunk, tail_columns=None):
+    """Simulates one chunk of scenarios for every obligor.
+
+    Returns the portfolio loss of each scenario, or, given tail_columns, how many of
+    those scenarios each obligor defaults in. Both calls draw the same idiosyncratic
+    shocks, obligor by obligor, so the second pass sees exactly the first pass's defaults.
+    """
+    rng = np.random.Generator(np.random.SFC64(seed))
+    factor = np.asarray(factor, dtype=np.float32)
+    num_obligors = len(obligors)
+    if tail_columns is None:
+        losses = np.zeros(len(factor))
+    else:
+        counts = np.zeros(num_obligors, dtype=np.int64)
+    for start in range(0, num_obligors, obligor_chunk):
+        stop = min(start + obligor_chunk, num_obligors)
+        shocks = rng.standard_normal((stop - start, len(factor)), dtype=np.float32)
+        shocks += np.multiply.outer(obligors.loading[start:stop], factor)
+        defaults = shocks < obligors.threshold[start:stop, np.newaxis]
+        del shocks
+        if tail_columns is None:
+            # Summed in float64: a float32 sum would shift with obligor_chunk by about 1e-7 of the loss
+            losses += obligors.loss[start:stop] @ defaults
+        else:
+            counts[start:stop] = np.count_nonzero(defaults[:, tail_columns], axis=1)
+        del defaults
+    return losses if tail_columns is None else counts
+
+
+def simulate_portfolio_losses(exposure_at_loss, probability_of_default, asset_correlation, num_scenarios=DEFAULT_NUM_SCENARIOS,
+                              confidence=DEFAULT_CONFIDENCE, seed=None, scenario_chunk=DEFAULT_SCENARIO_CHUNK,
+                              obligor_chunk=DEFAULT_OBLIGOR_CHUNK, workers=1, executor=None, progress_callback=None):
+    """One-factor Gaussian copula Monte Carlo of portfolio credit losses, with Euler ES contributions.
+
+    Each obligor's asset value is sqrt(rho) Z + sqrt(1 - rho) eps, with Z a systematic
+    factor shared by all obligors in a scenario; it defaults when that falls below
+    Phi^-1(PD) and then loses exposure_at_loss (EAD x LGD).
+
+    The factor draws are sorted worst first, so the tail scenarios sit in the first
+    few scenario chunks. A first pass computes every scenario's portfolio loss; a
+    second pass replays only the chunks holding the tail scenarios to count each
+    obligor's defaults there, which gives Euler contributions to expected shortfall
+    that add up to it exactly. Chunk i always uses the i-th child of the seed, so a
+    seed and scenario_chunk reproduce the same defaults whatever the workers or
+    obligor_chunk. The losses are identical for any number of workers; a different
+    obligor_chunk sums them in a different order, which moves them only by float64
+    rounding (a few parts in 1e15).
+
+    Returns (summary, losses, es_contributions): the summary holds Expected_Loss (the
+    simulated mean), VaR, ES and the number of tail scenarios.
+    """
+    exposure_at_loss = np.asarray(exposure_at_loss, dtype=np.float64).reshape(-1)
+    num_obligors = len(exposure_at_loss)
+    probability_of_default = np.broadcast_to(np.asarray(probability_of_default, dtype=np.float64), (num_obligors,))
+    asset_correlation = np.broadcast_to(np.asarray(asset_correlation, dtype=np.float64), (num_obligors,))
+    if num_scenarios <= 0 or scenario_chunk <= 0 or obligor_chunk <= 0:
+        raise ValueError("Number of scenarios and chunk sizes must be positive.")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence level must be between 0 and 1.")
+    if num_obligors and not ((probability_of_default >= 0) & (probability_of_default <= 1)).all():
+        raise ValueError("Probabilities of default must be between 0 and 1.")
+    if num_obligors and not ((asset_correlation >= 0) & (asset_correlation < 1)).all():
+        raise ValueError("Asset correlations must be at least 0 and below 1.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Workers must be at least 1.")
+
+    obligors = _Obligors(exposure_at_loss, probability_of_default, asset_correlation)
+    factor_seed, chunks_seed = np.random.SeedSequence(seed).spawn(2)
+    factor = np.sort(np.random.default_rng(factor_seed).standard_normal(num_scenarios))
+    bounds = [(start, min(start + scenario_chunk, num_scenarios)) for start in range(0, num_scenarios, scenario_chunk)]
+    chunk_seeds = chunks_seed.spawn(len(bounds))
+
+    own_executor = executor is None and workers > 1 and len(bounds) > 1
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        losses = np.empty(num_scenarios)
+        tasks = [(obligors, factor[start:stop], chunk_seed, obligor_chunk) for (start, stop), chunk_seed in zip(bounds, chunk_seeds)]
+        results = executor.map(_simulate_chunk, *zip(*tasks)) if executor is not None else (_simulate_chunk(*task) for task in tasks)
+        for (start, stop), chunk_losses in zip(bounds, results):
+            losses[start:stop] = chunk_losses
+            if progress_callback is not None:
+                progress_callback(stop, num_scenarios)
+
+        # The worst ceil((1 - confidence) x scenarios) losses form the tail
+        tail_size = max(1, math.ceil(round((1 - confidence) * num_scenarios, 9)))
+        tail = np.sort(np.argpartition(losses, num_scenarios - tail_size)[num_scenarios - tail_size:])
+        counts = np.zeros(num_obligors, dtype=np.int64)
+        chunk_of_tail = tail // scenario_chunk
+        replays = [
+            (obligors, factor[bounds[chunk][0]:bounds[chunk][1]], chunk_seeds[chunk], obligor_chunk,
+             tail[chunk_of_tail == chunk] - bounds[chunk][0])
+            for chunk in np.unique(chunk_of_tail).tolist()
+        ]
+        results = executor.map(_simulate_chunk, *zip(*replays)) if executor is not None else (_simulate_chunk(*task) for task in replays)
+        for chunk_counts in results:
+            counts += chunk_counts
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    es_contributions = exposure_at_loss * counts / tail_size
+    summary = {
+        'Obligors': num_obligors,
+        'Scenarios': num_scenarios,
+        'Confidence': confidence,
+        'Tail_Scenarios': tail_size,
+        'Expected_Loss': float(losses.mean()),
+        'VaR': float(losses[tail].min()),
+        # Summing the contributions gives the tail mean in float64, whatever rounding the loss pass used
+        'ES': float(es_contributions.sum()),
+    }
+    return summary, losses, es_contributions
+
+
+def allocate_economic_capital(loan_amount, expected_loss_rate, lgd=DEFAULT_LGD, asset_correlation=None, capital_measure='es', **simulation_options):
+    """Economic capital per deal from the copula simulation; returns (summary, allocation columns).
+
+    PD is each deal's expected loss rate over lgd, and asset correlation defaults to the
+    Basel IRB corporate formula. Each deal's capital is its Euler contribution to
+    ES minus its own expected loss, so the capital adds up to ES - EL over the book;
+    with capital_measure='var' it is scaled to add up to VaR - EL instead. Deals that
+    never default in a tail scenario get their negative expected loss as capital, so
+    use enough scenarios for the book's smallest PDs.
+    """
+    if capital_measure not in CAPITAL_MEASURES:
+        raise ValueError(f"Capital measure must be one of {', '.join(CAPITAL_MEASURES)}.")
+    loan_amount = np.asarray(loan_amount, dtype=np.float64).reshape(-1)
+    n = len(loan_amount)
+    lgd = np.broadcast_to(np.asarray(lgd, dtype=np.float64), (n,))
+    if n and not ((lgd > 0) & (lgd <= 1)).all():
+        raise ValueError("Loss given default must be above 0 and at most 1.")
+    probability_of_default = np.broadcast_to(np.asarray(expected_loss_rate, dtype=np.float64), (n,)) / lgd
+    if asset_correlation is None:
+        asset_correlation = basel_asset_correlation(probability_of_default)
+    asset_correlation = np.broadcast_to(np.asarray(asset_correlation, dtype=np.float64), (n,))
+
+    summary, _, es_contributions = simulate_portfolio_losses(loan_amount * lgd, probability_of_default, asset_correlation, **simulation_options)
+    expected_loss = loan_amount * probability_of_default * lgd
+    capital = es_contributions - expected_loss
+    summary['Model_Expected_Loss'] = float(expected_loss.sum())
+    summary['Economic_Capital'] = summary['ES'] - summary['Model_Expected_Loss']
+    if capital_measure == 'var':
+        es_capital = capital.sum()
+        target = summary['VaR'] - summary['Model_Expected_Loss']
+        capital = capital * (target / es_capital) if es_capital else capital
+        summary['Economic_Capital'] = target
+    summary['Capital_Measure'] = capital_measure
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(loan_amount == 0, 0.0, capital / loan_amount)
+    return summary, {
+        'Probability_Of_Default': probability_of_default,
+        'Asset_Correlation': np.array(asset_correlation),
+        'Expected_Loss': expected_loss,
+        'ES_Contribution': es_contributions,
+        'Economic_Capital': capital,
+        'Economic_Capital_Factor': factor,
+    }
+
+
+def economic_capital_rarorac(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, hurdle_rate, **capital_options):
+    """RARORAC of every deal with its allocated economic capital in place of loan x UL factor.
+
+    Returns (summary, metrics): metrics holds the batch RARORAC results computed with
+    ul_capital_factor = Economic_Capital_Factor, plus the allocation columns.
+    """
+    summary, allocation = allocate_economic_capital(loan_amount, expected_loss_rate, **capital_options)
+    metrics = calculate_rarorac_metrics_batch(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate,
+                                              allocation['Economic_Capital_Factor'], hurdle_rate)
+    metrics.update(allocation)
+    return summary, metrics
+
+
+def score_economic_capital_frame(deals, **capital_options):
+    """economic_capital_rarorac for a DataFrame of deals; its ul_capital_factor column, if any, is ignored.
+
+    An 'lgd' column, if present, gives each deal's loss given default and an
+    'asset_correlation' column its correlation. Returns (summary, results frame).
+    """
+    if not isinstance(deals, pd.DataFrame):
+        raise TypeError("Deals must be a pandas DataFrame.")
+    check_deal_columns(deals.assign(ul_capital_factor=0.0) if 'ul_capital_factor' not in deals.columns else deals)
+    for col in ('lgd', 'asset_correlation'):
+        if col in deals.columns:
+            capital_options[col] = deals[col].to_numpy()
+    summary, metrics = economic_capital_rarorac(
+        *(deals[col].to_numpy() for col in ('loan_amount', 'interest_rate', 'fees', 'operating_cost_ratio', 'expected_loss_rate', 'hurdle_rate')),
+        **capital_options
+    )
+    results = pd.DataFrame(metrics, index=deals.index, copy=False)
+    results['Deal_Outcome'] = deal_outcome_labels(metrics['Meets_Hurdle'])
+    return summary, results
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch, check_deal_columns
+
+DEFAULT_TOLERANCE = 1e-12
+DEFAULT_MAX_ITERATIONS = 200
+
+BREAK_EVEN_COLUMNS = [
+    'Break_Even_Interest_Rate',
+    'Break_Even_Fees',
+    'Max_Expected_Loss_Rate',
+    'Max_UL_Capital_Factor',
+]
+
+
+def solve_break_even(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate):
+    """Closed-form values of each pricing input at which RARORAC exactly equals the hurdle rate.
+
+    RARORAC = ((L * r + F) * (1 - c) - L * el) / (L * u) is linear in r, F and el and
+    monotone in u, so each break-even value is solved directly, vectorized across deals:
+
+    - Break_Even_Interest_Rate: the minimum interest rate that meets the hurdle
+    - Break_Even_Fees: the minimum fees that meet the hurdle
+    - Max_Expected_Loss_Rate: the highest expected loss rate that still meets it
+    - Max_UL_Capital_Factor: the highest capital factor that still meets it
+
+    All other inputs are held at their current values. Deals without capital (zero loan
+    amount or capital factor) have an infinite RARORAC, as in calculate_rarorac_metrics,
+    and meet the hurdle whatever their pricing: their minimums are -inf and their
+    maximums +inf. NaN marks deals where no break-even exists (costs that consume all
+    income, or a non-positive hurdle for the capital factor).
+    """
+    L = np.asarray(loan_amount, dtype=np.float64)
+    r = np.asarray(interest_rate, dtype=np.float64)
+    F = np.asarray(fees, dtype=np.float64)
+    c = np.asarray(operating_cost_ratio, dtype=np.float64)
+    el = np.asarray(expected_loss_rate, dtype=np.float64)
+    u = np.asarray(ul_capital_factor, dtype=np.float64)
+    h = np.asarray(hurdle_rate, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin = 1 - c
+        # Income needed so that reward = hurdle x capital
+        required_income = L * (h * u + el) / margin
+        break_even_rate = (required_income - F) / L
+        break_even_fees = required_income - L * r
+        max_el_rate = (L * r + F) * margin / L - h * u
+        reward = (L * r + F) * margin - L * el
+        max_capital_factor = reward / (h * L)
+
+    no_margin = margin <= 0
+    no_loan = L == 0
+    no_capital = no_loan | (u == 0)
+    return {
+        'Break_Even_Interest_Rate': np.where(no_capital, -np.inf, np.where(no_margin, np.nan, break_even_rate)),
+        'Break_Even_Fees': np.where(no_capital, -np.inf, np.where(no_margin, np.nan, break_even_fees)),
+        'Max_Expected_Loss_Rate': np.where(no_capital, np.inf, max_el_rate),
+        'Max_UL_Capital_Factor': np.where(no_loan, np.inf, np.where((h <= 0) | (reward < 0), np.nan, max_capital_factor))
+    }
+
+
+def solve_break_even_frame(deals):
+    """Returns the break-even columns for every deal in a DataFrame of calculator inputs."""
+    if not isinstance(deals, pd.DataFrame):
+        raise TypeError("Deals must be a pandas DataFrame.")
+    check_deal_columns(deals)
+    solved = solve_break_even(*(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS))
+    return pd.DataFrame(solved, index=deals.index, columns=BREAK_EVEN_COLUMNS, copy=False)
+
+
+def bisect_break_even(objective, lower, upper, tolerance=DEFAULT_TOLERANCE, max_iterations=DEFAULT_MAX_ITERATIONS):
+    """Vectorized bisection: finds x in [lower, upper] with objective(x) = 0 for every element at once.
+
+    objective must be vectorized and change sign over each bracket; elements whose
+    bracket does not contain a sign change come back as NaN. This is the fallback
+    for model extensions that are no longer linear in their inputs.
+    """
+    lower = np.array(lower, dtype=np.float64)
+    upper = np.array(upper, dtype=np.float64)
+    lower, upper = np.broadcast_arrays(lower, upper)
+    lower, upper = lower.copy(), upper.copy()
+    f_lower = objective(lower)
+    f_upper = objective(upper)
+    bracketed = np.sign(f_lower) * np.sign(f_upper) <= 0
+
+    for _ in range(max_iterations):
+        mid = (lower + upper) / 2
+        f_mid = objective(mid)
+        go_left = np.sign(f_mid) * np.sign(f_lower) <= 0
+        upper = np.where(go_left, mid, upper)
+        lower = np.where(go_left, lower, mid)
+        f_lower = np.where(go_left, f_lower, f_mid)
+        if np.all(upper - lower <= tolerance * np.maximum(1.0, np.abs(mid))):
+            break
+    return np.where(bracketed, (lower + upper) / 2, np.nan)
+
+
+def solve_break_even_numeric(param, lower, upper, loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate, **bisect_options):
+    """Break-even value of one input found by bisection on the batch RARORAC formulas."""
+    if param not in RARORAC_INPUT_COLUMNS or param == 'hurdle_rate':
+        raise ValueError(f"Cannot solve for '{param}'.")
+    inputs = dict(zip(RARORAC_INPUT_COLUMNS, (
+        loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate
+    )))
+
+    def objective(values):
+        trial = dict(inputs, **{param: values})
+        metrics = calculate_rarorac_metrics_batch(*(trial[col] for col in RARORAC_INPUT_COLUMNS))
+        return metrics['RARORAC'] - np.asarray(hurdle_rate, dtype=np.float64)
+
+    return bisect_break_even(objective, lower, upper, **bisect_options)
@@ -0,0 +1,232 @@
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Cache stats() keys exported to Prometheus: (key, metric, type, help)
+_CACHE_METRICS = [
+    ("Hits", "rarorac_cache_hits_total", "counter", "Lookups answered from the cache."),
+    ("Misses", "rarorac_cache_misses_total", "counter", "Lookups that had to compute the value."),
+    ("Evictions", "rarorac_cache_evictions_total", "counter", "Entries dropped to keep the cache within its size bound."),
+    ("Expirations", "rarorac_cache_expirations_total", "counter", "Entries dropped because they outlived their time-to-live."),
+    ("Entries", "rarorac_cache_entries", "gauge", "Entries currently held."),
+    ("Bytes", "rarorac_cache_bytes", "gauge", "Approximate memory held by the entries."),
+]
+
+# Timings of the rerun running in the current Streamlit script thread, if any
+_current_rerun = contextvars.ContextVar("rarorac_current_rerun", default=None)
+
+
+class RerunProfile:
+    """Timings and counters recorded during one run of the Streamlit script."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.timings = []
+        self.counters = {}
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def totals(self):
+        """(operation, calls, total seconds) per operation, slowest first."""
+        totals = {}
+        for name, seconds in self.timings:
+            calls, total = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, total + seconds)
+        return sorted(((name, calls, total) for name, (calls, total) in totals.items()), key=lambda row: -row[2])
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_started")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.observe(self._name, time.perf_counter() - self._started)
+        return False
+
+
+class MetricsRegistry:
+    """Process-wide timers and counters for the app's hot paths.
+
+    Every observation goes into running totals shared by all sessions (for the
+    Prometheus-style export) and, while a rerun is being profiled, into that rerun's
+    RerunProfile (for the sidebar performance panel). Shared caches register their
+    stats() here so both show their hit, miss and eviction counters too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+        self._caches = {}
+
+    def timed(self, name):
+        """Context manager that records the wall time of its block under name."""
+        return _Timer(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            count, total, slowest = self._timers.get(name, (0, 0.0, 0.0))
+            self._timers[name] = (count + 1, total + seconds, max(slowest, seconds))
+        rerun = _current_rerun.get()
+        if rerun is not None:
+            rerun.timings.append((name, seconds))
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+        rerun = _current_rerun.get()
+        if rerun is not None:
+            rerun.counters[name] = rerun.counters.get(name, 0) + amount
+
+    def begin_rerun(self):
+        """Starts profiling a new script run in the current thread; returns its RerunProfile."""
+        self.increment("reruns")
+        rerun = RerunProfile()
+        _current_rerun.set(rerun)
+        return rerun
+
+    def end_rerun(self):
+        """Finishes the current script run and records its total time; returns its RerunProfile."""
+        rerun = _current_rerun.get()
+        if rerun is None:
+            return None
+        rerun.finished = time.perf_counter()
+        _current_rerun.set(None)
+        self.observe("rerun", rerun.seconds)
+        return rerun
+
+    def register_cache(self, name, stats):
+        """Reports a cache's stats() (Hits, Misses, Evictions, Entries, ...) under name."""
+        with self._lock:
+            self._caches[name] = stats
+
+    def cache_stats(self):
+        """{cache name: stats dict} of the registered caches, read now."""
+        with self._lock:
+            caches = dict(self._caches)
+        return {name: stats() for name, stats in sorted(caches.items())}
+
+    def snapshot(self):
+        """({operation: (count, total seconds, max seconds)}, {counter: value}) across all sessions."""
+        with self._lock:
+            return dict(self._timers), dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def render_prometheus(self):
+        """Prometheus text exposition of the timers, counters and process memory."""
+        timers, counters = self.snapshot()
+        lines = [
+            "# HELP rarorac_operation_seconds Wall time spent in instrumented operations.",
+            "# TYPE rarorac_operation_seconds summary",
+        ]
+        for name, (count, total, _) in sorted(timers.items()):
+            lines.append(f'rarorac_operation_seconds_sum{{operation="{name}"}} {total:.9f}')
+            lines.append(f'rarorac_operation_seconds_count{{operation="{name}"}} {count}')
+        lines += [
+            "# HELP rarorac_operation_max_seconds Slowest single call of each instrumented operation.",
+            "# TYPE rarorac_operation_max_seconds gauge",
+        ]
+        for name, (_, _, slowest) in sorted(timers.items()):
+            lines.append(f'rarorac_operation_max_seconds{{operation="{name}"}} {slowest:.9f}')
+        lines += [
+            "# HELP rarorac_events_total Counted events.",
+            "# TYPE rarorac_events_total counter",
+        ]
+        for name, value in sorted(counters.items()):
+            lines.append(f'rarorac_events_total{{event="{name}"}} {value}')
+        caches = self.cache_stats()
+        for key, metric, metric_type, help_text in _CACHE_METRICS:
+            values = [(name, stats[key]) for name, stats in caches.items() if key in stats]
+            if values:
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {metric_type}"]
+                lines += [f'{metric}{{cache="{name}"}} {value}' for name, value in values]
+        memory = process_memory()
+        for key, help_text in (("resident", "Resident set size"), ("peak_resident", "Peak resident set size")):
+            if memory[key] is not None:
+                lines += [
+                    f"# HELP rarorac_process_{key}_memory_bytes {help_text} of the app process.",
+                    f"# TYPE rarorac_process_{key}_memory_bytes gauge",
+                    f"rarorac_process_{key}_memory_bytes {memory[key]}",
+                ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_file(self, path):
+        """Writes the exposition to path atomically, e.g. for node_exporter's textfile collector."""
+        # Sessions are threads of one process, so each write needs its own temporary file
+        fd, temporary = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render_prometheus())
+            # mkstemp creates the file private to this user; the collector may run as another
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def process_memory():
+    """Current and peak resident memory of this process in bytes; None where the platform cannot tell."""
+    resident = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            resident = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return {"resident": resident, "peak_resident": peak}
+
+
+def start_metrics_server(registry, host="127.0.0.1", port=9464):
+    """Serves registry.render_prometheus() at http://host:port/metrics from a daemon thread; returns the server."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would otherwise flood the Streamlit log
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="rarorac-metrics", daemon=True).start()
+    return server
+
+
+shared_metrics = MetricsRegistry()
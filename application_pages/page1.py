@@ -2,6 +2,30 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from application_pages.amortization import AMORTIZATION_TYPES, calculate_lifetime_rarorac_batch, period_cash_flows
+from application_pages.hurdle_solver import solve_break_even
+from application_pages.instrumentation import shared_metrics
+from application_pages.monte_carlo import simulate_rarorac
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS
+from application_pages.rarorac_cache import shared_rarorac_cache
+from application_pages.rarorac_incremental import IncrementalRarorac
+from application_pages.scenario_exchange import SCENARIO_FILE_FORMATS, available_formats, export_scenarios_bytes, import_scenarios
+from application_pages.scenario_store import ScenarioStore
+from application_pages.sensitivity import PARAMETER_LABELS, downsample_grid, sensitivity_grid, tornado_analysis
+
+# Comparison table sort options, mapped to the scenario store's column keys
+COMPARISON_SORT_KEYS = {
+    "Save Order": None,
+    "Scenario Name": 'Scenario_Name',
+    "RARORAC": 'RARORAC',
+    "Net Risk Adjusted Reward": 'Net_Risk_Adjusted_Reward',
+    "Risk Adjusted Capital": 'Risk_Adjusted_Capital',
+    "Income From Deal": 'Income_From_Deal',
+    "Expected Loss Rate": 'expected_loss_rate',
+    "Loan Amount": 'loan_amount',
+    "Deal Outcome": 'Deal_Outcome',
+}
+
 def save_scenario_streamlit(scenario_name, current_parameters, current_results):
     """Stores the current set of input parameters and their calculated RARORAC results in session state."""
     if not isinstance(scenario_name, str):
@@ -11,10 +35,7 @@ def save_scenario_streamlit(scenario_name, current_parameters, current_results):
     if current_results is not None and not isinstance(current_results, dict):
         raise TypeError("Current results must be a dictionary or None.")
     
-    st.session_state.saved_scenarios[scenario_name] = {
-        "parameters": current_parameters,
-        "results": current_results
-    }
+    st.session_state.saved_scenarios.save(scenario_name, current_parameters, current_results)
 
 def display_scenarios_comparison_streamlit(scenarios_dict):
     """Presents a tabular comparison of all saved scenarios from session state."""
@@ -22,28 +43,108 @@ def display_scenarios_comparison_streamlit(scenarios_dict):
         st.info("No scenarios saved yet. Calculate a RARORAC and click 'Save Scenario' to add it here.")
         return pd.DataFrame()
 
-    scenarios_list_for_df = []
-    for scenario_name, scenario_data in scenarios_dict.items():
-        combined_data = {"Scenario Name": scenario_name}
-        # Include a subset of parameters for clarity in display if too many
-        combined_data.update({k.replace('_', ' ').title(): v for k, v in scenario_data["parameters"].items()})
-        combined_data.update({k.replace('_', ' ').title(): v for k, v in scenario_data["results"].items()})
-        scenarios_list_for_df.append(combined_data)
-
-    df = pd.DataFrame(scenarios_list_for_df)
-    # Reorder columns to put RARORAC and Deal Outcome at the end for consistency
-    cols = list(df.columns)
-    if 'Deal Outcome' in cols:
-        cols.remove('Deal Outcome')
-        cols.append('Deal Outcome')
-    if 'RARORAC' in cols:
-        cols.remove('RARORAC')
-        cols.append('RARORAC')
-    df = df[cols]
-    
-    st.dataframe(df)
+    if not isinstance(scenarios_dict, ScenarioStore):
+        scenarios_dict = ScenarioStore.from_dict(scenarios_dict)
+
+    # Sorting, filtering and paging happen here on the server; only the visible page is sent to the browser
+    col_sort, col_order, col_outcome = st.columns(3)
+    with col_sort:
+        sort_label = st.selectbox("Sort By", options=list(COMPARISON_SORT_KEYS), key="comparison_sort_by")
+    with col_order:
+        descending = st.radio("Order", options=["Ascending", "Descending"], horizontal=True, key="comparison_order") == "Descending"
+    with col_outcome:
+        outcome_label = st.selectbox("Deal Outcome", options=["All", "Meets Hurdle Rate", "Below Hurdle Rate"], key="comparison_outcome")
+
+    col_min, col_max, col_page_size = st.columns(3)
+    with col_min:
+        rarorac_min = st.number_input("Min RARORAC (%)", value=None, step=1.0, key="comparison_rarorac_min")
+    with col_max:
+        rarorac_max = st.number_input("Max RARORAC (%)", value=None, step=1.0, key="comparison_rarorac_max")
+    with col_page_size:
+        page_size = st.selectbox("Rows Per Page", options=[25, 50, 100, 250], index=1, key="comparison_page_size")
+
+    filters = dict(
+        outcome=None if outcome_label == "All" else outcome_label,
+        rarorac_min=None if rarorac_min is None else rarorac_min / 100.0,
+        rarorac_max=None if rarorac_max is None else rarorac_max / 100.0
+    )
+    with shared_metrics.timed("scenario_table"):
+        # With a repository this is a count query; the scenarios are not loaded for the table
+        matching = scenarios_dict.count_matching(**filters)
+    num_pages = max(1, -(-matching // page_size))
+    if st.session_state.get("comparison_page", 1) > num_pages:
+        # Filters or deletes shrank the result; jump back to the last page that exists
+        st.session_state["comparison_page"] = num_pages
+    page = st.number_input("Page", min_value=1, max_value=num_pages, step=1, key="comparison_page") - 1
+
+    with shared_metrics.timed("scenario_table"):
+        df = scenarios_dict.page_frame(sort_by=COMPARISON_SORT_KEYS[sort_label], descending=descending,
+                                       page=page, page_size=page_size, **filters)
+    shared_metrics.increment("scenario_table_rows", len(df))
+    with shared_metrics.timed("table_render"):
+        st.dataframe(df)
+    first = page * page_size + 1 if matching else 0
+    st.caption(f"Showing {first}–{page * page_size + len(df)} of {matching} matching scenario(s), page {page + 1} of {num_pages}.")
     return df
 
+def manage_scenarios_streamlit(scenario_store):
+    """Lets the user rename or delete a single saved scenario."""
+    with st.expander("Manage Saved Scenarios"):
+        # Set just before the rerun that redraws the comparison table with the change
+        message = st.session_state.pop('manage_scenario_message', None)
+        if message is not None:
+            st.success(message)
+        selected = st.selectbox("Scenario", options=scenario_store.names(), key="manage_scenario_name")
+        new_name = st.text_input("New Name", key="manage_scenario_new_name")
+        col_rename, col_delete = st.columns(2)
+        with col_rename:
+            if st.button("Rename Scenario") and new_name:
+                try:
+                    scenario_store.rename(selected, new_name)
+                except ValueError as exc:
+                    # Also raised when another session sharing the repository took the name first
+                    st.error(str(exc))
+                else:
+                    st.session_state['manage_scenario_message'] = f"Scenario '{selected}' renamed to '{new_name}'."
+                    st.rerun()
+        with col_delete:
+            if st.button("Delete Scenario"):
+                scenario_store.delete(selected)
+                st.session_state['manage_scenario_message'] = f"Scenario '{selected}' deleted."
+                st.rerun()
+
+def exchange_scenarios_streamlit(scenario_store):
+    """Bulk import of scenario files and export of the saved scenarios as Parquet, Arrow IPC or CSV."""
+    with st.expander("Import / Export Scenarios"):
+        formats = available_formats()
+        uploaded = st.file_uploader("Scenario File", type=[suffix.lstrip('.') for f in formats for suffix in SCENARIO_FILE_FORMATS[f]],
+                                    key="scenario_import_file")
+        replace = st.checkbox("Replace saved scenarios", key="scenario_import_replace",
+                              help="Clear the saved scenarios before importing. Otherwise scenarios with the same name are overwritten.")
+        if uploaded is not None and st.button("Import Scenarios"):
+            try:
+                with shared_metrics.timed("scenario_import"):
+                    count = import_scenarios(scenario_store, uploaded.getvalue(),
+                                             next(f for f, suffixes in SCENARIO_FILE_FORMATS.items()
+                                                  if uploaded.name.lower().endswith(suffixes)),
+                                             replace=replace)
+            except (ValueError, ImportError) as exc:
+                st.error(f"Cannot import '{uploaded.name}': {exc}")
+            else:
+                st.success(f"Imported {count:,} scenario(s) from '{uploaded.name}'.")
+
+        export_format = st.selectbox("Export Format", options=formats, key="scenario_export_format",
+                                     format_func={'parquet': "Parquet", 'arrow': "Arrow IPC", 'csv': "CSV"}.get)
+        # The file is only built on request, then kept until the scenarios or the format change.
+        # For a repository-backed store the key is its revision, so checking it reads no scenarios.
+        export_key = (scenario_store.cache_key, export_format)
+        if st.button("Prepare Export", disabled=not len(scenario_store)):
+            with shared_metrics.timed("scenario_export"):
+                st.session_state['scenario_export'] = (export_key, export_scenarios_bytes(scenario_store, export_format))
+        prepared = st.session_state.get('scenario_export')
+        if prepared is not None and prepared[0] == export_key:
+            st.download_button("Download Scenarios", data=prepared[1], file_name=f"scenarios{SCENARIO_FILE_FORMATS[export_format][0]}")
+
 def calculate_rarorac_metrics(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate):
     """Computes RARORAC metrics."""
     Income_From_Deal = loan_amount * interest_rate + fees
@@ -72,6 +173,209 @@ def calculate_rarorac_metrics(loan_amount, interest_rate, fees, operating_cost_r
         'Deal_Outcome': Deal_Outcome
     }
 
+def display_break_even_streamlit(params):
+    """Shows the break-even value of each pricing input for the current deal."""
+    st.subheader("Break-Even Pricing")
+    st.markdown("The value each input would need, with all others unchanged, for RARORAC to equal the hurdle rate exactly:")
+
+    solved = {key: float(value) for key, value in solve_break_even(**params).items()}
+
+    def show(value, fmt):
+        if np.isinf(value):
+            return "Always meets"
+        return "n/a" if np.isnan(value) else fmt.format(value)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Minimum Interest Rate", show(solved['Break_Even_Interest_Rate'] * 100, "{:.2f}%"))
+    with col2:
+        st.metric("Minimum Fees", show(solved['Break_Even_Fees'], "${:,.2f}"))
+    with col3:
+        st.metric("Maximum Expected Loss Rate", show(solved['Max_Expected_Loss_Rate'] * 100, "{:.2f}%"))
+    with col4:
+        st.metric("Maximum UL Capital Factor", show(solved['Max_UL_Capital_Factor'] * 100, "{:.2f}%"))
+    st.info("💡 Negative minimums mean the deal clears the hurdle even with no interest or fees; "
+            "**n/a** means no value of that input alone can make the deal meet the hurdle rate; "
+            "**Always meets** means the deal holds no capital, so it meets the hurdle whatever that input is.")
+
+def display_sensitivity_streamlit(params):
+    """Shows a tornado chart and a two-parameter RARORAC heatmap around the current deal."""
+    # Altair is loaded here rather than at module import, after the metric cards are already on screen
+    import altair as alt
+
+    st.subheader("Sensitivity Analysis")
+    st.markdown("See which inputs drive RARORAC without adjusting the sidebar one value at a time.")
+
+    shift = st.slider("Shift Each Parameter By (%)", min_value=5, max_value=50, value=20, step=5, key="sensitivity_shift") / 100.0
+    with shared_metrics.timed("sensitivity_analysis"):
+        tornado = tornado_analysis(params, relative_shift=shift)
+    with shared_metrics.timed("chart_build"):
+        tornado_chart = alt.Chart(tornado).mark_bar().encode(
+            x=alt.X('RARORAC_Low', axis=alt.Axis(title='RARORAC', format='%')),
+            x2='RARORAC_High',
+            y=alt.Y('Parameter', sort=None, axis=alt.Axis(title=None)),
+            tooltip=['Parameter', 'Low_Value', 'High_Value',
+                     alt.Tooltip('RARORAC_Low', format='.2%'), alt.Tooltip('RARORAC_High', format='.2%')]
+        ).properties(title=f'RARORAC with Each Parameter Moved ±{shift:.0%}', height=250)
+        base_rule = alt.Chart(tornado.head(1)).mark_rule(color='black').encode(x='Base_RARORAC')
+    with shared_metrics.timed("chart_render"):
+        st.altair_chart(tornado_chart + base_rule, use_container_width=True)
+    st.info(f"💡 **{tornado.loc[0, 'Parameter']}** moves RARORAC the most for a ±{shift:.0%} change.")
+
+    parameters = [col for col in PARAMETER_LABELS if col != 'hurdle_rate']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        x_param = st.selectbox("Heatmap X Axis", options=parameters, index=parameters.index('interest_rate'),
+                               format_func=PARAMETER_LABELS.get, key="sensitivity_x")
+    with col2:
+        y_param = st.selectbox("Heatmap Y Axis", options=parameters, index=parameters.index('expected_loss_rate'),
+                               format_func=PARAMETER_LABELS.get, key="sensitivity_y")
+    with col3:
+        resolution = st.selectbox("Grid Points Per Axis", options=[100, 300, 1000], index=1, key="sensitivity_resolution")
+
+    if x_param == y_param:
+        st.warning("Choose two different parameters for the heatmap.")
+        return
+
+    # Sweep 0-2x the current value (or 0-10% for a rate that is currently zero)
+    x_values = np.linspace(0, 2 * params[x_param] or 0.1, resolution)
+    y_values = np.linspace(0, 2 * params[y_param] or 0.1, resolution)
+    with shared_metrics.timed("sensitivity_analysis"):
+        grid = sensitivity_grid(params, x_param, x_values, y_param, y_values)
+        # Only the downsampled cells are sent to the browser, whatever the grid resolution
+        heatmap_data = downsample_grid(grid, x_values, y_values)
+    with shared_metrics.timed("chart_build"):
+        heatmap = alt.Chart(heatmap_data).mark_rect().encode(
+            x=alt.X('x:O', axis=alt.Axis(title=PARAMETER_LABELS[x_param], format='.3~g', labelOverlap=True)),
+            y=alt.Y('y:O', sort='descending', axis=alt.Axis(title=PARAMETER_LABELS[y_param], format='.3~g', labelOverlap=True)),
+            color=alt.Color('value:Q', scale=alt.Scale(scheme='redyellowgreen', domainMid=params['hurdle_rate']),
+                            legend=alt.Legend(title='RARORAC', format='%')),
+            tooltip=[alt.Tooltip('x:Q', title=PARAMETER_LABELS[x_param], format='.4~g'),
+                     alt.Tooltip('y:Q', title=PARAMETER_LABELS[y_param], format='.4~g'),
+                     alt.Tooltip('value:Q', title='RARORAC', format='.2%')]
+        ).properties(title=f'RARORAC over {resolution:,} x {resolution:,} Grid', height=400)
+    with shared_metrics.timed("chart_render"):
+        st.altair_chart(heatmap, use_container_width=True)
+    st.caption("Colours are centred on the hurdle rate: green cells meet it, red cells fall below it.")
+
+def display_monte_carlo_streamlit(params):
+    """Simulates the current deal under uncertain default rate, LGD and spread, and shows the RARORAC distribution."""
+    st.subheader("Monte Carlo Simulation")
+    st.markdown("""
+    The calculator treats expected loss as a fixed input. Here the expected loss rate is split into a
+    **default rate** and a **loss given default** (EL = PD × LGD), both drawn at random together with the
+    **interest rate spread**, to show how likely the deal is to clear the hurdle rate.
+    """)
+
+    with st.form("monte_carlo_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            num_draws = st.selectbox("Number of Draws", options=[10_000, 100_000, 1_000_000], index=1, format_func=lambda n: f"{n:,}")
+            seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+        with col2:
+            lgd_mean = st.number_input("Mean Loss Given Default (%)", min_value=1.0, max_value=99.0, value=45.0, step=1.0) / 100.0
+            lgd_std = st.number_input("LGD Volatility (%)", min_value=0.1, max_value=49.0, value=15.0, step=0.5) / 100.0
+        with col3:
+            default_rate_cv = st.number_input("Default Rate Volatility (% of mean)", min_value=1.0, max_value=200.0, value=50.0, step=5.0) / 100.0
+            spread_std = st.number_input("Spread Volatility (bps)", min_value=0.0, max_value=1000.0, value=50.0, step=5.0) / 10000.0
+        submitted = st.form_submit_button("Run Simulation")
+
+    if not submitted:
+        st.info("Set the uncertainty assumptions and click **Run Simulation**.")
+        return None
+
+    progress_bar = st.progress(0.0)
+    running_summary = st.empty()
+
+    def show_progress(draws_done, summary):
+        progress_bar.progress(draws_done / num_draws)
+        running_summary.caption(
+            f"{draws_done:,} draws: P(meets hurdle) {summary['Hurdle_Pass_Probability']:.1%}, "
+            f"mean RARORAC {summary['RARORAC_Mean']:.2%}"
+        )
+
+    try:
+        summary, rarorac_draws = simulate_rarorac(
+            **params, num_draws=num_draws, lgd_mean=lgd_mean, lgd_std=lgd_std,
+            default_rate_cv=default_rate_cv, spread_std=spread_std, seed=int(seed),
+            progress_callback=show_progress
+        )
+    except ValueError as exc:
+        progress_bar.empty()
+        st.error(f"Cannot run simulation: {exc}")
+        return None
+    running_summary.empty()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("P(Meets Hurdle Rate)", f"{summary['Hurdle_Pass_Probability']:.1%}")
+    with col2:
+        st.metric("RARORAC 5th Percentile", f"{summary['RARORAC_P5']:.2%}")
+    with col3:
+        st.metric("Median RARORAC", f"{summary['RARORAC_P50']:.2%}")
+    with col4:
+        st.metric("RARORAC 95th Percentile", f"{summary['RARORAC_P95']:.2%}")
+
+    # Histogram the draws here so only the bin counts are sent to the browser
+    finite_draws = rarorac_draws[np.isfinite(rarorac_draws)]
+    if finite_draws.size:
+        low, high = np.percentile(finite_draws, [0.5, 99.5])
+        counts, edges = np.histogram(finite_draws, bins=50, range=(low, high) if high > low else None)
+        histogram = pd.DataFrame({
+            'RARORAC (%)': np.round((edges[:-1] + edges[1:]) / 2 * 100, 2),
+            'Draws': counts
+        }).set_index('RARORAC (%)')
+        st.bar_chart(histogram)
+    st.info(f"💡 Across {summary['Draws']:,} draws the deal meets the {params['hurdle_rate']*100:.2f}% hurdle rate "
+            f"{summary['Hurdle_Pass_Probability']:.1%} of the time.")
+    return summary
+
+def display_lifetime_streamlit(params):
+    """Scores the current deal over its whole life as an amortizing loan and charts capital and reward per period."""
+    st.subheader("Lifetime RARORAC")
+    st.markdown("""
+    The calculator looks at a single year with the full loan outstanding. Here the loan **amortizes** over
+    its term, so interest, expected loss and capital all shrink with the balance. **Lifetime RARORAC** is
+    total net risk-adjusted reward over capital-years held; **Discounted RARORAC** discounts both at the
+    chosen rate.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        term_months = st.number_input("Term (months)", min_value=1, max_value=600, value=60, step=12)
+    with col2:
+        amortization = st.selectbox("Amortization", options=AMORTIZATION_TYPES, index=AMORTIZATION_TYPES.index('annuity'),
+                                    format_func=str.capitalize)
+    with col3:
+        discount_rate = st.number_input("Discount Rate (%)", min_value=0.0, max_value=100.0,
+                                        value=params['hurdle_rate'] * 100, step=0.5) / 100.0
+
+    with shared_metrics.timed("lifetime_rarorac"):
+        lifetime = calculate_lifetime_rarorac_batch(**params, term_periods=int(term_months), amortization=amortization,
+                                                    discount_rate=discount_rate)
+        schedule = period_cash_flows(*(params[key] for key in ('loan_amount', 'interest_rate', 'fees', 'operating_cost_ratio',
+                                                              'expected_loss_rate', 'ul_capital_factor')),
+                                     term_periods=int(term_months), amortization=amortization)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Lifetime RARORAC", f"{lifetime['Lifetime_RARORAC'][0]:.2%}")
+    with col2:
+        st.metric("Discounted RARORAC", f"{lifetime['Discounted_RARORAC'][0]:.2%}")
+    with col3:
+        st.metric("Lifetime Net Risk-Adjusted Reward", f"${lifetime['Lifetime_Net_Risk_Adjusted_Reward'][0]:,.2f}")
+
+    chart_data = pd.DataFrame({
+        'Month': np.arange(1, int(term_months) + 1),
+        'Risk-Adjusted Capital': schedule['Risk_Adjusted_Capital'][0],
+        'Net Risk-Adjusted Reward': schedule['Net_Risk_Adjusted_Reward'][0],
+    }).set_index('Month')
+    st.line_chart(chart_data)
+    outcome = "meets" if lifetime['Meets_Hurdle'][0] else "falls below"
+    st.info(f"💡 Over {int(term_months)} months of {amortization} repayment the deal {outcome} "
+            f"the {params['hurdle_rate']*100:.2f}% hurdle rate.")
+    return lifetime
+
 def run_page1():
     st.header("RARORAC Calculator & Scenario Management")
     
@@ -202,11 +506,26 @@ def run_page1():
     ) / 100.0 # Convert to decimal
     st.sidebar.info("The minimum acceptable RARORAC percentage required for a deal to be considered profitable and risk-adequate.")
 
-    # Calculate metrics
-    metrics = calculate_rarorac_metrics(
-        loan_amount, interest_rate, fees, operating_cost_ratio,
-        expected_loss_rate, ul_capital_factor, hurdle_rate
-    )
+    # Calculate metrics: whenever the inputs change, results already computed by any session for the
+    # new parameters are reused; on a miss only the metrics downstream of the inputs that moved are re-evaluated
+    params = (loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate)
+    inputs = dict(zip(RARORAC_INPUT_COLUMNS, map(float, params)))
+    with shared_metrics.timed("calculate_rarorac_metrics"):
+        engine = st.session_state.get('rarorac_engine')
+        if engine is not None and engine.inputs == inputs:
+            # A rerun for another widget: nothing to recompute or look up
+            metrics = engine.metrics
+        else:
+            def recompute(*key):
+                if engine is None:
+                    return calculate_rarorac_metrics(*key)
+                shared_metrics.increment("metrics_recomputed", len(engine.update(**inputs)))
+                return engine.metrics
+
+            metrics = shared_rarorac_cache.get_or_compute(params, recompute)
+            if engine is None or engine.inputs != inputs:
+                # A cache hit: start from the shared results instead of updating the engine
+                st.session_state['rarorac_engine'] = IncrementalRarorac.from_results(inputs, metrics)
 
     st.subheader("Calculated Results")
     st.markdown("Here are the calculated metrics based on your input parameters:")
@@ -284,6 +603,18 @@ def run_page1():
     }
     st.session_state['current_rarorac_results'] = metrics
 
+    st.markdown("---")
+    display_break_even_streamlit(st.session_state['current_rarorac_params'])
+
+    st.markdown("---")
+    display_sensitivity_streamlit(st.session_state['current_rarorac_params'])
+
+    st.markdown("---")
+    display_monte_carlo_streamlit(st.session_state['current_rarorac_params'])
+
+    st.markdown("---")
+    display_lifetime_streamlit(st.session_state['current_rarorac_params'])
+
     # Scenario Saving Section
     st.markdown("---")
     st.subheader("Save & Compare Scenarios")
@@ -306,14 +637,17 @@ def run_page1():
         st.write("")  # Empty space for alignment
         st.write("")  # Empty space for alignment
         if st.button("Clear All Scenarios", type="secondary"):
-            st.session_state.saved_scenarios = {}
+            st.session_state.saved_scenarios.clear()
             st.info("All scenarios cleared.")
 
+    exchange_scenarios_streamlit(st.session_state.saved_scenarios)
+
     # Scenario Comparison Display
     if st.session_state.saved_scenarios:
         st.subheader("Saved Scenarios Comparison")
         st.markdown(f"**{len(st.session_state.saved_scenarios)} scenario(s) saved.** Use this table to compare different deal configurations:")
         display_scenarios_comparison_streamlit(st.session_state.saved_scenarios)
+        manage_scenarios_streamlit(st.session_state.saved_scenarios)
         
         # Analysis tips
         st.markdown("""
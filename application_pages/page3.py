@@ -1,29 +1,185 @@
 
+import json
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
 
-def generate_portfolio_data(num_deals, risk_range, return_range, skewed):
-    """Generates synthetic portfolio data."""
+from application_pages.economic_capital import economic_capital_rarorac
+from application_pages.instrumentation import shared_metrics
+from application_pages.portfolio_analytics import PortfolioAnalytics
+from application_pages.scenario_store import SCENARIO_OUTCOME_LABELS
+from application_pages.view_cache import shared_view_cache
+
+# Saved-portfolio breakdowns offered on the page, mapped to their table headings
+PORTFOLIO_BREAKDOWNS = {
+    'Risk_Bucket': "Risk Bucket (Expected Loss Rate)",
+    'Deal_Outcome': "Deal Outcome",
+}
+
+# Synthetic portfolios this large are generated as a background job instead of during the rerun
+BACKGROUND_SYNTHETIC_DEALS = 500_000
+# Deals drawn per step of generate_portfolio_data, between progress reports
+PORTFOLIO_CHUNK = 100_000
+# How often a running job's progress bar refreshes
+JOB_REFRESH_SECONDS = 1.0
+# Saved-scenario columns the economic capital simulation and its comparison table read
+ECONOMIC_CAPITAL_COLUMNS = ['loan_amount', 'interest_rate', 'fees', 'operating_cost_ratio', 'expected_loss_rate', 'hurdle_rate',
+                            'Risk_Adjusted_Capital', 'RARORAC', 'Net_Risk_Adjusted_Reward']
+
+def generate_portfolio_data(num_deals, risk_range, return_range, skewed, seed=None, progress_callback=None):
+    """Generates synthetic portfolio data; the same seed always gives the same portfolio.
+
+    Deals are drawn PORTFOLIO_CHUNK at a time and progress_callback(done, total) is called
+    after each chunk, so a background job can report progress and stop when cancelled.
+    Chunks are drawn in order from one generator, so the portfolio matches one big draw.
+    """
     if risk_range[0] > risk_range[1] or return_range[0] > return_range[1]:
         raise ValueError("Invalid range: min > max")
 
     if num_deals <= 0:
         return pd.DataFrame({'Risk_Score': [], 'Return_Ratio': []})
 
-    if skewed:
-        # Skewed towards higher risk / lower return (more deals near boundary)
-        risk_scores = np.random.beta(2, 8, num_deals) * (risk_range[1] - risk_range[0]) + risk_range[0]
-        return_ratios = np.random.beta(8, 2, num_deals) * (return_range[1] - return_range[0]) + return_range[0]
-    else:
-        # Uniformly distributed
-        risk_scores = np.random.uniform(risk_range[0], risk_range[1], num_deals)
-        return_ratios = np.random.uniform(return_range[0], return_range[1], num_deals)
+    rng = np.random.default_rng(seed)
+    risk_scores = np.empty(num_deals)
+    return_ratios = np.empty(num_deals)
+    done = 0
+    # Skewed portfolios lean towards higher risk / lower return (more deals near boundary)
+    for values, value_range, beta_shape in ((risk_scores, risk_range, (2, 8)), (return_ratios, return_range, (8, 2))):
+        for start in range(0, num_deals, PORTFOLIO_CHUNK):
+            stop = min(start + PORTFOLIO_CHUNK, num_deals)
+            if skewed:
+                values[start:stop] = rng.beta(*beta_shape, stop - start) * (value_range[1] - value_range[0]) + value_range[0]
+            else:
+                # Uniformly distributed
+                values[start:stop] = rng.uniform(value_range[0], value_range[1], stop - start)
+            done += stop - start
+            if progress_callback is not None:
+                progress_callback(done, 2 * num_deals)
 
     df = pd.DataFrame({'Risk_Score': risk_scores, 'Return_Ratio': return_ratios})
     return df
 
+def scenario_portfolio_frame(scenario_store):
+    """Risk/return frame of the saved scenarios, read straight out of the scenario store's columns."""
+    # Expected Loss Rate is the Risk Score and RARORAC the Return Ratio
+    return pd.DataFrame({
+        'Scenario_Name': scenario_store.names(),
+        'Risk_Score': scenario_store.column('expected_loss_rate'),
+        'Return_Ratio': scenario_store.column('RARORAC'),
+        'Deal_Outcome': scenario_store.column('Deal_Outcome')
+    })
+
+def display_job_progress(job):
+    """Progress bar and Cancel button for a background job; refreshes itself and reruns the page once the job finishes."""
+    @st.fragment(run_every=JOB_REFRESH_SECONDS)
+    def job_status():
+        if job.finished:
+            st.rerun()
+        label = job.message or ("Waiting for a free worker" if job.status == 'queued' else "Running")
+        st.progress(job.progress, text=f"{job.name}: {label} ({job.seconds:,.0f} s)")
+        if st.button("Cancel", key=f"cancel_job_{job.id}", disabled=job.cancel_requested):
+            job.cancel()
+            st.rerun()
+    job_status()
+
+def run_economic_capital_job(context, columns, names, cache_key, **options):
+    """Background job: the economic capital simulation on a snapshot of the saved scenarios' columns."""
+    with shared_metrics.timed("economic_capital"):
+        summary, metrics = economic_capital_rarorac(
+            *(columns[col] for col in ('loan_amount', 'interest_rate', 'fees', 'operating_cost_ratio', 'expected_loss_rate', 'hurdle_rate')),
+            progress_callback=lambda done, total: context.report(done / total, f"{done:,} of {total:,} scenarios simulated"),
+            **options
+        )
+    return {'summary': summary, 'metrics': metrics, 'columns': columns, 'names': names, 'cache_key': cache_key,
+            'confidence': options['confidence']}
+
+def display_economic_capital_streamlit(scenario_store):
+    """Simulates correlated defaults across the saved scenarios and re-scores them with allocated economic capital."""
+    st.subheader("Economic Capital")
+    st.markdown("""
+    The UL capital factor is a fixed input per deal and ignores how deals default together. Here defaults are
+    simulated with a **one-factor Gaussian copula**: every deal's default depends on a shared economic factor,
+    so bad years hit many deals at once. The portfolio's **expected shortfall** is allocated back to each deal by
+    its share of losses in the worst scenarios (Euler allocation), and each deal is re-scored with that capital.
+    """)
+
+    with st.form("economic_capital_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            num_scenarios = st.selectbox("Number of Scenarios", options=[10_000, 100_000], index=0, format_func=lambda n: f"{n:,}")
+            seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+        with col2:
+            confidence = st.selectbox("Confidence Level", options=[0.99, 0.995, 0.999], index=2, format_func=lambda p: f"{p:.1%}")
+            lgd = st.number_input("Loss Given Default (%)", min_value=1.0, max_value=100.0, value=45.0, step=1.0) / 100.0
+        with col3:
+            correlation = st.selectbox("Asset Correlation", options=["Basel IRB (by PD)", "Constant"])
+            constant_correlation = st.number_input("Constant Correlation (%)", min_value=0.0, max_value=99.0, value=15.0, step=1.0) / 100.0
+        capital_measure = st.radio("Capital Measure", options=['es', 'var'], horizontal=True,
+                                   format_func={'es': "Expected Shortfall", 'var': "Value at Risk"}.get)
+        submitted = st.form_submit_button("Run Economic Capital Simulation")
+
+    jobs = st.session_state.background_jobs
+    if submitted:
+        columns = {col: np.array(scenario_store.column(col)) for col in ECONOMIC_CAPITAL_COLUMNS}
+        # A run still going with the previous settings is cancelled and replaced
+        jobs.submit("Economic capital simulation", run_economic_capital_job, columns, scenario_store.names(), scenario_store.cache_key,
+                    key='economic_capital', replace=True,
+                    lgd=lgd, asset_correlation=None if correlation.startswith("Basel") else constant_correlation,
+                    capital_measure=capital_measure, num_scenarios=num_scenarios, confidence=confidence, seed=int(seed))
+
+    job = jobs.get('economic_capital')
+    if job is None:
+        st.info("Set the simulation assumptions and click **Run Economic Capital Simulation**.")
+        return None
+    if not job.finished:
+        display_job_progress(job)
+        return None
+    if job.status == 'failed':
+        st.error(f"Cannot run simulation: {job.error}")
+        return None
+    if job.status == 'cancelled':
+        st.warning("The simulation was cancelled.")
+        return None
+
+    result = job.result()
+    summary, metrics, columns, confidence = result['summary'], result['metrics'], result['columns'], result['confidence']
+    if result['cache_key'] != scenario_store.cache_key:
+        st.caption(f"Results for the {len(result['names']):,} scenarios saved when this simulation was started; run it again to include later changes.")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Expected Loss", f"${summary['Model_Expected_Loss']:,.0f}")
+    with col2:
+        st.metric(f"VaR ({confidence:.1%})", f"${summary['VaR']:,.0f}")
+    with col3:
+        st.metric(f"Expected Shortfall ({confidence:.1%})", f"${summary['ES']:,.0f}")
+    with col4:
+        st.metric("Economic Capital", f"${summary['Economic_Capital']:,.0f}")
+
+    ul_capital = columns['Risk_Adjusted_Capital']
+    comparison = pd.DataFrame({
+        'Scenario Name': result['names'],
+        'UL Factor Capital': ul_capital,
+        'Economic Capital': metrics['Economic_Capital'],
+        'RARORAC (UL Factor)': columns['RARORAC'],
+        'RARORAC (Economic Capital)': metrics['RARORAC'],
+        'Deal Outcome (Economic Capital)': np.where(metrics['Meets_Hurdle'], 'Meets Hurdle Rate', 'Below Hurdle Rate'),
+    })
+    # Largest capital consumers first; only the top of the book is sent to the browser
+    top = comparison.iloc[np.argsort(-metrics['Economic_Capital'], kind='stable')[:50]]
+    st.dataframe(top)
+    reward = columns['Net_Risk_Adjusted_Reward'].sum()
+
+    def weighted_rarorac(capital):
+        # A book whose tail losses do not exceed its expected loss holds no capital to earn a return on
+        return f"{reward / capital:.2%}" if capital > 0 else "n/a (no capital)"
+
+    # The portfolio total, rather than the sum of the simulated per-deal contributions
+    st.info(f"💡 Capital-weighted RARORAC is {weighted_rarorac(ul_capital.sum())} with the UL factors and "
+            f"{weighted_rarorac(summary['Economic_Capital'])} with economic capital; "
+            f"{int(metrics['Meets_Hurdle'].sum()):,} of {len(comparison):,} scenarios meet their hurdle rate with economic capital.")
+    return summary
+
 def run_page3():
     st.header("Portfolio Quality Visualization")
     
@@ -50,6 +206,10 @@ def run_page3():
     
     st.markdown("Visualize portfolio risk/return distribution based on your saved scenarios, or explore with synthetic data.")
 
+    # Altair is loaded only once the page text has rendered
+    import altair as alt
+    from application_pages.portfolio_binning import portfolio_scatter_chart
+
     # Check if there are saved scenarios
     if st.session_state.saved_scenarios:
         st.subheader("Your Real Portfolio Analysis")
@@ -58,59 +218,93 @@ def run_page3():
         Each point represents one of your saved deal scenarios.
         """)
         
-        # Extract data from saved scenarios
-        portfolio_data = []
-        for scenario_name, scenario_data in st.session_state.saved_scenarios.items():
-            results = scenario_data["results"]
-            parameters = scenario_data["parameters"]
-            
-            # Use Expected Loss Rate as Risk Score and RARORAC as Return Ratio
-            risk_score = parameters.get("expected_loss_rate", 0)
-            return_ratio = results.get("RARORAC", 0)
-            
-            portfolio_data.append({
-                'Scenario_Name': scenario_name,
-                'Risk_Score': risk_score,
-                'Return_Ratio': return_ratio,
-                'Deal_Outcome': results.get("Deal_Outcome", "Unknown")
-            })
-        
-        df_real = pd.DataFrame(portfolio_data)
-        
-        # Create scatter plot with real data
-        chart_real = alt.Chart(df_real).mark_point(size=100).encode(
-            x=alt.X('Risk_Score', axis=alt.Axis(title='Risk Score (Expected Loss Rate)')),
-            y=alt.Y('Return_Ratio', axis=alt.Axis(title='Return Ratio (RARORAC)')),
-            color=alt.Color('Deal_Outcome', 
-                          scale=alt.Scale(range=['red', 'green']),
-                          legend=alt.Legend(title="Deal Outcome")),
-            tooltip=['Scenario_Name', 'Risk_Score', 'Return_Ratio', 'Deal_Outcome']
-        ).properties(
-            title='Your Portfolio Quality Distribution (From Saved Scenarios)',
-            width=600,
-            height=400
-        ).interactive()
-
-        st.altair_chart(chart_real, use_container_width=True)
+        scenario_store = st.session_state.saved_scenarios
+
+        def build_saved_portfolio_view():
+            with shared_metrics.timed("portfolio_frame"):
+                df_real = scenario_portfolio_frame(scenario_store)
+
+            # Create scatter plot with real data
+            with shared_metrics.timed("chart_build"):
+                chart_real = portfolio_scatter_chart(
+                    df_real, 'Risk_Score', 'Return_Ratio',
+                    x_title='Risk Score (Expected Loss Rate)',
+                    y_title='Return Ratio (RARORAC)',
+                    title='Your Portfolio Quality Distribution (From Saved Scenarios)',
+                    color=alt.Color('Deal_Outcome', 
+                                  scale=alt.Scale(domain=SCENARIO_OUTCOME_LABELS, range=['red', 'green', 'gray']),
+                                  legend=alt.Legend(title="Deal Outcome")),
+                    tooltip=['Scenario_Name', 'Risk_Score', 'Return_Ratio', 'Deal_Outcome'],
+                    point_size=100
+                )
+                spec = chart_real.to_json()
+
+            with shared_metrics.timed("portfolio_aggregation"):
+                outcomes = scenario_store.column('Deal_Outcome')
+                analytics = PortfolioAnalytics(
+                    scenario_store.column('loan_amount'),
+                    scenario_store.column('Net_Risk_Adjusted_Reward'),
+                    scenario_store.column('Risk_Adjusted_Capital'),
+                    outcomes == 'Meets Hurdle Rate',
+                    expected_loss_rate=scenario_store.column('expected_loss_rate'),
+                    groups={'Deal_Outcome': outcomes}
+                )
+                totals = analytics.totals()
+                breakdowns = {name: (analytics.by(name), analytics.group_hhi(name)) for name in analytics.group_names}
+            return {'spec': spec, 'totals': totals, 'breakdowns': breakdowns}
+
+        # The chart spec and aggregates are rebuilt only when the saved scenarios change
+        view = shared_view_cache.get_or_compute(('saved_portfolio',) + scenario_store.cache_key, build_saved_portfolio_view)
+
+        with shared_metrics.timed("chart_render"):
+            # The cached spec is kept as JSON text; Streamlit edits the dict it is given
+            st.vega_lite_chart(json.loads(view['spec']), use_container_width=True)
         
         # Portfolio Analysis
         st.subheader("Portfolio Performance Summary")
         
-        # Display summary statistics
+        # Display summary statistics, read from running aggregates the store updates on every save and delete
+        summary = scenario_store.summary
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Scenarios", len(df_real))
+            st.metric("Total Scenarios", summary.count)
         with col2:
-            meets_hurdle = len(df_real[df_real['Deal_Outcome'] == 'Meets Hurdle Rate'])
-            success_rate = (meets_hurdle / len(df_real)) * 100
+            success_rate = summary.success_rate * 100
             st.metric("Success Rate", f"{success_rate:.1f}%")
         with col3:
-            avg_rarorac = df_real['Return_Ratio'].mean()
+            avg_rarorac = summary.mean_rarorac
             st.metric("Avg RARORAC", f"{avg_rarorac:.2%}")
         with col4:
-            avg_risk = df_real['Risk_Score'].mean()
+            avg_risk = summary.mean_risk
             st.metric("Avg Risk", f"{avg_risk:.2%}")
+        st.caption(
+            f"RARORAC percentiles (approximate): 10th {summary.rarorac_quantile(0.1):.2%}, "
+            f"median {summary.rarorac_quantile(0.5):.2%}, 90th {summary.rarorac_quantile(0.9):.2%}"
+        )
             
+        # Capital-weighted view: large deals and capital-hungry deals count for more than small ones
+        st.subheader("Capital-Weighted Portfolio Analytics")
+        totals = view['totals']
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Capital-Weighted RARORAC", f"{totals['Capital_Weighted_RARORAC']:.2%}")
+        with col2:
+            st.metric("Exposure-Weighted RARORAC", f"{totals['Exposure_Weighted_RARORAC']:.2%}")
+        with col3:
+            st.metric("Total Exposure", f"${totals['Exposure']:,.0f}")
+        with col4:
+            st.metric("Single-Deal HHI", f"{totals['Deal_HHI']:.2f}")
+        breakdown = st.selectbox("Break down by", options=list(PORTFOLIO_BREAKDOWNS), format_func=PORTFOLIO_BREAKDOWNS.get)
+        groups, group_hhi = view['breakdowns'][breakdown]
+        st.caption("Capital-weighted RARORAC is total net risk-adjusted reward over total risk-adjusted capital. "
+                   f"The HHI (Herfindahl-Hirschman index) of exposure across these groups is {group_hhi:.2f}; it runs from "
+                   f"{1 / len(groups):.2f} (spread evenly over the groups in use) to 1.00 (all in one group). "
+                   "The single-deal HHI measures the same concentration deal by deal.")
+        st.dataframe(groups.rename(columns={breakdown: PORTFOLIO_BREAKDOWNS[breakdown]}))
+
+        st.markdown("---")
+        display_economic_capital_streamlit(scenario_store)
+
         # Portfolio Quality Assessment
         st.subheader("Portfolio Quality Assessment")
         
@@ -122,9 +316,9 @@ def run_page3():
             st.error("**Portfolio Needs Attention!** Too many deals fail to meet the hurdle rate.")
             
         # Risk-Return Analysis
-        high_risk_deals = len(df_real[df_real['Risk_Score'] > df_real['Risk_Score'].median()])
-        if high_risk_deals > len(df_real) * 0.6:
-            st.warning(f"**High Risk Concentration**: {high_risk_deals} out of {len(df_real)} deals are above median risk.")
+        high_risk_deals = summary.risk_sketch.count_above(summary.risk_quantile(0.5))
+        if high_risk_deals > summary.count * 0.6:
+            st.warning(f"**High Risk Concentration**: {high_risk_deals} out of {summary.count} deals are above median risk.")
             
         st.markdown("---")
         
@@ -157,11 +351,11 @@ def run_page3():
             num_deals = st.number_input(
                 label="Number of Deals",
                 min_value=10,
-                max_value=500,
+                max_value=2_000_000,
                 value=100,
                 step=10
             )
-            st.caption("More deals = better statistical representation")
+            st.caption("More deals = better statistical representation. Above 5,000 deals the chart shows deal density plus the sparse outliers.")
 
             risk_range = st.slider(
                 label="Risk Score Range",
@@ -187,31 +381,77 @@ def run_page3():
             skewed = st.checkbox("Generate Skewed Portfolio", value=False)
             st.caption("Toggle to see how skewed risk-taking affects portfolio quality")
 
-        # Generate portfolio data
-        portfolio_data = generate_portfolio_data(num_deals, risk_range, return_range, skewed)
-
-        # Create the scatter plot
-        chart = alt.Chart(portfolio_data).mark_point(opacity=0.6).encode(
-            x=alt.X('Risk_Score', axis=alt.Axis(title='Risk Score (Expected Loss Rate)')),
-            y=alt.Y('Return_Ratio', axis=alt.Axis(title='Return Ratio (RARORAC)')),
-            tooltip=['Risk_Score', 'Return_Ratio']
-        ).properties(
-            title=f'{"Skewed" if skewed else "Balanced"} Synthetic Portfolio Distribution ({num_deals} deals)',
-            width=600,
-            height=400
-        ).interactive()
-
-        st.altair_chart(chart, use_container_width=True)
+            seed = st.number_input(label="Random Seed", min_value=0, value=42, step=1)
+            st.caption("The same seed and parameters always produce the same portfolio")
+
+        def build_synthetic_view(context=None):
+            # Generate portfolio data
+            progress_callback = None
+            if context is not None:
+                progress_callback = lambda done, total: context.report(0.8 * done / total, f"{done // 2:,} of {total // 2:,} deals generated")
+            with shared_metrics.timed("synthetic_portfolio"):
+                portfolio_data = generate_portfolio_data(num_deals, risk_range, return_range, skewed, seed=int(seed),
+                                                         progress_callback=progress_callback)
+            shared_metrics.increment("synthetic_deals", num_deals)
+
+            # Create the scatter plot
+            if context is not None:
+                context.report(0.8, "Building chart")
+            with shared_metrics.timed("chart_build"):
+                chart = portfolio_scatter_chart(
+                    portfolio_data, 'Risk_Score', 'Return_Ratio',
+                    x_title='Risk Score (Expected Loss Rate)',
+                    y_title='Return Ratio (RARORAC)',
+                    title=f'{"Skewed" if skewed else "Balanced"} Synthetic Portfolio Distribution ({num_deals:,} deals)',
+                    tooltip=['Risk_Score', 'Return_Ratio'],
+                    opacity=0.6
+                )
+                spec = chart.to_json()
+            return {
+                'spec': spec,
+                'avg_risk': float(portfolio_data['Risk_Score'].mean()),
+                'avg_return': float(portfolio_data['Return_Ratio'].mean()),
+            }
+
+        # The same inputs and seed always give the same portfolio, so any session can reuse the view
+        view_key = ('synthetic_portfolio', int(num_deals), tuple(risk_range), tuple(return_range), bool(skewed), int(seed))
+        if num_deals < BACKGROUND_SYNTHETIC_DEALS:
+            view = shared_view_cache.get_or_compute(view_key, build_synthetic_view)
+        else:
+            # Large portfolios are built by a background job; a later rerun picks up its result
+            jobs = st.session_state.background_jobs
+            view = shared_view_cache.get(view_key)
+            job = jobs.get(view_key)
+            if view is None and job is not None and job.status == 'done':
+                view = job.result()
+            if view is None:
+                if job is None or job.finished:
+                    if job is not None and job.status == 'failed':
+                        st.error(f"Cannot generate portfolio: {job.error}")
+                    elif job is not None and job.status == 'cancelled':
+                        st.warning("Portfolio generation was cancelled.")
+                    st.info(f"{num_deals:,} deals take a while to generate, so they are built in the background "
+                            f"while you keep using the app.")
+                    if not st.button("Generate in Background"):
+                        return
+                    job = jobs.submit(f"Synthetic portfolio ({num_deals:,} deals)",
+                                      lambda context: shared_view_cache.get_or_compute(view_key, lambda: build_synthetic_view(context)),
+                                      key=view_key)
+                display_job_progress(job)
+                return
+
+        with shared_metrics.timed("chart_render"):
+            st.vega_lite_chart(json.loads(view['spec']), use_container_width=True)
         
         # Analysis of synthetic portfolio
         st.subheader("Synthetic Portfolio Analysis")
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            avg_risk = portfolio_data['Risk_Score'].mean()
+            avg_risk = view['avg_risk']
             st.metric("Average Risk", f"{avg_risk:.2%}")
         with col2:
-            avg_return = portfolio_data['Return_Ratio'].mean()
+            avg_return = view['avg_return']
             st.metric("Average Return", f"{avg_return:.2%}")
         with col3:
             risk_return_ratio = avg_return / avg_risk if avg_risk > 0 else 0
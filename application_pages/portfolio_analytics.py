@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+# Expected loss rate buckets used as the portfolio's risk grades
+RISK_BUCKET_EDGES = [0.0, 0.005, 0.01, 0.02, 0.05, 0.10]
+RISK_BUCKET_LABELS = ["0-0.5%", "0.5-1%", "1-2%", "2-5%", "5-10%", "10%+"]
+
+
+def risk_bucket_codes(expected_loss_rate, edges=RISK_BUCKET_EDGES):
+    """Index of each deal's risk bucket; negative rates go to the first bucket and NaN to the last."""
+    codes = np.searchsorted(np.asarray(edges, dtype=np.float64), np.asarray(expected_loss_rate, dtype=np.float64), side='right') - 1
+    return np.clip(codes, 0, len(edges) - 1).astype(np.int16)
+
+
+def _safe_ratio(numerator, denominator):
+    # Zero capital gives an infinite ratio, as in calculate_rarorac_metrics
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, np.inf, numerator / denominator)
+
+
+def herfindahl_index(weights):
+    """Herfindahl-Hirschman index of a set of non-negative weights: 1/n when equal, 1 when concentrated in one."""
+    weights = np.asarray(weights, dtype=np.float64)
+    total = weights.sum()
+    if total <= 0:
+        return float('nan')
+    shares = weights / total
+    return float(np.sum(shares * shares))
+
+
+class PortfolioAnalytics:
+    """Exposure- and capital-weighted portfolio metrics over columnar RARORAC results.
+
+    Takes the loan amount, Net_Risk_Adjusted_Reward and Risk_Adjusted_Capital of every
+    deal (as produced by calculate_rarorac_metrics or its batch version) plus any
+    grouping columns. Group labels are factorized once into integer codes, so every
+    group-by afterwards is a handful of np.bincount passes over the book.
+    """
+
+    def __init__(self, loan_amount, net_reward, capital, meets_hurdle, expected_loss_rate=None, groups=None):
+        self.loan_amount = np.asarray(loan_amount, dtype=np.float64)
+        self.net_reward = np.asarray(net_reward, dtype=np.float64)
+        self.capital = np.asarray(capital, dtype=np.float64)
+        self.meets_hurdle = np.asarray(meets_hurdle, dtype=np.bool_)
+        self._codes = {}
+        self._labels = {}
+        if expected_loss_rate is not None:
+            self._codes['Risk_Bucket'] = risk_bucket_codes(expected_loss_rate)
+            self._labels['Risk_Bucket'] = np.array(RISK_BUCKET_LABELS, dtype=object)
+        for name, values in (groups or {}).items():
+            codes, labels = pd.factorize(np.asarray(values), use_na_sentinel=False)
+            self._codes[name] = codes
+            self._labels[name] = np.asarray(labels, dtype=object)
+
+    @classmethod
+    def from_frame(cls, df, group_columns=()):
+        """Builds the engine from a DataFrame of scored deals (score_deals_frame output joined to its inputs)."""
+        return cls(
+            df['loan_amount'].to_numpy(),
+            df['Net_Risk_Adjusted_Reward'].to_numpy(),
+            df['Risk_Adjusted_Capital'].to_numpy(),
+            df['Meets_Hurdle'].to_numpy() if 'Meets_Hurdle' in df else (df['Deal_Outcome'] == 'Meets Hurdle Rate').to_numpy(),
+            expected_loss_rate=df['expected_loss_rate'].to_numpy() if 'expected_loss_rate' in df else None,
+            groups={col: df[col].to_numpy() for col in group_columns}
+        )
+
+    @property
+    def group_names(self):
+        return list(self._codes)
+
+    def totals(self):
+        """Book-level weighted RARORAC, exposure and concentration figures."""
+        exposure = self.loan_amount.sum()
+        deal_rarorac = _safe_ratio(self.net_reward, self.capital)
+        # Zero-capital deals have no finite RARORAC to weight, so they are left out of the exposure weighting
+        finite = np.isfinite(deal_rarorac)
+        finite_exposure = self.loan_amount[finite].sum()
+        if finite_exposure:
+            exposure_weighted = float(np.sum(self.loan_amount[finite] * deal_rarorac[finite]) / finite_exposure)
+        else:
+            exposure_weighted = float('nan')
+        totals = {
+            'Deals': int(self.loan_amount.size),
+            'Exposure': float(exposure),
+            'Risk_Adjusted_Capital': float(self.capital.sum()),
+            'Net_Risk_Adjusted_Reward': float(self.net_reward.sum()),
+            # Capital-weighted mean of deal RARORACs is the ratio of the sums
+            'Capital_Weighted_RARORAC': float(_safe_ratio(self.net_reward.sum(), self.capital.sum())),
+            'Exposure_Weighted_RARORAC': exposure_weighted,
+            'Success_Rate': float(self.meets_hurdle.mean()) if self.meets_hurdle.size else float('nan'),
+            'Deal_HHI': herfindahl_index(self.loan_amount),
+        }
+        if 'Risk_Bucket' in self._codes:
+            totals['Risk_Bucket_HHI'] = herfindahl_index(np.bincount(self._codes['Risk_Bucket'], weights=self.loan_amount))
+        return totals
+
+    def by(self, group):
+        """Group-by summary: deals, exposure, capital, reward, weighted RARORAC, success rate and exposure share."""
+        codes = self._codes[group]
+        labels = self._labels[group]
+        size = len(labels)
+        deals = np.bincount(codes, minlength=size)
+        exposure = np.bincount(codes, weights=self.loan_amount, minlength=size)
+        capital = np.bincount(codes, weights=self.capital, minlength=size)
+        reward = np.bincount(codes, weights=self.net_reward, minlength=size)
+        meets = np.bincount(codes, weights=self.meets_hurdle, minlength=size)
+        total_exposure = exposure.sum()
+        df = pd.DataFrame({
+            group: labels,
+            'Deals': deals,
+            'Exposure': exposure,
+            'Exposure_Share': exposure / total_exposure if total_exposure else np.nan,
+            'Risk_Adjusted_Capital': capital,
+            'Net_Risk_Adjusted_Reward': reward,
+            'Capital_Weighted_RARORAC': _safe_ratio(reward, capital),
+            'Success_Rate': _safe_ratio(meets, deals),
+        })
+        # Buckets with no deals are kept out of the table
+        return df[deals > 0].reset_index(drop=True)
+
+    def group_hhi(self, group):
+        """Concentration of exposure across the groups of one grouping column."""
+        return herfindahl_index(np.bincount(self._codes[group], weights=self.loan_amount, minlength=len(self._labels[group])))
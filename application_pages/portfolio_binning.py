@@ -0,0 +1,83 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# Above this many deals the scatter switches to binned density; matches Altair's default row limit
+BINNING_THRESHOLD = 5000
+DEFAULT_BINS = 60
+MAX_OUTLIER_POINTS = 500
+# Deals in bins holding this many deals or fewer are drawn individually as outliers
+SPARSE_BIN_COUNT = 2
+
+
+def bin_portfolio(x_values, y_values, bins=DEFAULT_BINS):
+    """Counts deals on a bins x bins grid over the finite range of the data.
+
+    Returns (bin_frame, x_edges, y_edges); bin_frame has one row per non-empty bin
+    with its edges and Count, so its size is bounded by bins ** 2, not the deal count.
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    finite = np.isfinite(x_values) & np.isfinite(y_values)
+    counts, x_edges, y_edges = np.histogram2d(x_values[finite], y_values[finite], bins=bins)
+    x_index, y_index = np.nonzero(counts)
+    bin_frame = pd.DataFrame({
+        'x_start': x_edges[x_index],
+        'x_end': x_edges[x_index + 1],
+        'y_start': y_edges[y_index],
+        'y_end': y_edges[y_index + 1],
+        'Count': counts[x_index, y_index].astype(np.int64),
+    })
+    return bin_frame, x_edges, y_edges
+
+
+def sample_outliers(df, x, y, x_edges, y_edges, max_points=MAX_OUTLIER_POINTS, sparse_bin_count=SPARSE_BIN_COUNT, seed=0):
+    """Picks the deals that sit in sparse bins, reproducibly sampled down to max_points."""
+    x_values = df[x].to_numpy(dtype=np.float64)
+    y_values = df[y].to_numpy(dtype=np.float64)
+    finite = np.isfinite(x_values) & np.isfinite(y_values)
+    x_bin = np.clip(np.searchsorted(x_edges, x_values[finite], side='right') - 1, 0, len(x_edges) - 2)
+    y_bin = np.clip(np.searchsorted(y_edges, y_values[finite], side='right') - 1, 0, len(y_edges) - 2)
+    flat_bin = x_bin * (len(y_edges) - 1) + y_bin
+    bin_counts = np.bincount(flat_bin, minlength=(len(x_edges) - 1) * (len(y_edges) - 1))
+
+    candidates = np.flatnonzero(finite)[bin_counts[flat_bin] <= sparse_bin_count]
+    if len(candidates) > max_points:
+        candidates = np.sort(np.random.default_rng(seed).choice(candidates, size=max_points, replace=False))
+    return df.iloc[candidates]
+
+
+def portfolio_scatter_chart(df, x, y, x_title, y_title, title, color=None, tooltip=None, point_size=None, opacity=None, threshold=BINNING_THRESHOLD, bins=DEFAULT_BINS):
+    """Risk/return scatter that embeds raw points for small portfolios and binned density plus outliers for large ones."""
+    x_axis = alt.Axis(title=x_title)
+    y_axis = alt.Axis(title=y_title)
+    point_kwargs = {}
+    if point_size is not None:
+        point_kwargs['size'] = point_size
+    if opacity is not None:
+        point_kwargs['opacity'] = opacity
+
+    def points(data):
+        encoding = {'x': alt.X(x, axis=x_axis), 'y': alt.Y(y, axis=y_axis)}
+        if color is not None:
+            encoding['color'] = color
+        if tooltip is not None:
+            encoding['tooltip'] = tooltip
+        return alt.Chart(data).mark_point(**point_kwargs).encode(**encoding)
+
+    if len(df) <= threshold:
+        return points(df).properties(title=title, width=600, height=400).interactive()
+
+    bin_frame, x_edges, y_edges = bin_portfolio(df[x], df[y], bins=bins)
+    density = alt.Chart(bin_frame).mark_rect().encode(
+        x=alt.X('x_start:Q', axis=x_axis),
+        x2='x_end:Q',
+        y=alt.Y('y_start:Q', axis=y_axis),
+        y2='y_end:Q',
+        color=alt.Color('Count:Q', scale=alt.Scale(type='log', scheme='blues'), legend=alt.Legend(title='Deals per Bin')),
+        tooltip=[alt.Tooltip('Count:Q', title='Deals')]
+    )
+    outliers = points(sample_outliers(df, x, y, x_edges, y_edges))
+    return alt.layer(density, outliers).resolve_scale(color='independent').properties(
+        title=f'{title} (binned, sparse deals shown individually)', width=600, height=400
+    ).interactive()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from application_pages.deal_ingest import open_frame_writer
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Default ranges for the synthetic deal inputs, all as decimals except the dollar amounts
+DEFAULT_LOAN_AMOUNT_RANGE = (100_000, 50_000_000)
+DEFAULT_INTEREST_RATE_RANGE = (0.02, 0.12)
+DEFAULT_FEE_RATE_RANGE = (0.0, 0.01)
+DEFAULT_OPERATING_COST_RANGE = (0.05, 0.30)
+DEFAULT_EXPECTED_LOSS_RANGE = (0.001, 0.08)
+DEFAULT_UL_CAPITAL_RANGE = (0.04, 0.20)
+DEFAULT_HURDLE_RATE = 0.10
+
+
+def _root_seed(seed):
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+def chunk_generator(seed, chunk_index):
+    """Random generator for one chunk, derived from the root seed and the chunk's index.
+
+    Any process can rebuild the stream for chunk i on its own, so chunks can be generated
+    in parallel or out of order and still match a sequential run with the same seed.
+    """
+    root = _root_seed(seed)
+    return np.random.default_rng(np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (chunk_index,)))
+
+
+def _scaled(draws, value_range):
+    return value_range[0] + draws * (value_range[1] - value_range[0])
+
+
+def generate_deal_chunk(rng, start, size, skewed=False, expected_loss_range=DEFAULT_EXPECTED_LOSS_RANGE,
+                        interest_rate_range=DEFAULT_INTEREST_RATE_RANGE, hurdle_rate=DEFAULT_HURDLE_RATE):
+    """Builds `size` synthetic deal records with the seven calculator inputs and a deal_id."""
+    # Log-uniform loan sizes: many small facilities and a long tail of large ones
+    log_low, log_high = np.log(DEFAULT_LOAN_AMOUNT_RANGE)
+    loan_amount = np.exp(rng.uniform(log_low, log_high, size))
+    if skewed:
+        # Risk-insensitive pricing: losses pile up near the top of the range while rates stay low
+        expected_loss_rate = _scaled(rng.beta(8, 2, size), expected_loss_range)
+        interest_rate = _scaled(rng.beta(2, 8, size), interest_rate_range)
+    else:
+        expected_loss_rate = rng.uniform(*expected_loss_range, size)
+        interest_rate = rng.uniform(*interest_rate_range, size)
+
+    return pd.DataFrame({
+        'deal_id': np.arange(start, start + size, dtype=np.int64),
+        'loan_amount': np.round(loan_amount, 2),
+        'interest_rate': interest_rate,
+        'fees': np.round(loan_amount * rng.uniform(*DEFAULT_FEE_RATE_RANGE, size), 2),
+        'operating_cost_ratio': rng.uniform(*DEFAULT_OPERATING_COST_RANGE, size),
+        'expected_loss_rate': expected_loss_rate,
+        'ul_capital_factor': rng.uniform(*DEFAULT_UL_CAPITAL_RANGE, size),
+        'hurdle_rate': np.full(size, hurdle_rate),
+    })
+
+
+def iter_synthetic_deals(num_deals, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, skewed=False, **deal_options):
+    """Yields a synthetic book of num_deals deals in DataFrames of at most chunk_size rows.
+
+    Only one chunk is in memory at a time, so books far larger than RAM can be streamed
+    to disk or straight into the scoring engine. The same seed and chunk size always
+    reproduce the same deals.
+    """
+    if num_deals < 0 or chunk_size <= 0:
+        raise ValueError("Number of deals must be non-negative and chunk size positive.")
+    root = _root_seed(seed)
+    for chunk_index, start in enumerate(range(0, num_deals, chunk_size)):
+        size = min(chunk_size, num_deals - start)
+        yield generate_deal_chunk(chunk_generator(root, chunk_index), start, size, skewed=skewed, **deal_options)
+
+
+def write_synthetic_portfolio(path, num_deals, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, skewed=False, progress_callback=None, **deal_options):
+    """Streams a synthetic book to a CSV or Parquet file chunk by chunk; returns the root seed's entropy."""
+    root = _root_seed(seed)
+    writer = open_frame_writer(path, empty_columns=['deal_id'] + RARORAC_INPUT_COLUMNS)
+    written = 0
+    try:
+        for chunk in iter_synthetic_deals(num_deals, root, chunk_size, skewed, **deal_options):
+            writer.write(chunk)
+            written += len(chunk)
+            if progress_callback is not None:
+                progress_callback(written)
+    finally:
+        writer.close()
+    return root.entropy
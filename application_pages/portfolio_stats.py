@@ -0,0 +1,215 @@
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Magnitudes below this are counted as exact zeros by the sketch
+MIN_INDEXABLE_VALUE = 1e-12
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch (DDSketch-style) that supports deletes.
+
+    Values are counted in logarithmic buckets, so any quantile is within
+    relative_accuracy of a true data value and memory depends on the spread of
+    the values, not on how many were added. Unlike most sketches, removing a value
+    just decrements its bucket, which lets the portfolio summary follow deletes.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = defaultdict(int)
+        self._negative = defaultdict(int)
+        self._zero = 0
+        self._positive_inf = 0
+        self._negative_inf = 0
+        self.count = 0
+
+    def _key(self, magnitude):
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key):
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def _update(self, value, delta):
+        if value is None or math.isnan(value):
+            return
+        if value == math.inf:
+            self._positive_inf += delta
+        elif value == -math.inf:
+            self._negative_inf += delta
+        elif abs(value) < MIN_INDEXABLE_VALUE:
+            self._zero += delta
+        else:
+            store = self._positive if value > 0 else self._negative
+            key = self._key(abs(value))
+            store[key] += delta
+            if store[key] <= 0:
+                del store[key]
+        self.count += delta
+
+    def add(self, value):
+        self._update(value, 1)
+
+    def remove(self, value):
+        """Removes a value previously added; removing a value that was never added corrupts the counts."""
+        self._update(value, -1)
+
+    def add_many(self, values):
+        """Adds an array of values in one pass, e.g. when loading saved scenarios."""
+        self._update_many(values, 1)
+
+    def remove_many(self, values):
+        """Removes an array of values previously added, e.g. when a bulk import overwrites scenarios."""
+        self._update_many(values, -1)
+
+    def _update_many(self, values, delta):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._positive_inf += delta * int(np.sum(values == np.inf))
+        self._negative_inf += delta * int(np.sum(values == -np.inf))
+        finite = values[np.isfinite(values)]
+        is_zero = np.abs(finite) < MIN_INDEXABLE_VALUE
+        self._zero += delta * int(np.sum(is_zero))
+        finite = finite[~is_zero]
+        for store, magnitudes in ((self._positive, finite[finite > 0]), (self._negative, -finite[finite < 0])):
+            # Bucket with the same scalar math as add() so a later remove() always finds its bucket
+            for key, count in Counter(map(self._key, magnitudes.tolist())).items():
+                store[key] += delta * count
+                if store[key] <= 0:
+                    del store[key]
+        self.count += delta * len(values)
+
+    def _ordered_buckets(self):
+        """(representative value, count) pairs from the smallest value to the largest."""
+        if self._negative_inf:
+            yield -math.inf, self._negative_inf
+        for key in sorted(self._negative, reverse=True):
+            yield -self._value(key), self._negative[key]
+        if self._zero:
+            yield 0.0, self._zero
+        for key in sorted(self._positive):
+            yield self._value(key), self._positive[key]
+        if self._positive_inf:
+            yield math.inf, self._positive_inf
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), or NaN if the sketch is empty."""
+        if self.count <= 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self._ordered_buckets():
+            seen += count
+            if seen > rank:
+                return value
+        return math.inf if self._positive_inf else value
+
+    def count_above(self, threshold):
+        """Approximate number of values strictly greater than threshold."""
+        return sum(count for value, count in self._ordered_buckets() if value > threshold)
+
+
+class PortfolioSummary:
+    """Running aggregates of the saved scenarios, updated one scenario at a time.
+
+    Keeps counts, sums and quantile sketches so the Portfolio Quality summary can be
+    read without scanning every scenario on each rerun.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.count = 0
+        self.meets_hurdle = 0
+        self._risk_sum = 0.0
+        self._risk_count = 0
+        self._rarorac_sum = 0.0
+        self._rarorac_count = 0
+        self._rarorac_positive_inf = 0
+        self._rarorac_negative_inf = 0
+        self.risk_sketch = QuantileSketch(relative_accuracy)
+        self.rarorac_sketch = QuantileSketch(relative_accuracy)
+
+    def _update(self, risk_score, rarorac, meets_hurdle, delta):
+        self.count += delta
+        self.meets_hurdle += delta if meets_hurdle else 0
+        if not math.isnan(risk_score):
+            self._risk_sum += delta * risk_score
+            self._risk_count += delta
+        if rarorac == math.inf:
+            self._rarorac_positive_inf += delta
+        elif rarorac == -math.inf:
+            self._rarorac_negative_inf += delta
+        elif not math.isnan(rarorac):
+            self._rarorac_sum += delta * rarorac
+            self._rarorac_count += delta
+        if delta > 0:
+            self.risk_sketch.add(risk_score)
+            self.rarorac_sketch.add(rarorac)
+        else:
+            self.risk_sketch.remove(risk_score)
+            self.rarorac_sketch.remove(rarorac)
+
+    def add(self, risk_score, rarorac, meets_hurdle):
+        self._update(float(risk_score), float(rarorac), bool(meets_hurdle), 1)
+
+    def remove(self, risk_score, rarorac, meets_hurdle):
+        self._update(float(risk_score), float(rarorac), bool(meets_hurdle), -1)
+
+    def add_many(self, risk_scores, raroracs, meets_hurdle):
+        """Adds a block of scenarios at once from arrays."""
+        self._update_many(risk_scores, raroracs, meets_hurdle, 1)
+
+    def remove_many(self, risk_scores, raroracs, meets_hurdle):
+        """Removes a block of scenarios previously added, from arrays."""
+        self._update_many(risk_scores, raroracs, meets_hurdle, -1)
+
+    def _update_many(self, risk_scores, raroracs, meets_hurdle, delta):
+        risk_scores = np.asarray(risk_scores, dtype=np.float64)
+        raroracs = np.asarray(raroracs, dtype=np.float64)
+        self.count += delta * len(risk_scores)
+        self.meets_hurdle += delta * int(np.sum(meets_hurdle))
+        known_risk = risk_scores[~np.isnan(risk_scores)]
+        self._risk_sum += delta * float(np.sum(known_risk))
+        self._risk_count += delta * len(known_risk)
+        self._rarorac_positive_inf += delta * int(np.sum(raroracs == np.inf))
+        self._rarorac_negative_inf += delta * int(np.sum(raroracs == -np.inf))
+        finite_rarorac = raroracs[np.isfinite(raroracs)]
+        self._rarorac_sum += delta * float(np.sum(finite_rarorac))
+        self._rarorac_count += delta * len(finite_rarorac)
+        self.risk_sketch._update_many(risk_scores, delta)
+        self.rarorac_sketch._update_many(raroracs, delta)
+
+    def clear(self):
+        self.__init__(self.relative_accuracy)
+
+    @property
+    def success_rate(self):
+        """Share of scenarios meeting the hurdle rate, 0-1."""
+        return self.meets_hurdle / self.count if self.count else 0.0
+
+    @property
+    def mean_risk(self):
+        return self._risk_sum / self._risk_count if self._risk_count else math.nan
+
+    @property
+    def mean_rarorac(self):
+        # Infinite RARORACs (zero capital) dominate the mean, as they would in pandas
+        if self._rarorac_positive_inf and self._rarorac_negative_inf:
+            return math.nan
+        if self._rarorac_positive_inf:
+            return math.inf
+        if self._rarorac_negative_inf:
+            return -math.inf
+        return self._rarorac_sum / self._rarorac_count if self._rarorac_count else math.nan
+
+    def risk_quantile(self, q):
+        return self.risk_sketch.quantile(q)
+
+    def rarorac_quantile(self, q):
+        return self.rarorac_sketch.quantile(q)
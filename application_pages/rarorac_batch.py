@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# Column order of the seven calculator inputs, matching calculate_rarorac_metrics
+RARORAC_INPUT_COLUMNS = [
+    'loan_amount',
+    'interest_rate',
+    'fees',
+    'operating_cost_ratio',
+    'expected_loss_rate',
+    'ul_capital_factor',
+    'hurdle_rate',
+]
+
+RARORAC_RESULT_COLUMNS = [
+    'Income_From_Deal',
+    'Operating_Costs',
+    'Expected_Loss',
+    'Net_Risk_Adjusted_Reward',
+    'Risk_Adjusted_Capital',
+    'RARORAC',
+    'Meets_Hurdle',
+]
+
+# Index 0 = fails the hurdle, index 1 = meets it, so Meets_Hurdle can be used as codes
+DEAL_OUTCOMES = ['Below Hurdle Rate', 'Meets Hurdle Rate']
+
+
+def calculate_rarorac_metrics_batch(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate):
+    """Computes RARORAC metrics for whole arrays of deals in one vectorized pass."""
+    loan_amount = np.asarray(loan_amount, dtype=np.float64)
+    interest_rate = np.asarray(interest_rate, dtype=np.float64)
+    fees = np.asarray(fees, dtype=np.float64)
+    operating_cost_ratio = np.asarray(operating_cost_ratio, dtype=np.float64)
+    expected_loss_rate = np.asarray(expected_loss_rate, dtype=np.float64)
+    ul_capital_factor = np.asarray(ul_capital_factor, dtype=np.float64)
+    hurdle_rate = np.asarray(hurdle_rate, dtype=np.float64)
+
+    Income_From_Deal = loan_amount * interest_rate + fees
+    Operating_Costs = Income_From_Deal * operating_cost_ratio
+    Expected_Loss = loan_amount * expected_loss_rate
+    Net_Risk_Adjusted_Reward = Income_From_Deal - Operating_Costs - Expected_Loss
+    Risk_Adjusted_Capital = loan_amount * ul_capital_factor
+
+    # Same rule as the scalar calculator: zero capital gives an infinite RARORAC
+    zero_capital = Risk_Adjusted_Capital == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        RARORAC = Net_Risk_Adjusted_Reward / Risk_Adjusted_Capital
+    RARORAC = np.where(zero_capital, np.inf, RARORAC)
+
+    Meets_Hurdle = RARORAC >= hurdle_rate
+
+    return {
+        'Income_From_Deal': Income_From_Deal,
+        'Operating_Costs': Operating_Costs,
+        'Expected_Loss': Expected_Loss,
+        'Net_Risk_Adjusted_Reward': Net_Risk_Adjusted_Reward,
+        'Risk_Adjusted_Capital': Risk_Adjusted_Capital,
+        'RARORAC': RARORAC,
+        'Meets_Hurdle': Meets_Hurdle
+    }
+
+
+def deal_outcome_labels(meets_hurdle):
+    """Maps a boolean hurdle array to the calculator's Deal_Outcome labels as a categorical."""
+    codes = np.asarray(meets_hurdle, dtype=np.int8)
+    return pd.Categorical.from_codes(codes, categories=DEAL_OUTCOMES)
+
+
+def check_deal_columns(deals):
+    """Raises a ValueError if any of the seven calculator inputs is missing from a DataFrame."""
+    missing = [col for col in RARORAC_INPUT_COLUMNS if col not in deals.columns]
+    if missing:
+        raise ValueError(f"Deals are missing required columns: {', '.join(missing)}")
+
+
+def score_deals_frame(deals):
+    """Scores a DataFrame holding the seven calculator inputs and returns the results as columns."""
+    if not isinstance(deals, pd.DataFrame):
+        raise TypeError("Deals must be a pandas DataFrame.")
+    check_deal_columns(deals)
+
+    metrics = calculate_rarorac_metrics_batch(*(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS))
+    return metrics_to_frame(metrics, index=deals.index)
+
+
+def metrics_to_frame(metrics, index=None):
+    """Wraps columnar batch results in a DataFrame and adds the Deal_Outcome labels."""
+    results = pd.DataFrame(metrics, index=index, copy=False)
+    results['Deal_Outcome'] = deal_outcome_labels(metrics['Meets_Hurdle'])
+    return results
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+from application_pages.instrumentation import shared_metrics
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL_SECONDS = 3600
+
+
+def normalize_rarorac_params(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate):
+    """Builds the cache key for one deal: the seven calculator inputs as a tuple of floats."""
+    return (
+        float(loan_amount),
+        float(interest_rate),
+        float(fees),
+        float(operating_cost_ratio),
+        float(expected_loss_rate),
+        float(ul_capital_factor),
+        float(hurdle_rate),
+    )
+
+
+class RaroracResultCache:
+    """Thread-safe LRU cache with a time-to-live for calculator results, keyed on normalized deal parameters."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        if max_entries <= 0:
+            raise ValueError("Cache size must be positive.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_compute(self, params, compute):
+        """Returns the cached result for params, calling compute(*params) on a miss."""
+        key = normalize_rarorac_params(*params)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if self.ttl_seconds is None or now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(result)
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Compute outside the lock so concurrent sessions do not serialize on the formulas
+        result = compute(*key)
+
+        with self._lock:
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        # Callers get their own copy so a session cannot mutate the shared entry
+        return dict(result)
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def stats(self):
+        """Returns the current size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'Entries': len(self._entries),
+                'Max_Entries': self.max_entries,
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Evictions': self.evictions,
+                'Expirations': self.expirations,
+                'Hit_Rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# Module state lives for the whole server process, so every Streamlit session shares this cache
+shared_rarorac_cache = RaroracResultCache()
+shared_metrics.register_cache("rarorac_results", shared_rarorac_cache.stats)
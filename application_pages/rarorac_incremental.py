@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import DEAL_OUTCOMES, RARORAC_INPUT_COLUMNS, RARORAC_RESULT_COLUMNS, check_deal_columns, metrics_to_frame
+
+
+def _ratio(reward, capital):
+    # Same rule as the calculators: zero capital gives an infinite RARORAC
+    if np.ndim(capital) == 0:
+        return float('inf') if capital == 0 else reward / capital
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = reward / capital
+    return np.where(capital == 0, np.inf, ratio)
+
+
+# Every intermediate of the RARORAC calculation: the values it reads and how it is computed.
+# Listed in evaluation order, so each formula only reads inputs or formulas above it.
+RARORAC_FORMULAS = {
+    'Income_From_Deal': (('loan_amount', 'interest_rate', 'fees'), lambda loan, rate, fees: loan * rate + fees),
+    'Operating_Costs': (('Income_From_Deal', 'operating_cost_ratio'), lambda income, ratio: income * ratio),
+    'Expected_Loss': (('loan_amount', 'expected_loss_rate'), lambda loan, rate: loan * rate),
+    'Net_Risk_Adjusted_Reward': (('Income_From_Deal', 'Operating_Costs', 'Expected_Loss'),
+                                 lambda income, costs, loss: income - costs - loss),
+    'Risk_Adjusted_Capital': (('loan_amount', 'ul_capital_factor'), lambda loan, factor: loan * factor),
+    'RARORAC': (('Net_Risk_Adjusted_Reward', 'Risk_Adjusted_Capital'), _ratio),
+    'Meets_Hurdle': (('RARORAC', 'hurdle_rate'), lambda rarorac, hurdle: rarorac >= hurdle),
+}
+
+
+def invalidated_metrics(changed):
+    """Metrics that depend, directly or through other metrics, on any of the changed inputs, in evaluation order."""
+    dirty = set(changed)
+    invalidated = []
+    for name, (reads, _) in RARORAC_FORMULAS.items():
+        if dirty.intersection(reads):
+            dirty.add(name)
+            invalidated.append(name)
+    return invalidated
+
+
+class IncrementalRarorac:
+    """RARORAC results that recompute only what an input change invalidates.
+
+    Holds the seven inputs and every intermediate of the formula (income, costs,
+    expected loss, reward, capital, RARORAC and the hurdle test). update() re-evaluates
+    just the intermediates downstream of the inputs that changed: a new hurdle rate
+    re-runs one comparison, a new fee re-runs income, costs, reward, RARORAC and the
+    hurdle test, and so on.
+
+    Inputs may be scalars (one deal, as on the calculator page) or 1-D arrays of a
+    book; metrics then matches calculate_rarorac_metrics or calculate_rarorac_metrics_batch
+    respectively. With arrays, update(rows=...) re-evaluates only those deals.
+    """
+
+    def __init__(self, loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate):
+        self._set_inputs(dict(zip(RARORAC_INPUT_COLUMNS, (
+            loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate
+        ))))
+        self._evaluate(list(RARORAC_FORMULAS))
+
+    @classmethod
+    def from_params(cls, params):
+        """Builds the engine from a dict of the seven inputs, e.g. the calculator's current parameters."""
+        return cls(*(params[col] for col in RARORAC_INPUT_COLUMNS))
+
+    @classmethod
+    def from_frame(cls, deals):
+        """Builds the engine from a DataFrame holding the seven calculator inputs as columns."""
+        if not isinstance(deals, pd.DataFrame):
+            raise TypeError("Deals must be a pandas DataFrame.")
+        check_deal_columns(deals)
+        return cls(*(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS))
+
+    @classmethod
+    def from_results(cls, inputs, results):
+        """Wraps results that were already computed (a metrics dict or a scored frame) without recomputing them.
+
+        results may use the scalar layout (Deal_Outcome labels) or the batch layout (Meets_Hurdle).
+        """
+        engine = cls.__new__(cls)
+        engine._set_inputs(inputs)
+        for name in RARORAC_FORMULAS:
+            if name == 'Meets_Hurdle' and 'Meets_Hurdle' not in results:
+                value = np.asarray(results['Deal_Outcome']) == DEAL_OUTCOMES[1]
+            else:
+                value = np.asarray(results[name])
+            engine._values[name] = value.item() if engine._scalar else value
+        return engine
+
+    def _set_inputs(self, inputs):
+        self._values = {name: self._input(inputs[name]) for name in RARORAC_INPUT_COLUMNS}
+        self._scalar = all(np.ndim(self._values[name]) == 0 for name in RARORAC_INPUT_COLUMNS)
+        self._size = None if self._scalar else np.broadcast_shapes(*(np.shape(self._values[name]) for name in RARORAC_INPUT_COLUMNS))
+        # Columns that are arrays this engine allocated itself
+        self._owned = set()
+        # How many times each intermediate has been evaluated, whole or by rows
+        self.evaluations = dict.fromkeys(RARORAC_FORMULAS, 0)
+
+    def _input(self, value):
+        if np.ndim(value) == 0:
+            return float(value)
+        return np.asarray(value, dtype=np.float64)
+
+    def __len__(self):
+        return 1 if self._scalar else self._size[0]
+
+    @property
+    def inputs(self):
+        return {name: self._values[name] for name in RARORAC_INPUT_COLUMNS}
+
+    @property
+    def metrics(self):
+        """Current results, in the layout of calculate_rarorac_metrics (scalar inputs) or its batch version."""
+        results = {name: self._values[name] for name in RARORAC_RESULT_COLUMNS}
+        if self._scalar:
+            results['Deal_Outcome'] = DEAL_OUTCOMES[1] if results.pop('Meets_Hurdle') else DEAL_OUTCOMES[0]
+        return results
+
+    def to_frame(self, index=None):
+        """Batch results as a DataFrame with Deal_Outcome labels, as score_deals_frame returns them."""
+        if self._scalar:
+            raise ValueError("to_frame needs a book of deals, not a single deal.")
+        return metrics_to_frame({name: np.broadcast_to(self._values[name], self._size) for name in RARORAC_RESULT_COLUMNS}, index=index)
+
+    def update(self, rows=None, **changes):
+        """Sets new input values and recomputes what depends on them; returns the metrics re-evaluated.
+
+        Without rows, each change replaces a whole input (a scalar applies to every deal).
+        With rows (an index or boolean mask into the book), the changes are written into
+        those deals only and only those deals are re-evaluated.
+        """
+        unknown = [name for name in changes if name not in RARORAC_INPUT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown inputs: {', '.join(unknown)}")
+        if rows is not None and self._scalar:
+            raise ValueError("Rows can only be given for a book of deals.")
+
+        changed = []
+        for name, value in changes.items():
+            if rows is None:
+                value = self._input(value)
+                current = self._values[name]
+                if np.ndim(value) == 0 and np.ndim(current) == 0 and (value == current or (value != value and current != current)):
+                    continue
+                if np.ndim(value) and (self._scalar or np.shape(value) != self._size):
+                    raise ValueError(f"'{name}' must be a single value or one value per deal.")
+                self._values[name] = value
+                self._owned.discard(name)
+            else:
+                self._values[name] = self._writable(name)
+                self._values[name][rows] = value
+            changed.append(name)
+
+        invalidated = invalidated_metrics(changed)
+        self._evaluate(invalidated, rows)
+        return invalidated
+
+    def _writable(self, name):
+        """The named column as a full-length array this engine owns and can write rows into.
+
+        Arrays passed in by the caller are copied the first time a row of them changes,
+        so updates never write into the caller's data.
+        """
+        if name not in self._owned:
+            self._values[name] = np.array(np.broadcast_to(self._values[name], self._size))
+            self._owned.add(name)
+        return self._values[name]
+
+    def _evaluate(self, names, rows=None):
+        for name in names:
+            reads, formula = RARORAC_FORMULAS[name]
+            if rows is None:
+                self._values[name] = formula(*(self._values[read] for read in reads))
+                if np.ndim(self._values[name]):
+                    self._owned.add(name)
+            else:
+                arguments = [np.broadcast_to(self._values[read], self._size)[rows] for read in reads]
+                self._values[name] = self._writable(name)
+                self._values[name][rows] = formula(*arguments)
+            self.evaluations[name] += 1
@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import (
+    RARORAC_INPUT_COLUMNS,
+    RARORAC_RESULT_COLUMNS,
+    calculate_rarorac_metrics_batch,
+    check_deal_columns,
+    metrics_to_frame,
+)
+
+# Below this many deals per worker, process start-up and copying cost more than they save
+MIN_ROWS_PER_WORKER = 250_000
+
+_FLOAT_RESULT_COLUMNS = [col for col in RARORAC_RESULT_COLUMNS if col != 'Meets_Hurdle']
+
+
+def _attach(name):
+    """Attaches to an existing shared memory block without handing it to this process's resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+def _score_slice(inputs_name, floats_name, flags_name, num_deals, start, stop):
+    """Worker task: scores deals[start:stop] straight out of and back into shared memory."""
+    inputs_shm = _attach(inputs_name)
+    floats_shm = _attach(floats_name)
+    flags_shm = _attach(flags_name)
+    try:
+        inputs = np.ndarray((len(RARORAC_INPUT_COLUMNS), num_deals), dtype=np.float64, buffer=inputs_shm.buf)
+        floats = np.ndarray((len(_FLOAT_RESULT_COLUMNS), num_deals), dtype=np.float64, buffer=floats_shm.buf)
+        flags = np.ndarray((num_deals,), dtype=np.bool_, buffer=flags_shm.buf)
+
+        metrics = calculate_rarorac_metrics_batch(*inputs[:, start:stop])
+        for row, col in enumerate(_FLOAT_RESULT_COLUMNS):
+            floats[row, start:stop] = metrics[col]
+        flags[start:stop] = metrics['Meets_Hurdle']
+        del inputs, floats, flags, metrics
+    finally:
+        inputs_shm.close()
+        floats_shm.close()
+        flags_shm.close()
+    return start, stop
+
+
+def _slice_bounds(num_deals, num_slices):
+    """Splits range(num_deals) into num_slices contiguous, near-equal (start, stop) pairs."""
+    edges = np.linspace(0, num_deals, num_slices + 1).astype(np.int64)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(num_slices) if edges[i] < edges[i + 1]]
+
+
+def effective_workers(num_deals, workers):
+    """How many of the requested workers a batch of num_deals deals is split across (at least MIN_ROWS_PER_WORKER each)."""
+    return min(workers, max(1, num_deals // MIN_ROWS_PER_WORKER))
+
+
+def calculate_rarorac_metrics_parallel(loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate, workers=None, executor=None):
+    """Computes batch RARORAC metrics across a process pool, sharing the arrays through shared memory."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Workers must be at least 1.")
+
+    columns = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (
+        loan_amount, interest_rate, fees, operating_cost_ratio, expected_loss_rate, ul_capital_factor, hurdle_rate
+    )))
+    num_deals = columns[0].size
+    workers = effective_workers(num_deals, workers)
+    if workers == 1 or columns[0].ndim != 1:
+        return calculate_rarorac_metrics_batch(*columns)
+
+    blocks = []
+    try:
+        inputs_shm = shared_memory.SharedMemory(create=True, size=len(RARORAC_INPUT_COLUMNS) * num_deals * 8)
+        blocks.append(inputs_shm)
+        floats_shm = shared_memory.SharedMemory(create=True, size=len(_FLOAT_RESULT_COLUMNS) * num_deals * 8)
+        blocks.append(floats_shm)
+        flags_shm = shared_memory.SharedMemory(create=True, size=num_deals)
+        blocks.append(flags_shm)
+
+        inputs = np.ndarray((len(RARORAC_INPUT_COLUMNS), num_deals), dtype=np.float64, buffer=inputs_shm.buf)
+        for row, column in enumerate(columns):
+            inputs[row] = column
+        del inputs
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                executor.submit(_score_slice, inputs_shm.name, floats_shm.name, flags_shm.name, num_deals, start, stop)
+                for start, stop in _slice_bounds(num_deals, workers)
+            ]
+            # Each task owns a disjoint slice, so the merged order is the input order regardless of completion order
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        floats = np.ndarray((len(_FLOAT_RESULT_COLUMNS), num_deals), dtype=np.float64, buffer=floats_shm.buf)
+        flags = np.ndarray((num_deals,), dtype=np.bool_, buffer=flags_shm.buf)
+        metrics = {col: floats[row].copy() for row, col in enumerate(_FLOAT_RESULT_COLUMNS)}
+        metrics['Meets_Hurdle'] = flags.copy()
+        del floats, flags
+        return metrics
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def score_deals_frame_parallel(deals, workers=None, executor=None):
+    """Parallel counterpart of score_deals_frame for large DataFrames of deals."""
+    if not isinstance(deals, pd.DataFrame):
+        raise TypeError("Deals must be a pandas DataFrame.")
+    check_deal_columns(deals)
+
+    metrics = calculate_rarorac_metrics_parallel(
+        *(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS), workers=workers, executor=executor
+    )
+    return metrics_to_frame(metrics, index=deals.index)
@@ -0,0 +1,306 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import DEAL_OUTCOMES, RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch
+from application_pages.scenario_store import SCENARIO_RESULT_COLUMNS, SCENARIO_VALUE_COLUMNS
+
+# Bump when the column layout below changes; readers reject files from a newer schema
+SCENARIO_SCHEMA_VERSION = 1
+SCENARIO_NAME_COLUMN = 'scenario_name'
+SCENARIO_OUTCOME_COLUMN = 'Deal_Outcome'
+SCENARIO_FILE_COLUMNS = [SCENARIO_NAME_COLUMN] + SCENARIO_VALUE_COLUMNS + [SCENARIO_OUTCOME_COLUMN]
+
+SCENARIO_FILE_FORMATS = {
+    'parquet': ('.parquet', '.pq'),
+    'arrow': ('.arrow', '.feather', '.ipc'),
+    'csv': ('.csv',),
+}
+# Key of the schema version in Parquet/Arrow schema metadata, and the first line of CSV exports
+_VERSION_KEY = b'rarorac.scenario_schema_version'
+_CSV_VERSION_PREFIX = '# rarorac scenarios schema_version='
+_UNKNOWN_OUTCOME_LABEL = 'Unknown'
+
+
+def _import_pyarrow():
+    """Imports pyarrow, which is only needed for Parquet and Arrow IPC files."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet and Arrow scenario files require pyarrow (pip install pyarrow); use CSV instead.") from exc
+    return pa, pq
+
+
+def available_formats():
+    """Formats that can be read and written here: Parquet and Arrow IPC need pyarrow, CSV always works."""
+    try:
+        _import_pyarrow()
+    except ImportError:
+        return ['csv']
+    return list(SCENARIO_FILE_FORMATS)
+
+
+def scenario_file_format(path):
+    """Infers 'parquet', 'arrow' or 'csv' from a file name."""
+    suffix = os.path.splitext(str(path))[1].lower()
+    for file_format, suffixes in SCENARIO_FILE_FORMATS.items():
+        if suffix in suffixes:
+            return file_format
+    raise ValueError(f"Unsupported scenario file type '{suffix}'. Use .parquet, .arrow or .csv.")
+
+
+def _check_version(version):
+    try:
+        version = int(version)
+    except (TypeError, ValueError):
+        raise ValueError(f"Scenario file has an invalid schema version '{version}'.") from None
+    if version > SCENARIO_SCHEMA_VERSION:
+        raise ValueError(f"Scenario file uses schema version {version}; this version of the app reads up to {SCENARIO_SCHEMA_VERSION}.")
+
+
+def outcome_codes(labels):
+    """Deal_Outcome labels to codes into DEAL_OUTCOMES; blank, missing and 'Unknown' become -1, anything else is an error."""
+    categorical = pd.Categorical(labels)
+    unknown = [label for label in categorical.categories if label not in DEAL_OUTCOMES and label not in ('', _UNKNOWN_OUTCOME_LABEL)]
+    if unknown:
+        raise ValueError(f"Unknown Deal_Outcome value(s): {', '.join(map(str, unknown[:5]))}.")
+    # Remapping the categories only touches the handful of distinct labels, not every row
+    return np.asarray(categorical.set_categories(DEAL_OUTCOMES).codes, dtype=np.int8)
+
+
+def _check_names(names):
+    """Checks scenario names in whole-column passes and returns them as a list.
+
+    names may be a pyarrow (chunked) array, checked with Arrow compute kernels, or
+    anything pandas can hold, checked with its vectorized string methods.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        pa = None
+    if pa is not None and isinstance(names, (pa.Array, pa.ChunkedArray)):
+        if not (pa.types.is_string(names.type) or pa.types.is_large_string(names.type)) or names.null_count \
+                or pc.any(pc.equal(pc.utf8_length(names), 0)).as_py():
+            raise ValueError("Every scenario needs a non-empty text name.")
+        if len(pc.unique(names)) != len(names):
+            counts = pc.value_counts(names)
+            duplicated = counts.field('values').filter(pc.greater(counts.field('counts'), 1))[:5].to_pylist()
+            raise ValueError(f"Scenario names must be unique; repeated: {', '.join(duplicated)}.")
+        return names.to_pylist()
+
+    names = pd.Series(names, dtype=object)
+    if len(names) and (pd.api.types.infer_dtype(names, skipna=False) != 'string' or not names.str.len().all()):
+        raise ValueError("Every scenario needs a non-empty text name.")
+    duplicated = names.duplicated()
+    if duplicated.any():
+        raise ValueError(f"Scenario names must be unique; repeated: {', '.join(names[duplicated][:5])}.")
+    return names.tolist()
+
+
+def validate_scenario_columns(names, columns, outcomes=None):
+    """Checks a block of imported scenarios column by column; returns (names, values, outcome codes).
+
+    names is a list or array of the scenario names. columns maps each of
+    SCENARIO_VALUE_COLUMNS to a numeric array. If every result column is missing the
+    results are recomputed from the inputs, so a file of deal inputs alone can be
+    imported; outcomes are then derived from the hurdle rate too.
+    """
+    names = _check_names(names)
+    missing_inputs = [col for col in RARORAC_INPUT_COLUMNS if col not in columns]
+    if missing_inputs:
+        raise ValueError(f"Scenarios are missing required columns: {', '.join(missing_inputs)}")
+    missing_results = [col for col in SCENARIO_RESULT_COLUMNS if col not in columns]
+    if missing_results and len(missing_results) < len(SCENARIO_RESULT_COLUMNS):
+        raise ValueError(f"Scenarios are missing result columns: {', '.join(missing_results)} (include all of them or none).")
+
+    values = np.empty((len(names), len(SCENARIO_VALUE_COLUMNS)), dtype=np.float64)
+    for i, col in enumerate(RARORAC_INPUT_COLUMNS):
+        column = np.asarray(columns[col])
+        if column.dtype.kind not in 'biuf':
+            raise ValueError(f"Column '{col}' must be numeric.")
+        values[:, i] = column
+    inputs = values[:, :len(RARORAC_INPUT_COLUMNS)]
+    # Saved scenarios may have missing (NaN) inputs, but results can only be recomputed from complete ones
+    bad = np.isinf(inputs) if not missing_results else ~np.isfinite(inputs)
+    if bad.any():
+        row, i = np.argwhere(bad)[0]
+        raise ValueError(f"Column '{RARORAC_INPUT_COLUMNS[i]}' has a missing or infinite value for scenario '{names[row]}'.")
+
+    if missing_results:
+        metrics = calculate_rarorac_metrics_batch(*(values[:, i] for i in range(len(RARORAC_INPUT_COLUMNS))))
+        for i, col in enumerate(SCENARIO_RESULT_COLUMNS):
+            values[:, len(RARORAC_INPUT_COLUMNS) + i] = metrics[col]
+        outcomes = np.where(metrics['Meets_Hurdle'], DEAL_OUTCOMES.index('Meets Hurdle Rate'), DEAL_OUTCOMES.index('Below Hurdle Rate'))
+    else:
+        for i, col in enumerate(SCENARIO_RESULT_COLUMNS, start=len(RARORAC_INPUT_COLUMNS)):
+            column = np.asarray(columns[col])
+            if column.dtype.kind not in 'biuf':
+                raise ValueError(f"Column '{col}' must be numeric.")
+            values[:, i] = column
+        if outcomes is None:
+            meets = values[:, SCENARIO_VALUE_COLUMNS.index('RARORAC')] >= values[:, SCENARIO_VALUE_COLUMNS.index('hurdle_rate')]
+            outcomes = np.where(meets, DEAL_OUTCOMES.index('Meets Hurdle Rate'), DEAL_OUTCOMES.index('Below Hurdle Rate'))
+        else:
+            outcomes = outcome_codes(outcomes)
+    return names, values, np.asarray(outcomes, dtype=np.int8)
+
+
+def scenario_table(names, values, outcomes):
+    """Arrow table of scenarios in the file schema, with the schema version in its metadata."""
+    pa, _ = _import_pyarrow()
+    outcomes = np.asarray(outcomes, dtype=np.int8)
+    arrays = [pa.array(names, type=pa.string())]
+    arrays += [pa.array(np.ascontiguousarray(values[:, i])) for i in range(len(SCENARIO_VALUE_COLUMNS))]
+    # Outcomes are stored dictionary-encoded: one byte per scenario plus the label list
+    arrays.append(pa.DictionaryArray.from_arrays(pa.array(outcomes, mask=outcomes < 0), pa.array(DEAL_OUTCOMES)))
+    table = pa.Table.from_arrays(arrays, names=SCENARIO_FILE_COLUMNS)
+    return table.replace_schema_metadata({_VERSION_KEY: str(SCENARIO_SCHEMA_VERSION).encode()})
+
+
+def write_scenarios(store, destination, file_format=None):
+    """Exports a ScenarioStore to a path or binary file object as Parquet, Arrow IPC or CSV.
+
+    file_format defaults to the path's suffix and must be given for file objects.
+    """
+    file_format = file_format or scenario_file_format(destination)
+    names, values, outcomes = store.to_arrays()
+    if file_format == 'csv':
+        _write_csv(names, values, outcomes, destination)
+        return
+
+    pa, pq = _import_pyarrow()
+    table = scenario_table(names, values, outcomes)
+    if file_format == 'parquet':
+        pq.write_table(table, destination)
+    elif file_format == 'arrow':
+        # Uncompressed, so a memory-mapped read can use the column buffers in place
+        with pa.ipc.new_file(destination, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown scenario file format '{file_format}'.")
+
+
+def _write_csv(names, values, outcomes, destination):
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'wb') as f:
+            return _write_csv(names, values, outcomes, f)
+    destination.write(f"{_CSV_VERSION_PREFIX}{SCENARIO_SCHEMA_VERSION}\n".encode())
+    try:
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa_csv = None
+    if pa_csv is not None:
+        # Arrow's writer formats floats an order of magnitude faster than DataFrame.to_csv
+        pa_csv.write_csv(scenario_table(names, values, outcomes), destination)
+        return
+    df = pd.DataFrame(values, columns=SCENARIO_VALUE_COLUMNS, copy=False)
+    df.insert(0, SCENARIO_NAME_COLUMN, names)
+    df[SCENARIO_OUTCOME_COLUMN] = pd.Categorical.from_codes(outcomes, categories=DEAL_OUTCOMES)
+    destination.write(df.to_csv(index=False).encode())
+
+
+def export_scenarios_bytes(store, file_format):
+    """The export file as bytes, e.g. for a download button."""
+    buffer = io.BytesIO()
+    write_scenarios(store, buffer, file_format)
+    return buffer.getvalue()
+
+
+def _read_arrow_table(source, file_format):
+    pa, pq = _import_pyarrow()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.BufferReader(pa.py_buffer(source))
+    if file_format == 'parquet':
+        return pq.read_table(source)
+    if isinstance(source, (str, os.PathLike)):
+        # Memory-map the file so its float64 columns are read without copying
+        source = pa.memory_map(str(source))
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_scenarios(source, file_format=None):
+    """Reads and validates a scenario file from a path, bytes or binary file object.
+
+    Returns (names, values, outcome codes) in the layout of ScenarioStore.from_arrays.
+    file_format defaults to the path's suffix and must be given for bytes or file objects.
+    """
+    file_format = file_format or scenario_file_format(source)
+    if file_format == 'csv':
+        return _read_csv_scenarios(source)
+    if file_format not in SCENARIO_FILE_FORMATS:
+        raise ValueError(f"Unknown scenario file format '{file_format}'.")
+
+    table = _read_arrow_table(source, file_format)
+    metadata = table.schema.metadata or {}
+    if _VERSION_KEY in metadata:
+        _check_version(metadata[_VERSION_KEY].decode())
+    return _validate_table(table)
+
+
+def _validate_table(table):
+    pa, _ = _import_pyarrow()
+    if SCENARIO_NAME_COLUMN not in table.column_names:
+        raise ValueError(f"Scenarios are missing required columns: {SCENARIO_NAME_COLUMN}")
+    columns = {}
+    for name in SCENARIO_VALUE_COLUMNS:
+        if name not in table.column_names:
+            continue
+        column = table.column(name)
+        if not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)):
+            raise ValueError(f"Column '{name}' must be numeric.")
+        # A float64 column in one chunk is viewed in place; nulls come back as NaN
+        columns[name] = column.to_numpy()
+    outcomes = None
+    if SCENARIO_OUTCOME_COLUMN in table.column_names:
+        outcomes = table.column(SCENARIO_OUTCOME_COLUMN).to_pandas()
+    return validate_scenario_columns(table.column(SCENARIO_NAME_COLUMN), columns, outcomes)
+
+
+def _read_csv_scenarios(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return _read_csv_scenarios(io.BytesIO(f.read()))
+
+    first_line = source.readline()
+    if first_line.decode(errors='replace').startswith(_CSV_VERSION_PREFIX):
+        _check_version(first_line.decode()[len(_CSV_VERSION_PREFIX):].strip())
+    else:
+        # Hand-written files have no version line; read them as the current schema
+        source.seek(0)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa_csv = None
+    if pa_csv is not None:
+        convert_options = pa_csv.ConvertOptions(
+            column_types={SCENARIO_NAME_COLUMN: pa.string(), SCENARIO_OUTCOME_COLUMN: pa.dictionary(pa.int32(), pa.string())}
+        )
+        return _validate_table(pa_csv.read_csv(source, convert_options=convert_options))
+
+    df = pd.read_csv(source, float_precision='round_trip', dtype={SCENARIO_NAME_COLUMN: str, SCENARIO_OUTCOME_COLUMN: 'category'}, keep_default_na=False,
+                     na_values={col: ['', 'NaN', 'nan'] for col in SCENARIO_VALUE_COLUMNS})
+    if SCENARIO_NAME_COLUMN not in df.columns:
+        raise ValueError(f"Scenarios are missing required columns: {SCENARIO_NAME_COLUMN}")
+    columns = {col: df[col].to_numpy() for col in SCENARIO_VALUE_COLUMNS if col in df.columns}
+    outcomes = df[SCENARIO_OUTCOME_COLUMN] if SCENARIO_OUTCOME_COLUMN in df.columns else None
+    return validate_scenario_columns(df[SCENARIO_NAME_COLUMN], columns, outcomes)
+
+
+def import_scenarios(store, source, file_format=None, replace=False):
+    """Reads a scenario file into a ScenarioStore; returns the number of scenarios imported.
+
+    Scenarios whose names are already saved are overwritten; with replace=True the store
+    is cleared first.
+    """
+    names, values, outcomes = read_scenarios(source, file_format)
+    if replace:
+        store.clear()
+    store.save_many(names, values, outcomes)
+    return len(names)
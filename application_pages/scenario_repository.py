@@ -0,0 +1,232 @@
+import itertools
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from application_pages.rarorac_batch import DEAL_OUTCOMES, RARORAC_INPUT_COLUMNS
+from application_pages.scenario_store import SCENARIO_OUTCOME_LABELS, SCENARIO_RESULT_COLUMNS, SCENARIO_VALUE_COLUMNS
+
+DEFAULT_PAGE_SIZE = 10_000
+
+_OUTCOME_CODES = {outcome: code for code, outcome in enumerate(DEAL_OUTCOMES)}
+_repository_ids = itertools.count()
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    {', '.join(f'{col} REAL' for col in SCENARIO_VALUE_COLUMNS)},
+    deal_outcome INTEGER,
+    saved_at REAL NOT NULL
+)
+"""
+
+
+class ScenarioRepository:
+    """SQLite-backed store of saved scenarios that survives the Streamlit session.
+
+    Rows are written one statement at a time as scenarios change, the name column is
+    indexed (UNIQUE) for lookups, and reads come back page by page in save order.
+
+    One repository is shared by every session of the process. Each write bumps
+    revision and returns the new value, so a ScenarioStore can tell when another
+    session has changed the data under its in-memory copy; (uid, revision) identifies
+    the contents for caches without reading them.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        # Streamlit sessions run on different threads, so share one connection behind a lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.revision = 0
+        self.uid = next(_repository_ids)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def save(self, scenario_name, parameters, results):
+        """Inserts a scenario, or updates it in place if the name already exists."""
+        parameters = parameters or {}
+        results = results or {}
+        values = [parameters.get(key) for key in RARORAC_INPUT_COLUMNS] + [results.get(key) for key in SCENARIO_RESULT_COLUMNS]
+        outcome = _OUTCOME_CODES.get(results.get('Deal_Outcome'))
+        columns = ', '.join(SCENARIO_VALUE_COLUMNS)
+        placeholders = ', '.join('?' for _ in range(len(SCENARIO_VALUE_COLUMNS) + 3))
+        updates = ', '.join(f'{col} = excluded.{col}' for col in SCENARIO_VALUE_COLUMNS + ['deal_outcome', 'saved_at'])
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO scenarios (name, {columns}, deal_outcome, saved_at) VALUES ({placeholders}) "
+                f"ON CONFLICT(name) DO UPDATE SET {updates}",
+                [scenario_name, *values, outcome, time.time()]
+            )
+            return self._bump()
+
+    def save_many(self, names, values, outcomes):
+        """Inserts or updates a block of scenarios in one transaction, from ScenarioStore.from_arrays-style arrays."""
+        columns = ', '.join(SCENARIO_VALUE_COLUMNS)
+        placeholders = ', '.join('?' for _ in range(len(SCENARIO_VALUE_COLUMNS) + 3))
+        updates = ', '.join(f'{col} = excluded.{col}' for col in SCENARIO_VALUE_COLUMNS + ['deal_outcome', 'saved_at'])
+        saved_at = time.time()
+        # NaN binds as NULL, as it does for single saves
+        rows = (
+            [name, *row, None if outcome < 0 else outcome, saved_at]
+            for name, row, outcome in zip(names, np.asarray(values, dtype=np.float64).tolist(), np.asarray(outcomes).tolist())
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO scenarios (name, {columns}, deal_outcome, saved_at) VALUES ({placeholders}) "
+                f"ON CONFLICT(name) DO UPDATE SET {updates}",
+                rows
+            )
+            return self._bump()
+
+    def delete(self, scenario_name):
+        with self._lock, self._conn:
+            if not self._conn.execute("DELETE FROM scenarios WHERE name = ?", (scenario_name,)).rowcount:
+                raise KeyError(scenario_name)
+            return self._bump()
+
+    def rename(self, old_name, new_name):
+        try:
+            with self._lock, self._conn:
+                if not self._conn.execute("UPDATE scenarios SET name = ? WHERE name = ?", (new_name, old_name)).rowcount:
+                    raise KeyError(old_name)
+                return self._bump()
+        except sqlite3.IntegrityError:
+            # Another session saved a scenario under the new name
+            raise ValueError(f"A scenario named '{new_name}' already exists.") from None
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios")
+            return self._bump()
+
+    def _bump(self):
+        # Called with the lock held, after a successful write
+        self.revision += 1
+        return self.revision
+
+    def count(self, outcome=None, rarorac_min=None, rarorac_max=None):
+        """Number of saved scenarios, or of those matching the filters of read_page."""
+        where, parameters = _filters(outcome, rarorac_min, rarorac_max)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM scenarios {where}", parameters).fetchone()[0]
+
+    def names(self):
+        """Scenario names in save order, without reading the rest of each row."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM scenarios ORDER BY id")]
+
+    def get(self, scenario_name):
+        """Looks up one scenario by name, or returns None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(SCENARIO_VALUE_COLUMNS)}, deal_outcome FROM scenarios WHERE name = ?",
+                (scenario_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        offset = len(RARORAC_INPUT_COLUMNS)
+        # NULLs are saved NaNs, as read_page returns them
+        values = [np.nan if value is None else value for value in row[:-1]]
+        parameters = dict(zip(RARORAC_INPUT_COLUMNS, values[:offset]))
+        results = dict(zip(SCENARIO_RESULT_COLUMNS, values[offset:]))
+        results['Deal_Outcome'] = SCENARIO_OUTCOME_LABELS[row[-1]] if row[-1] is not None else SCENARIO_OUTCOME_LABELS[-1]
+        return {"parameters": parameters, "results": results}
+
+    def read_page(self, after=None, limit=DEFAULT_PAGE_SIZE, sort_by=None, descending=False, outcome=None, rarorac_min=None,
+                  rarorac_max=None):
+        """Reads up to limit scenarios following the sort key after, as (last_key, names, values, outcome_codes).
+
+        Paging is keyset paging: pass the last_key of one page as after to read the next,
+        and the query seeks straight to it instead of skipping the rows before it. sort_by,
+        descending and the filters work as for ScenarioStore.filter_rows; None keeps save order.
+        """
+        keys, comparison = _sort_key(sort_by, descending)
+        where, parameters = _filters(outcome, rarorac_min, rarorac_max)
+        if after is not None:
+            where += f" {'AND' if where else 'WHERE'} ({', '.join(keys)}) {comparison} ({', '.join('?' for _ in keys)})"
+            parameters += list(after)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(keys)}, name, {', '.join(SCENARIO_VALUE_COLUMNS)}, deal_outcome FROM scenarios "
+                f"{where} ORDER BY {_order_by(keys, comparison)} LIMIT ?",
+                parameters + [limit]
+            ).fetchall()
+        if not rows:
+            return after, [], np.empty((0, len(SCENARIO_VALUE_COLUMNS))), np.empty(0, dtype=np.int8)
+        # NULLs (saved NaNs or missing outcomes) come back as None and convert to NaN here
+        block = np.array([row[len(keys) + 1:] for row in rows], dtype=np.float64)
+        outcomes = np.nan_to_num(block[:, -1], nan=-1).astype(np.int8)
+        return tuple(rows[-1][:len(keys)]), [row[len(keys)] for row in rows], block[:, :-1], outcomes
+
+    def page_key(self, position, sort_by=None, descending=False, outcome=None, rarorac_min=None, rarorac_max=None):
+        """Sort key of the scenario at position (0-based) in read_page order, or None past the end.
+
+        Reading it only touches the key columns, so a reader can jump to any page and
+        continue from there with read_page.
+        """
+        keys, comparison = _sort_key(sort_by, descending)
+        where, parameters = _filters(outcome, rarorac_min, rarorac_max)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(keys)} FROM scenarios {where} ORDER BY {_order_by(keys, comparison)} LIMIT 1 OFFSET ?",
+                parameters + [position]
+            ).fetchone()
+        return None if row is None else tuple(row)
+
+    def iter_pages(self, page_size=DEFAULT_PAGE_SIZE):
+        """Yields (names, values, outcome_codes) pages in save order, using keyset paging on the id."""
+        after = None
+        while True:
+            after, names, values, outcomes = self.read_page(after, page_size)
+            if not names:
+                return
+            yield names, values, outcomes
+
+
+def _sort_key(sort_by, descending):
+    """SQL expressions read_page orders by, and the comparison that selects the rows after a key.
+
+    Matches ScenarioStore.sort_order: ties stay in save order and NULLs (NaNs) sort last
+    in both directions, so numeric columns are negated rather than sorted DESC.
+    """
+    if sort_by is None:
+        return ['id'], '>'
+    if sort_by == 'Scenario_Name':
+        # Names are unique, so they need no tie-break
+        return ['name'], '<' if descending else '>'
+    if sort_by == 'Deal_Outcome':
+        code = 'COALESCE(deal_outcome, -1)'
+        return [f'-{code}' if descending else code, 'id'], '>'
+    if sort_by not in SCENARIO_VALUE_COLUMNS:
+        raise ValueError(f"Unknown sort column '{sort_by}'.")
+    value = f'-{sort_by}' if descending else sort_by
+    return [f'{sort_by} IS NULL', f'COALESCE({value}, 0)', 'id'], '>'
+
+
+def _order_by(keys, comparison):
+    return ', '.join(f'{key} DESC' if comparison == '<' else key for key in keys)
+
+
+def _filters(outcome, rarorac_min, rarorac_max):
+    """WHERE clause and parameters for the comparison table's filters; NULL RARORACs never match a bound."""
+    clauses, parameters = [], []
+    if outcome is not None:
+        clauses.append("deal_outcome = ?")
+        parameters.append(DEAL_OUTCOMES.index(outcome))
+    if rarorac_min is not None:
+        clauses.append("RARORAC >= ?")
+        parameters.append(rarorac_min)
+    if rarorac_max is not None:
+        clauses.append("RARORAC <= ?")
+        parameters.append(rarorac_max)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", parameters
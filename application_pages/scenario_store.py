@@ -0,0 +1,500 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from application_pages.portfolio_stats import PortfolioSummary
+from application_pages.rarorac_batch import DEAL_OUTCOMES, RARORAC_INPUT_COLUMNS
+
+SCENARIO_RESULT_COLUMNS = [
+    'Income_From_Deal',
+    'Operating_Costs',
+    'Expected_Loss',
+    'Net_Risk_Adjusted_Reward',
+    'Risk_Adjusted_Capital',
+    'RARORAC',
+]
+
+# Every numeric field of a scenario, stored side by side in one float64 block
+SCENARIO_VALUE_COLUMNS = RARORAC_INPUT_COLUMNS + SCENARIO_RESULT_COLUMNS
+
+# Deal_Outcome labels a saved scenario can show: a scenario saved without results has an unknown outcome
+SCENARIO_OUTCOME_LABELS = DEAL_OUTCOMES + ['Unknown']
+
+_OUTCOME_CODES = {outcome: code for code, outcome in enumerate(DEAL_OUTCOMES)}
+_MEETS_HURDLE_CODE = _OUTCOME_CODES['Meets Hurdle Rate']
+# The Portfolio Quality page plots expected loss rate as risk against RARORAC as return
+_RISK_INDEX = SCENARIO_VALUE_COLUMNS.index('expected_loss_rate')
+_RARORAC_INDEX = SCENARIO_VALUE_COLUMNS.index('RARORAC')
+_UNKNOWN_OUTCOME = -1
+_INITIAL_CAPACITY = 16
+# Distinguishes stores in process-wide caches, unlike id() which is reused after garbage collection
+_store_ids = itertools.count()
+
+
+def _display_name(key):
+    """Column heading used by the comparison table, e.g. 'loan_amount' -> 'Loan Amount'."""
+    return key.replace('_', ' ').title()
+
+
+def _outcome_labels(codes):
+    """Outcome codes as a Categorical of SCENARIO_OUTCOME_LABELS, with -1 shown as 'Unknown' rather than NaN."""
+    codes = np.where(codes == _UNKNOWN_OUTCOME, len(DEAL_OUTCOMES), codes)
+    return pd.Categorical.from_codes(codes, categories=SCENARIO_OUTCOME_LABELS)
+
+
+def _page_frame(names, values, outcomes):
+    """Comparison frame of a block of scenarios given as names, (n, 13) values and outcome codes."""
+    df = pd.DataFrame(values, columns=[_display_name(key) for key in SCENARIO_VALUE_COLUMNS])
+    df.insert(0, "Scenario Name", names)
+    df['Deal Outcome'] = _outcome_labels(outcomes)
+    return df
+
+
+class ScenarioStore:
+    """Saved scenarios held as typed columns, with O(1) amortized save, delete and rename by name.
+
+    If a repository is given, changes are written through to it, and the count, names,
+    single scenarios and pages of the comparison table are read from it directly. The
+    scenarios are only loaded into memory, page by page, by reads that need whole
+    columns (the portfolio charts, exports). The repository is written before memory is
+    changed, so a failed write leaves the store as it was. When another session has
+    written to the same repository, the in-memory copy is dropped and read again the
+    next time it is needed instead of serving stale data.
+    """
+
+    def __init__(self, repository=None):
+        self._values = np.empty((_INITIAL_CAPACITY, len(SCENARIO_VALUE_COLUMNS)), dtype=np.float64)
+        self._outcomes = np.empty(_INITIAL_CAPACITY, dtype=np.int8)
+        self._alive = np.zeros(_INITIAL_CAPACITY, dtype=np.bool_)
+        self._names = []
+        self._rows = {}
+        self._deleted = 0
+        self._version = 0
+        self._frame_cache = None
+        self._sort_cache = {}
+        self._summary = PortfolioSummary()
+        self._repository = repository
+        self._loaded = repository is None
+        # Repository revision the in-memory copy matches
+        self._revision = None
+        # Keyset of the first row of each comparison page read from the repository, by revision
+        self._page_keys = (None, {})
+        self._uid = next(_store_ids)
+
+    @classmethod
+    def from_dict(cls, scenarios_dict):
+        """Builds a store from the legacy {name: {"parameters": ..., "results": ...}} layout."""
+        store = cls()
+        for scenario_name, scenario_data in scenarios_dict.items():
+            store.save(scenario_name, scenario_data.get("parameters"), scenario_data.get("results"))
+        return store
+
+    @classmethod
+    def from_arrays(cls, names, values, outcomes=None):
+        """Builds a store in one vectorized copy from scenario names and an (n, 13) value matrix.
+
+        values holds the columns of SCENARIO_VALUE_COLUMNS in order; outcomes are Deal_Outcome
+        codes (index into DEAL_OUTCOMES) and default to comparing RARORAC with the hurdle rate.
+        """
+        names = list(names)
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(names), len(SCENARIO_VALUE_COLUMNS)):
+            raise ValueError(f"Values must have shape ({len(names)}, {len(SCENARIO_VALUE_COLUMNS)}).")
+        if len(set(names)) != len(names):
+            raise ValueError("Scenario names must be unique.")
+        if outcomes is None:
+            meets = values[:, _RARORAC_INDEX] >= values[:, SCENARIO_VALUE_COLUMNS.index('hurdle_rate')]
+            outcomes = np.where(meets, _MEETS_HURDLE_CODE, 1 - _MEETS_HURDLE_CODE)
+        store = cls()
+        store._reserve(len(names))
+        store._append_rows(names, values, np.asarray(outcomes, dtype=np.int8))
+        store._touch()
+        return store
+
+    def to_arrays(self):
+        """(names, (n, 13) values, outcome codes) of the live scenarios in save order, the layout from_arrays takes."""
+        self._ensure_loaded()
+        used = len(self._names)
+        if self._deleted:
+            live = self._alive[:used]
+            return self.names(), self._values[:used][live], self._outcomes[:used][live]
+        return self.names(), self._values[:used].copy(), self._outcomes[:used].copy()
+
+    def __len__(self):
+        if not self._current():
+            # Counting does not need the rows themselves
+            return self._repository.count()
+        return len(self._rows)
+
+    def __contains__(self, scenario_name):
+        if not self._current():
+            return self._repository.get(scenario_name) is not None
+        return scenario_name in self._rows
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __getitem__(self, scenario_name):
+        if not self._current():
+            scenario = self._repository.get(scenario_name)
+            if scenario is None:
+                raise KeyError(scenario_name)
+            return scenario
+        row = self._rows[scenario_name]
+        values = self._values[row]
+        parameters = {key: float(values[i]) for i, key in enumerate(RARORAC_INPUT_COLUMNS)}
+        offset = len(RARORAC_INPUT_COLUMNS)
+        results = {key: float(values[offset + i]) for i, key in enumerate(SCENARIO_RESULT_COLUMNS)}
+        code = self._outcomes[row]
+        # The unknown code, -1, picks the last label
+        results['Deal_Outcome'] = SCENARIO_OUTCOME_LABELS[code]
+        return {"parameters": parameters, "results": results}
+
+    def items(self):
+        """Yields (name, {"parameters": ..., "results": ...}) pairs in save order."""
+        self._ensure_loaded()
+        for scenario_name in self.names():
+            yield scenario_name, self[scenario_name]
+
+    @property
+    def summary(self):
+        """Running PortfolioSummary of the saved scenarios, kept up to date on every change."""
+        self._ensure_loaded()
+        return self._summary
+
+    @property
+    def version(self):
+        """Counter bumped on every change, for callers that cache views of the store."""
+        return self._version
+
+    @property
+    def cache_key(self):
+        """Changes whenever the contents do, and is shared only by stores holding the same contents.
+
+        (store id, version) for a store in memory only; for a repository-backed store, the
+        repository's id and revision, so the key needs no load and every session on the
+        same workspace shares cached views.
+        """
+        if self._repository is not None:
+            return ('repository', self._repository.uid, self._repository.revision)
+        return (self._uid, self._version)
+
+    def names(self):
+        """Scenario names in save order."""
+        if not self._current():
+            return self._repository.names()
+        if not self._deleted:
+            return list(self._names)
+        return [name for name in self._names if name is not None]
+
+    def save(self, scenario_name, parameters, results):
+        """Adds a scenario, or overwrites it in place if the name is already saved."""
+        if self._repository is not None and not self._written(self._repository.save(scenario_name, parameters, results)):
+            return
+        parameters = parameters or {}
+        results = results or {}
+        row = self._rows.get(scenario_name)
+        if row is None:
+            row = len(self._names)
+            if row == len(self._alive):
+                self._grow()
+            self._names.append(scenario_name)
+            self._rows[scenario_name] = row
+            self._alive[row] = True
+        else:
+            self._summary_update(row, remove=True)
+
+        values = self._values[row]
+        for i, key in enumerate(RARORAC_INPUT_COLUMNS):
+            values[i] = parameters.get(key, np.nan)
+        offset = len(RARORAC_INPUT_COLUMNS)
+        for i, key in enumerate(SCENARIO_RESULT_COLUMNS):
+            values[offset + i] = results.get(key, np.nan)
+        self._outcomes[row] = _OUTCOME_CODES.get(results.get('Deal_Outcome'), _UNKNOWN_OUTCOME)
+        self._summary_update(row)
+        self._touch()
+
+    def save_many(self, names, values, outcomes):
+        """Saves a block of scenarios at once: names already saved are overwritten in place, new ones appended.
+
+        Takes the from_arrays layout; names must be unique within the block.
+        """
+        names = list(names)
+        values = np.asarray(values, dtype=np.float64)
+        outcomes = np.asarray(outcomes, dtype=np.int8)
+        if values.shape != (len(names), len(SCENARIO_VALUE_COLUMNS)) or outcomes.shape != (len(names),):
+            raise ValueError(f"Values must have shape ({len(names)}, {len(SCENARIO_VALUE_COLUMNS)}) with one outcome per name.")
+        if len(set(names)) != len(names):
+            raise ValueError("Scenario names must be unique.")
+        if self._repository is not None and not self._written(self._repository.save_many(names, values, outcomes)):
+            return
+
+        existing_rows = np.array([self._rows.get(name, -1) for name in names], dtype=np.int64)
+        existing = existing_rows >= 0
+        if existing.any():
+            rows = existing_rows[existing]
+            old = self._values[rows]
+            self._summary.remove_many(old[:, _RISK_INDEX], old[:, _RARORAC_INDEX], self._outcomes[rows] == _MEETS_HURDLE_CODE)
+            self._values[rows] = values[existing]
+            self._outcomes[rows] = outcomes[existing]
+            new_values = self._values[rows]
+            self._summary.add_many(new_values[:, _RISK_INDEX], new_values[:, _RARORAC_INDEX], outcomes[existing] == _MEETS_HURDLE_CODE)
+        if not existing.all():
+            new = ~existing
+            new_names = [name for name, is_new in zip(names, new) if is_new]
+            self._reserve(len(self._names) + len(new_names))
+            self._append_rows(new_names, values[new], outcomes[new])
+        self._touch()
+
+    def delete(self, scenario_name):
+        """Removes a scenario; storage is compacted once half of it is deleted rows."""
+        if self._current() and scenario_name not in self._rows:
+            raise KeyError(scenario_name)
+        if self._repository is not None and not self._written(self._repository.delete(scenario_name)):
+            return
+        row = self._rows.pop(scenario_name)
+        self._summary_update(row, remove=True)
+        self._alive[row] = False
+        self._names[row] = None
+        self._deleted += 1
+        if self._deleted * 2 > len(self._names):
+            self._compact()
+        self._touch()
+
+    def rename(self, old_name, new_name):
+        """Renames a scenario without moving its data."""
+        if self._current():
+            if new_name in self._rows:
+                raise ValueError(f"A scenario named '{new_name}' already exists.")
+            if old_name not in self._rows:
+                raise KeyError(old_name)
+        if self._repository is not None and not self._written(self._repository.rename(old_name, new_name)):
+            return
+        row = self._rows.pop(old_name)
+        self._rows[new_name] = row
+        self._names[row] = new_name
+        self._touch()
+
+    def clear(self):
+        """Removes every scenario, from the repository too (and so for every session sharing it)."""
+        revision = self._repository.clear() if self._repository is not None else None
+        self._reset()
+        self._loaded = True
+        self._revision = revision
+        self._touch()
+
+    def column(self, key):
+        """Values of one parameter or result column (e.g. 'RARORAC') for the live scenarios, in save order."""
+        self._ensure_loaded()
+        used = len(self._names)
+        if key == 'Deal_Outcome':
+            codes = self._outcomes[:used]
+            if self._deleted:
+                codes = codes[self._alive[:used]]
+            return _outcome_labels(codes)
+        values = self._values[:used, SCENARIO_VALUE_COLUMNS.index(key)]
+        return values[self._alive[:used]] if self._deleted else values
+
+    def to_frame(self):
+        """Comparison table of all scenarios, rebuilt only when the store has changed.
+
+        The numeric columns share memory with the store where possible, so take a .copy()
+        of the result before keeping it across later saves.
+        """
+        self._ensure_loaded()
+        if self._frame_cache is not None and self._frame_cache[0] == self._version:
+            return self._frame_cache[1]
+
+        used = len(self._names)
+        values = self._values[:used]
+        if self._deleted:
+            values = values[self._alive[:used]]
+        df = pd.DataFrame(values, columns=[_display_name(key) for key in SCENARIO_VALUE_COLUMNS], copy=False)
+        df.insert(0, "Scenario Name", self.names())
+        # Deal Outcome goes last, as in the original comparison table
+        df['Deal Outcome'] = self.column('Deal_Outcome')
+
+        self._frame_cache = (self._version, df)
+        return df
+
+    def sort_order(self, key=None, descending=False):
+        """Storage rows of the live scenarios in sort order, cached until the store changes.
+
+        key is a column such as 'RARORAC', 'Scenario_Name' or 'Deal_Outcome'; None keeps save order.
+        """
+        self._ensure_loaded()
+        cache_key = (key, descending)
+        cached = self._sort_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        used = len(self._names)
+        live = np.flatnonzero(self._alive[:used])
+        if key is None:
+            order = live
+        else:
+            if key == 'Scenario_Name':
+                # Rank the names so both directions can sort on integers
+                sort_values = np.unique(np.array([self._names[row] for row in live], dtype=object), return_inverse=True)[1]
+            elif key == 'Deal_Outcome':
+                sort_values = self._outcomes[live].astype(np.int16)
+            else:
+                sort_values = self._values[live, SCENARIO_VALUE_COLUMNS.index(key)]
+            # Negating keeps the sort stable (ties stay in save order) and NaNs last in both directions
+            positions = np.argsort(-sort_values if descending else sort_values, kind='stable')
+            order = live[positions]
+        self._sort_cache[cache_key] = order
+        return order
+
+    def filter_rows(self, sort_by=None, descending=False, outcome=None, rarorac_min=None, rarorac_max=None):
+        """Storage rows matching the filters, in sort order; the sort itself comes from the cache."""
+        order = self.sort_order(sort_by, descending)
+        mask = None
+        if outcome is not None:
+            mask = self._outcomes[order] == DEAL_OUTCOMES.index(outcome)
+        if rarorac_min is not None or rarorac_max is not None:
+            rarorac = self._values[order, SCENARIO_VALUE_COLUMNS.index('RARORAC')]
+            if rarorac_min is not None:
+                mask = (rarorac >= rarorac_min) if mask is None else mask & (rarorac >= rarorac_min)
+            if rarorac_max is not None:
+                mask = (rarorac <= rarorac_max) if mask is None else mask & (rarorac <= rarorac_max)
+        return order if mask is None else order[mask]
+
+    def frame_for_rows(self, rows):
+        """Comparison frame for just the given storage rows, e.g. one page of filter_rows()."""
+        return _page_frame([self._names[row] for row in rows], self._values[rows], self._outcomes[rows])
+
+    def count_matching(self, outcome=None, rarorac_min=None, rarorac_max=None):
+        """Number of scenarios the comparison table's filters match."""
+        if not self._current():
+            return self._repository.count(outcome, rarorac_min, rarorac_max)
+        return len(self.filter_rows(None, False, outcome, rarorac_min, rarorac_max))
+
+    def page_frame(self, sort_by=None, descending=False, outcome=None, rarorac_min=None, rarorac_max=None, page=0, page_size=50):
+        """One page of the filtered, sorted comparison table, in the order of filter_rows().
+
+        Unless the scenarios are already in memory, only that page is read from the
+        repository: it continues from the last key of the page before when that page
+        was read last, and otherwise seeks to the page's first key.
+        """
+        if self._current():
+            rows = self.filter_rows(sort_by, descending, outcome, rarorac_min, rarorac_max)
+            return self.frame_for_rows(rows[page * page_size:(page + 1) * page_size])
+
+        query = (sort_by, descending, outcome, rarorac_min, rarorac_max)
+        revision = self._repository.revision
+        if self._page_keys[0] != revision:
+            self._page_keys = (revision, {})
+        page_keys = self._page_keys[1]
+        after = None
+        if page:
+            after = page_keys.get((query, page_size, page))
+            if after is None:
+                after = self._repository.page_key(page * page_size - 1, *query)
+            if after is None:
+                # Past the last matching scenario
+                return _page_frame([], np.empty((0, len(SCENARIO_VALUE_COLUMNS))), np.empty(0, dtype=np.int8))
+        last, names, values, outcomes = self._repository.read_page(after, page_size, *query)
+        page_keys[(query, page_size, page + 1)] = last
+        return _page_frame(names, values, outcomes)
+
+    def query(self, sort_by=None, descending=False, outcome=None, rarorac_min=None, rarorac_max=None, page=0, page_size=50):
+        """Filters, sorts and pages the scenarios; returns (page_frame, matching_count)."""
+        return (self.page_frame(sort_by, descending, outcome, rarorac_min, rarorac_max, page, page_size),
+                self.count_matching(outcome, rarorac_min, rarorac_max))
+
+    def nbytes(self):
+        """Approximate memory held by the store's arrays and names."""
+        return self._values.nbytes + self._outcomes.nbytes + self._alive.nbytes + sum(len(name or '') for name in self._names)
+
+    def _current(self):
+        """Whether the in-memory copy holds the current contents, so reads can skip the repository."""
+        return self._loaded and (self._repository is None or self._repository.revision == self._revision)
+
+    def _ensure_loaded(self):
+        if self._current():
+            return
+        if self._loaded:
+            # Another session wrote to the shared repository since this copy was read
+            self._reset()
+        self._loaded = True
+        # Read before the pages: a write that lands while they load triggers another reload
+        self._revision = self._repository.revision
+        for names, values, outcomes in self._repository.iter_pages():
+            self._append_rows(names, values, outcomes)
+        self._touch()
+
+    def _written(self, revision):
+        """Records a write of this store's own; returns whether the in-memory copy should apply it too.
+
+        Only a copy that was current just before the write should. A gap in revisions means
+        another session wrote in between, so the stale copy is dropped; a store that was
+        never loaded stays unloaded.
+        """
+        if self._loaded and revision == self._revision + 1:
+            self._revision = revision
+            return True
+        if self._loaded:
+            self._reset()
+        self._touch()
+        return False
+
+    def _reset(self):
+        """Empties the in-memory copy, keeping the store's id and version counter."""
+        uid, version = self._uid, self._version
+        self.__init__(self._repository)
+        self._uid, self._version = uid, version
+
+    def _append_rows(self, names, values, outcomes):
+        """Appends a block of new, uniquely named rows in one vectorized copy."""
+        start = len(self._names)
+        stop = start + len(names)
+        while stop > len(self._alive):
+            self._grow()
+        self._values[start:stop] = values
+        self._outcomes[start:stop] = outcomes
+        self._alive[start:stop] = True
+        self._names.extend(names)
+        self._rows.update(zip(names, range(start, stop)))
+        self._summary.add_many(values[:, _RISK_INDEX], values[:, _RARORAC_INDEX], outcomes == _MEETS_HURDLE_CODE)
+
+    def _summary_update(self, row, remove=False):
+        values = self._values[row]
+        args = (values[_RISK_INDEX], values[_RARORAC_INDEX], self._outcomes[row] == _MEETS_HURDLE_CODE)
+        if remove:
+            self._summary.remove(*args)
+        else:
+            self._summary.add(*args)
+
+    def _touch(self):
+        self._version += 1
+        self._frame_cache = None
+        self._sort_cache = {}
+
+    def _reserve(self, capacity):
+        """Makes room for at least capacity rows in one step, instead of doubling repeatedly."""
+        if capacity > len(self._alive):
+            self._grow(capacity)
+
+    def _grow(self, capacity=None):
+        capacity = max(capacity or 0, 2 * len(self._alive))
+        values = np.empty((capacity, self._values.shape[1]), dtype=np.float64)
+        values[:len(self._values)] = self._values
+        outcomes = np.empty(capacity, dtype=np.int8)
+        outcomes[:len(self._outcomes)] = self._outcomes
+        alive = np.zeros(capacity, dtype=np.bool_)
+        alive[:len(self._alive)] = self._alive
+        self._values, self._outcomes, self._alive = values, outcomes, alive
+
+    def _compact(self):
+        used = len(self._names)
+        keep = np.flatnonzero(self._alive[:used])
+        count = len(keep)
+        self._values[:count] = self._values[keep]
+        self._outcomes[:count] = self._outcomes[keep]
+        self._alive[:count] = True
+        self._alive[count:used] = False
+        self._names = [self._names[row] for row in keep]
+        self._rows = {name: row for row, name in enumerate(self._names)}
+        self._deleted = 0
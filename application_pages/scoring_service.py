@@ -0,0 +1,393 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from application_pages.rarorac_batch import DEAL_OUTCOMES, RARORAC_INPUT_COLUMNS, RARORAC_RESULT_COLUMNS, calculate_rarorac_metrics_batch
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+# Concurrent requests are merged until this many deals are queued or the wait runs out
+DEFAULT_MAX_BATCH_DEALS = 65_536
+DEFAULT_MAX_BATCH_WAIT = 0.002
+DEFAULT_MAX_BODY_BYTES = 64 * 1024 * 1024
+DEFAULT_KEEP_ALIVE_TIMEOUT = 15.0
+# Latencies kept per endpoint for the percentiles
+LATENCY_WINDOW = 10_000
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+_FLOAT_RESULT_COLUMNS = [col for col in RARORAC_RESULT_COLUMNS if col != 'Meets_Hurdle']
+
+
+class RequestError(Exception):
+    """A client error that is sent back as a JSON error response with the given status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyTracker:
+    """Request counts and rolling p50/p99 latencies per endpoint."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._latencies = {}
+        self._requests = {}
+        self._errors = {}
+
+    def record(self, endpoint, seconds, error=False):
+        self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+        self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+        if error:
+            self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def snapshot(self):
+        stats = {}
+        for endpoint, latencies in self._latencies.items():
+            p50, p99 = np.percentile(np.fromiter(latencies, dtype=np.float64), [50, 99]) * 1000
+            stats[endpoint] = {
+                'Requests': self._requests[endpoint],
+                'Errors': self._errors.get(endpoint, 0),
+                'Latency_P50_Ms': float(p50),
+                'Latency_P99_Ms': float(p99),
+            }
+        return stats
+
+
+class MicroBatcher:
+    """Merges deals from concurrent requests into one calculate_rarorac_metrics_batch call.
+
+    Each request queues its input arrays and awaits a future. A single loop takes the
+    first waiting request, keeps collecting until max_batch_deals deals are queued or
+    max_wait seconds have passed, scores everything in one vectorized call and hands
+    each request back its own slice of the results.
+    """
+
+    def __init__(self, max_batch_deals=DEFAULT_MAX_BATCH_DEALS, max_wait=DEFAULT_MAX_BATCH_WAIT):
+        self.max_batch_deals = max_batch_deals
+        self.max_wait = max_wait
+        self.batches = 0
+        self.deals = 0
+        self.requests = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def score(self, columns):
+        """Scores a dict of equal-length input arrays; returns the batch result dict for those deals."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((columns, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        queued = len(pending[0][0]['loan_amount'])
+        deadline = time.perf_counter() + self.max_wait
+        while queued < self.max_batch_deals:
+            if not self._queue.empty():
+                item = self._queue.get_nowait()
+            else:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            pending.append(item)
+            queued += len(item[0]['loan_amount'])
+        return pending
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            # A request that timed out or disconnected no longer needs its slice
+            pending = [(columns, future) for columns, future in pending if not future.done()]
+            if not pending:
+                continue
+            try:
+                inputs = [np.concatenate([columns[col] for columns, _ in pending]) for col in RARORAC_INPUT_COLUMNS]
+                metrics = calculate_rarorac_metrics_batch(*inputs)
+            except Exception as exc:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            self.batches += 1
+            self.requests += len(pending)
+            start = 0
+            for columns, future in pending:
+                stop = start + len(columns['loan_amount'])
+                if not future.done():
+                    future.set_result({key: values[start:stop] for key, values in metrics.items()})
+                start = stop
+            self.deals += start
+
+    def stats(self):
+        return {
+            'Batches': self.batches,
+            'Requests': self.requests,
+            'Deals': self.deals,
+            'Mean_Deals_Per_Batch': self.deals / self.batches if self.batches else 0.0,
+            'Mean_Requests_Per_Batch': self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+def _json_number(value):
+    # JSON has no infinity, so the zero-capital RARORAC (and any NaN) is sent as null
+    return value if math.isfinite(value) else None
+
+
+def _deal_columns(records):
+    """Turns a list of deal objects into float arrays keyed by input name."""
+    if not isinstance(records, list):
+        raise RequestError(400, "'deals' must be a list of deal objects.")
+    if not all(isinstance(record, dict) for record in records):
+        raise RequestError(400, "Every deal must be a JSON object.")
+    missing = [col for col in RARORAC_INPUT_COLUMNS if any(col not in record for record in records)]
+    if missing:
+        raise RequestError(400, f"Deals are missing required fields: {', '.join(missing)}")
+    return _numeric_columns({col: [record[col] for record in records] for col in RARORAC_INPUT_COLUMNS})
+
+
+def _numeric_columns(columns):
+    """Validates a dict of input lists (columnar batch form) and converts it to float arrays."""
+    missing = [col for col in RARORAC_INPUT_COLUMNS if col not in columns]
+    if missing:
+        raise RequestError(400, f"Deals are missing required fields: {', '.join(missing)}")
+    arrays = {}
+    for col in RARORAC_INPUT_COLUMNS:
+        values = columns[col]
+        if not isinstance(values, list) or any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in values):
+            raise RequestError(400, f"'{col}' must be numeric.")
+        arrays[col] = np.asarray(values, dtype=np.float64)
+    if len({len(values) for values in arrays.values()}) > 1:
+        raise RequestError(400, "All input columns must have the same length.")
+    return arrays
+
+
+def single_deal_columns(deal):
+    """Validates the body of a single-deal request: a JSON object holding the seven inputs."""
+    if not isinstance(deal, dict):
+        raise RequestError(400, "Request body must be a JSON object with the seven calculator inputs.")
+    return _deal_columns([deal])
+
+
+def batch_deal_columns(body):
+    """Validates a batch request: {"deals": [{...}, ...]} or columnar {"loan_amount": [...], ...}."""
+    if not isinstance(body, dict):
+        raise RequestError(400, "Request body must be a JSON object.")
+    if 'deals' in body:
+        return _deal_columns(body['deals'])
+    return _numeric_columns(body)
+
+
+def results_to_records(metrics):
+    """Converts batch results to per-deal dicts keyed like calculate_rarorac_metrics' output."""
+    columns = {col: metrics[col].tolist() for col in _FLOAT_RESULT_COLUMNS}
+    outcomes = [DEAL_OUTCOMES[int(meets)] for meets in metrics['Meets_Hurdle']]
+    return [
+        dict({col: _json_number(columns[col][i]) for col in _FLOAT_RESULT_COLUMNS}, Deal_Outcome=outcomes[i])
+        for i in range(len(outcomes))
+    ]
+
+
+def results_to_columns(metrics):
+    """Converts batch results to a columnar dict of lists with the Deal_Outcome labels."""
+    columns = {col: [_json_number(value) for value in metrics[col].tolist()] for col in _FLOAT_RESULT_COLUMNS}
+    columns['Deal_Outcome'] = [DEAL_OUTCOMES[int(meets)] for meets in metrics['Meets_Hurdle']]
+    return columns
+
+
+class ScoringService:
+    """Asyncio HTTP/1.1 server for the RARORAC model, with keep-alive and micro-batching.
+
+    Endpoints:
+        POST /score        one deal as a JSON object of the seven inputs
+        POST /score/batch  {"deals": [...]} (returns "results") or columnar lists (returns columns)
+        GET  /metrics      request counts, p50/p99 latency per endpoint and batching stats
+        GET  /health       liveness check
+
+    All scoring requests, single or batch, go through one MicroBatcher, so concurrent
+    callers share a vectorized calculate_rarorac_metrics_batch call.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch_deals=DEFAULT_MAX_BATCH_DEALS,
+                 max_batch_wait=DEFAULT_MAX_BATCH_WAIT, max_body_bytes=DEFAULT_MAX_BODY_BYTES,
+                 keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.keep_alive_timeout = keep_alive_timeout
+        self.batcher = MicroBatcher(max_batch_deals, max_batch_wait)
+        self.latency = LatencyTracker()
+        self.connections = 0
+        self._server = None
+        self._writers = set()
+
+    async def start(self):
+        """Starts listening; with port 0 the OS picks a free port, readable from self.port afterwards."""
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold the server open
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def metrics(self):
+        return {
+            'Endpoints': self.latency.snapshot(),
+            'Batching': self.batcher.stats(),
+            'Connections': self.connections,
+        }
+
+    async def _read_request(self, reader):
+        """Reads one request; returns (method, path, headers, body) or None when the client closed the connection."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise RequestError(400, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        headers[':version'] = version.upper()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise RequestError(400, "Invalid Content-Length.")
+        if length < 0:
+            raise RequestError(400, "Invalid Content-Length.")
+        if length > self.max_body_bytes:
+            raise RequestError(413, f"Request body exceeds {self.max_body_bytes} bytes.")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0], headers, body
+
+    @staticmethod
+    def _keep_alive(headers):
+        connection = headers.get('connection', '').lower()
+        if headers[':version'] == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def _dispatch(self, method, path, body):
+        routes = {
+            '/score': ('POST', self._score_single),
+            '/score/batch': ('POST', self._score_batch),
+            '/metrics': ('GET', self._metrics),
+            '/health': ('GET', self._health),
+        }
+        if path not in routes:
+            raise RequestError(404, f"No endpoint at {path}.")
+        expected_method, handler = routes[path]
+        if method != expected_method:
+            raise RequestError(405, f"{path} only accepts {expected_method}.")
+        return await handler(body)
+
+    @staticmethod
+    def _parse_json(body):
+        try:
+            return json.loads(body)
+        except (UnicodeDecodeError, ValueError):
+            raise RequestError(400, "Request body is not valid JSON.")
+
+    async def _score_single(self, body):
+        metrics = await self.batcher.score(single_deal_columns(self._parse_json(body)))
+        return results_to_records(metrics)[0]
+
+    async def _score_batch(self, body):
+        payload = self._parse_json(body)
+        columns = batch_deal_columns(payload)
+        metrics = await self.batcher.score(columns)
+        if isinstance(payload, dict) and 'deals' in payload:
+            return {'results': results_to_records(metrics)}
+        return results_to_columns(metrics)
+
+    async def _metrics(self, body):
+        return self.metrics()
+
+    async def _health(self, body):
+        return {'status': 'ok'}
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.keep_alive_timeout)
+                except RequestError as exc:
+                    # The stream position is unknown after a bad request, so the connection is closed
+                    await self._respond(writer, exc.status, {'error': str(exc)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = self._keep_alive(headers)
+
+                started = time.perf_counter()
+                try:
+                    status, payload = 200, await self._dispatch(method, path, body)
+                except RequestError as exc:
+                    status, payload = exc.status, {'error': str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {'error': f"Scoring failed: {exc}"}
+                self.latency.record(path if status != 404 else 'unknown', time.perf_counter() - started, error=status != 200)
+
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, allow_nan=False).encode()
+        head = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch
+
+DEFAULT_RELATIVE_SHIFT = 0.2
+MAX_RENDERED_CELLS_PER_AXIS = 50
+
+PARAMETER_LABELS = {
+    'loan_amount': "Loan Amount",
+    'interest_rate': "Interest Rate",
+    'fees': "Fees",
+    'operating_cost_ratio': "Operating Cost Ratio",
+    'expected_loss_rate': "Expected Loss Rate",
+    'ul_capital_factor': "UL Capital Factor",
+    'hurdle_rate': "Hurdle Rate",
+}
+
+
+def _check_params(params):
+    missing = [col for col in RARORAC_INPUT_COLUMNS if col not in params]
+    if missing:
+        raise ValueError(f"Parameters are missing: {', '.join(missing)}")
+
+
+def tornado_analysis(params, relative_shift=DEFAULT_RELATIVE_SHIFT):
+    """One-at-a-time sensitivity: RARORAC with each input moved down and up by relative_shift.
+
+    All 2 x 7 shifted deals are scored in a single batch call. The hurdle rate is
+    included for completeness but never moves RARORAC. Rows are sorted by swing.
+    """
+    _check_params(params)
+    num_params = len(RARORAC_INPUT_COLUMNS)
+    base = np.array([params[col] for col in RARORAC_INPUT_COLUMNS], dtype=np.float64)
+    # Row 2i moves parameter i down, row 2i + 1 moves it up
+    deals = np.tile(base, (2 * num_params, 1))
+    factors = np.array([1 - relative_shift, 1 + relative_shift])
+    for i in range(num_params):
+        deals[2 * i:2 * i + 2, i] = base[i] * factors
+
+    rarorac = calculate_rarorac_metrics_batch(*deals.T)['RARORAC'].reshape(num_params, 2)
+    base_rarorac = calculate_rarorac_metrics_batch(*base)['RARORAC']
+    df = pd.DataFrame({
+        'Parameter': [PARAMETER_LABELS[col] for col in RARORAC_INPUT_COLUMNS],
+        'Low_Value': deals[0::2, :].diagonal(),
+        'High_Value': deals[1::2, :].diagonal(),
+        'RARORAC_Low': rarorac[:, 0],
+        'RARORAC_High': rarorac[:, 1],
+        'Base_RARORAC': float(base_rarorac),
+    })
+    df['Swing'] = (df['RARORAC_High'] - df['RARORAC_Low']).abs()
+    return df.sort_values('Swing', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def sensitivity_grid(params, x_param, x_values, y_param, y_values, metric='RARORAC'):
+    """Evaluates a metric over the x_values x y_values grid of two inputs, all other inputs fixed.
+
+    Returns a (len(y_values), len(x_values)) array computed by broadcasting, so a
+    1000 x 1000 grid is a single vectorized pass.
+    """
+    _check_params(params)
+    if x_param == y_param:
+        raise ValueError("Choose two different parameters for the grid.")
+    inputs = {col: np.float64(params[col]) for col in RARORAC_INPUT_COLUMNS}
+    inputs[x_param] = np.asarray(x_values, dtype=np.float64)[np.newaxis, :]
+    inputs[y_param] = np.asarray(y_values, dtype=np.float64)[:, np.newaxis]
+    values = calculate_rarorac_metrics_batch(*(inputs[col] for col in RARORAC_INPUT_COLUMNS))[metric]
+    return np.broadcast_to(values, (len(y_values), len(x_values)))
+
+
+def downsample_grid(grid, x_values, y_values, max_cells_per_axis=MAX_RENDERED_CELLS_PER_AXIS):
+    """Samples a dense grid down to at most max_cells_per_axis cells per side for charting.
+
+    Rows and columns are picked at evenly spaced indices that always include the first
+    and last, so the chart spans the same range as the grid and every cell shows the
+    exact value at its coordinates. Returns a long DataFrame with x, y and value columns
+    ready for a heatmap.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+
+    def sample(size):
+        return np.unique(np.linspace(0, size - 1, min(size, max_cells_per_axis)).round().astype(np.intp))
+
+    rows, cols = sample(grid.shape[0]), sample(grid.shape[1])
+    # Infinite RARORAC (zero capital) cannot be coloured, so those cells are left blank
+    small = grid[np.ix_(rows, cols)]
+    small = np.where(np.isfinite(small), small, np.nan)
+    xx, yy = np.meshgrid(x_values[cols], y_values[rows])
+    return pd.DataFrame({'x': xx.ravel(), 'y': yy.ravel(), 'value': small.ravel()})
@@ -0,0 +1,110 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# Chart specs are a few hundred kilobytes at most, so this holds a few hundred views
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def estimate_nbytes(value):
+    """Approximate memory held by a cached value: strings, arrays, DataFrames and containers of them."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if hasattr(value, 'memory_usage'):
+        # pandas DataFrame or Series
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ViewCache:
+    """Thread-safe LRU cache of rendered views (chart specs and aggregates), bounded by total size in bytes.
+
+    Keys are tuples of everything a view depends on, so identical views requested by
+    different sessions are built once. Cached values are shared between sessions and
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, size_of=estimate_nbytes):
+        if max_bytes <= 0:
+            raise ValueError("Cache size must be positive.")
+        self.max_bytes = max_bytes
+        self._size_of = size_of
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value for key, or None without building it (a miss is not counted)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, calling compute() to build it on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Build outside the lock so one slow view does not block every other session
+        value = compute()
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            # Too big to keep without evicting everything else
+            return value
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[0]
+            self._entries[key] = (size, value)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                evicted_size, _ = self._entries.popitem(last=False)[1]
+                self.nbytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """Returns the current size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'Entries': len(self._entries),
+                'Bytes': self.nbytes,
+                'Max_Bytes': self.max_bytes,
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Evictions': self.evictions,
+                'Hit_Rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every Streamlit session in the server process
+shared_view_cache = ViewCache()
@@ -0,0 +1,58 @@
+"""JSON baselines shared by the benchmarks, for catching performance regressions.
+
+A baseline file maps benchmark names to a time in seconds, with the machine and
+Python version it was recorded on. Compare a run against it with find_regressions.
+"""
+import json
+import platform
+import sys
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+
+
+def save_baseline(path, results):
+    """Writes {name: seconds} results to a JSON baseline file."""
+    baseline = {
+        'version': BASELINE_VERSION,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'results': dict(sorted(results.items())),
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def load_baseline(path):
+    """Reads the {name: seconds} results from a JSON baseline file."""
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version in {path}: {baseline.get('version')}")
+    return baseline['results']
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns (name, baseline_seconds, seconds) for every result more than threshold slower than its baseline.
+
+    Benchmarks missing from either side are skipped, so adding or retiring a benchmark
+    does not fail the comparison.
+    """
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is not None and seconds > expected * (1 + threshold):
+            regressions.append((name, expected, seconds))
+    return regressions
+
+
+def report_regressions(results, baseline_path, threshold=DEFAULT_THRESHOLD):
+    """Prints any regressions against the baseline file; returns the exit status for a benchmark script."""
+    regressions = find_regressions(results, load_baseline(baseline_path), threshold)
+    for name, expected, seconds in regressions:
+        print(f"REGRESSION {name}: {seconds:.4f}s vs baseline {expected:.4f}s (+{seconds / expected - 1:.0%})", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%} against {baseline_path}", file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,72 @@
+"""Benchmark: scalar calculate_rarorac_metrics loop vs the vectorized batch engine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch_scoring --rows 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch
+
+
+def make_book(num_deals, seed=0):
+    """Builds a random book of deals as a dict of input arrays."""
+    rng = np.random.default_rng(seed)
+    return {
+        'loan_amount': rng.uniform(1_000, 1_000_000_000, num_deals),
+        'interest_rate': rng.uniform(0.0, 0.15, num_deals),
+        'fees': rng.uniform(0, 1_000_000, num_deals),
+        'operating_cost_ratio': rng.uniform(0.0, 0.5, num_deals),
+        'expected_loss_rate': rng.uniform(0.0, 0.1, num_deals),
+        'ul_capital_factor': rng.uniform(0.0, 0.3, num_deals),
+        'hurdle_rate': rng.uniform(0.05, 0.2, num_deals),
+    }
+
+
+def time_scalar(book, num_deals):
+    """Times the per-deal Python loop over the first num_deals deals."""
+    columns = [book[col][:num_deals].tolist() for col in RARORAC_INPUT_COLUMNS]
+    start = time.perf_counter()
+    results = [calculate_rarorac_metrics(*deal) for deal in zip(*columns)]
+    return time.perf_counter() - start, results
+
+
+def time_batch(book):
+    """Times one vectorized pass over the whole book."""
+    start = time.perf_counter()
+    results = calculate_rarorac_metrics_batch(*(book[col] for col in RARORAC_INPUT_COLUMNS))
+    return time.perf_counter() - start, results
+
+
+def check_matches(scalar_results, batch_results):
+    """Asserts the batch engine reproduces the scalar results bit for bit."""
+    for i, expected in enumerate(scalar_results):
+        for key in ('Income_From_Deal', 'Operating_Costs', 'Expected_Loss', 'Net_Risk_Adjusted_Reward', 'Risk_Adjusted_Capital', 'RARORAC'):
+            assert batch_results[key][i] == expected[key], (i, key)
+        assert bool(batch_results['Meets_Hurdle'][i]) == (expected['Deal_Outcome'] == 'Meets Hurdle Rate'), i
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--scalar-rows', type=int, default=1_000_000,
+                        help="Cap on rows timed through the scalar loop; larger sizes are extrapolated.")
+    args = parser.parse_args()
+
+    for num_deals in args.rows:
+        book = make_book(num_deals)
+        scalar_rows = min(num_deals, args.scalar_rows)
+        scalar_seconds, scalar_results = time_scalar(book, scalar_rows)
+        scalar_seconds *= num_deals / scalar_rows
+        batch_seconds, batch_results = time_batch(book)
+        check_matches(scalar_results[:10_000], batch_results)
+        print(f"{num_deals:>12,} deals  scalar {scalar_seconds:8.3f}s  batch {batch_seconds:8.3f}s  "
+              f"speedup {scalar_seconds / batch_seconds:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark: copula economic-capital simulation over obligors x scenarios and 1/2/4/8 workers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_economic_capital --obligors 100000 --scenarios 100000 --workers 1 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from application_pages.economic_capital import allocate_economic_capital
+from benchmarks.bench_batch_scoring import make_book
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--obligors', type=int, default=100_000)
+    parser.add_argument('--scenarios', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    book = make_book(args.obligors, args.seed)
+    print(f"{args.obligors:,} obligors x {args.scenarios:,} scenarios, {os.cpu_count()} CPUs available")
+
+    baseline = expected = None
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            start = time.perf_counter()
+            summary, allocation = allocate_economic_capital(
+                book['loan_amount'], book['expected_loss_rate'], num_scenarios=args.scenarios, seed=args.seed,
+                workers=workers, executor=executor if workers > 1 else None
+            )
+            seconds = time.perf_counter() - start
+        # Chunk seeds do not depend on the workers, so every run must allocate the same capital
+        if expected is None:
+            expected = allocation['Economic_Capital']
+        assert np.array_equal(allocation['Economic_Capital'], expected)
+        baseline = baseline or seconds
+        cells = args.obligors * args.scenarios
+        print(f"workers {workers:>2}  {seconds:8.2f}s  {seconds / cells * 1e9:6.1f} ns/cell  speedup {baseline / seconds:5.2f}x  "
+              f"VaR {summary['VaR']:,.0f}  ES {summary['ES']:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
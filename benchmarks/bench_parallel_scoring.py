@@ -0,0 +1,47 @@
+"""Benchmark: scaling of process-pool RARORAC scoring over 1/2/4/8 workers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel_scoring --rows 20000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch
+from application_pages.rarorac_parallel import calculate_rarorac_metrics_parallel
+from benchmarks.bench_batch_scoring import make_book
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    book = make_book(args.rows)
+    columns = [book[col] for col in RARORAC_INPUT_COLUMNS]
+    expected = calculate_rarorac_metrics_batch(*columns)
+    print(f"{args.rows:,} deals, {os.cpu_count()} CPUs available")
+
+    baseline = None
+    for workers in args.workers:
+        # Warm pool so process start-up is not counted in the steady-state timing
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            best = float('inf')
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                results = calculate_rarorac_metrics_parallel(*columns, workers=workers, executor=executor)
+                best = min(best, time.perf_counter() - start)
+        for key, values in expected.items():
+            assert np.array_equal(results[key], values, equal_nan=key != 'Meets_Hurdle'), key
+        baseline = baseline or best
+        print(f"workers {workers:>2}  {best:8.3f}s  speedup {baseline / best:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark: cold import time and time-to-first-render of each Streamlit page.
+
+Every measurement runs in a fresh Python process, so nothing is already imported.
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --save-baseline benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --baseline benchmarks/startup_baseline.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.baselines import DEFAULT_THRESHOLD, report_regressions, save_baseline
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['numpy', 'pandas', 'altair', 'pyarrow']
+
+IMPORT_TARGETS = [
+    'streamlit',
+    'numpy',
+    'pandas',
+    'altair',
+    'application_pages.page1',
+    'application_pages.page3',
+]
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+__import__({module!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+# AppTest runs app.py the way the Streamlit server does, without a browser
+_RENDER_SNIPPET = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+def timed(run):
+    start = time.perf_counter()
+    at = run()
+    assert not at.exception, [e.value for e in at.exception]
+    return time.perf_counter() - start
+
+app = AppTest.from_file('app.py', default_timeout=120)
+times = {{}}
+times['render.calculator.first'] = timed(app.run)
+loaded_after_calculator = [m for m in {heavy!r} if m in sys.modules]
+times['render.calculator.rerun'] = timed(app.run)
+navigation = app.sidebar.selectbox[0].set_value('Portfolio Quality Visualization')
+times['render.portfolio.first'] = timed(navigation.run)
+times['render.portfolio.rerun'] = timed(app.run)
+print(json.dumps({{'times': times, 'loaded': loaded_after_calculator}}))
+"""
+
+
+def _run_snippet(code):
+    completed = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def time_imports(repeat):
+    """Median cold import time of each target, and the heavy modules each one pulls in."""
+    results, loaded = {}, {}
+    for module in IMPORT_TARGETS:
+        runs = [_run_snippet(_IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+        results[f'import.{module}'] = statistics.median(run['seconds'] for run in runs)
+        loaded[module] = runs[-1]['loaded']
+    return results, loaded
+
+
+def time_renders(repeat):
+    """Median time of the first and a repeated run of each page, starting from a cold process."""
+    runs = [_run_snippet(_RENDER_SNIPPET.format(heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    results = {name: statistics.median(run['times'][name] for run in runs) for name in runs[0]['times']}
+    return results, runs[-1]['loaded']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh processes per measurement; the median is reported.")
+    parser.add_argument('--baseline', help="JSON baseline to compare against; exits with status 1 on a regression.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Slowdown that counts as a regression (default: {DEFAULT_THRESHOLD:.0%}).")
+    parser.add_argument('--save-baseline', help="Write this run's results to a JSON baseline file.")
+    args = parser.parse_args()
+
+    import_results, loaded = time_imports(args.repeat)
+    for module in IMPORT_TARGETS:
+        heavy = ', '.join(loaded[module]) or '-'
+        print(f"import {module:<26} {import_results[f'import.{module}'] * 1000:8.1f} ms  loads: {heavy}")
+
+    render_results, loaded_after_calculator = time_renders(args.repeat)
+    for name, seconds in render_results.items():
+        print(f"{name:<33} {seconds * 1000:8.1f} ms")
+    print(f"Loaded after the calculator's first render: {', '.join(loaded_after_calculator) or '-'}")
+
+    results = dict(import_results, **render_results)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if args.baseline:
+        return report_regressions(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
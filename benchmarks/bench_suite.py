@@ -0,0 +1,156 @@
+"""Benchmark suite: the calculator, scenario table and portfolio page hot paths, outside Streamlit.
+
+Each benchmark is timed at every size (deals or saved scenarios) and the best of
+several runs is reported. Run from the repository root:
+
+    python -m benchmarks.bench_suite --save-baseline benchmarks/suite_baseline.json
+    python -m benchmarks.bench_suite --baseline benchmarks/suite_baseline.json
+    python -m benchmarks.bench_suite --sizes 10 1000 100000 10000000 --only comparison_table
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.page3 import generate_portfolio_data, scenario_portfolio_frame
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch
+from application_pages.scenario_exchange import export_scenarios_bytes, read_scenarios
+from application_pages.scenario_store import SCENARIO_RESULT_COLUMNS, ScenarioStore
+from benchmarks.baselines import DEFAULT_THRESHOLD, report_regressions, save_baseline
+from benchmarks.bench_batch_scoring import make_book
+
+DEFAULT_SIZES = [10, 1_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 5
+# Stop repeating a benchmark once it has used this much time, after at least one run
+DEFAULT_TIME_BUDGET = 10.0
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Registers a setup function: it takes a size and returns the zero-argument callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_scenario_store(num_scenarios, seed=0):
+    """A ScenarioStore holding num_scenarios scored random deals."""
+    book = make_book(num_scenarios, seed)
+    metrics = calculate_rarorac_metrics_batch(*(book[col] for col in RARORAC_INPUT_COLUMNS))
+    values = np.column_stack([book[col] for col in RARORAC_INPUT_COLUMNS] + [metrics[col] for col in SCENARIO_RESULT_COLUMNS])
+    return ScenarioStore.from_arrays([f"Scenario {i}" for i in range(num_scenarios)], values)
+
+
+@benchmark('calculate_rarorac_metrics')
+def setup_scalar_calculator(size):
+    deals = list(zip(*(make_book(size)[col].tolist() for col in RARORAC_INPUT_COLUMNS)))
+    return lambda: [calculate_rarorac_metrics(*deal) for deal in deals]
+
+
+@benchmark('calculate_rarorac_metrics_batch')
+def setup_batch_calculator(size):
+    book = make_book(size)
+    return lambda: calculate_rarorac_metrics_batch(*(book[col] for col in RARORAC_INPUT_COLUMNS))
+
+
+@benchmark('comparison_table')
+def setup_comparison_table(size):
+    # What display_scenarios_comparison_streamlit does after a save: re-sort, filter and build one page
+    store = make_scenario_store(size)
+    name = store.names()[-1]
+    scenario = store[name]
+
+    def rebuild():
+        store.save(name, scenario['parameters'], scenario['results'])
+        rows = store.filter_rows(sort_by='RARORAC', descending=True, outcome='Meets Hurdle Rate')
+        return store.frame_for_rows(rows[:50])
+    return rebuild
+
+
+@benchmark('comparison_table_full_frame')
+def setup_comparison_full_frame(size):
+    store = make_scenario_store(size)
+    name = store.names()[-1]
+    scenario = store[name]
+
+    def rebuild():
+        store.save(name, scenario['parameters'], scenario['results'])
+        return store.to_frame()
+    return rebuild
+
+
+@benchmark('generate_portfolio_data')
+def setup_generate_portfolio(size):
+    return lambda: generate_portfolio_data(size, (0.0, 0.1), (-0.05, 0.3), skewed=True, seed=0)
+
+
+@benchmark('scenario_portfolio_frame')
+def setup_scenario_portfolio_frame(size):
+    # The df_real construction in run_page3
+    store = make_scenario_store(size)
+    return lambda: scenario_portfolio_frame(store)
+
+
+@benchmark('scenario_import')
+def setup_scenario_import(size):
+    # Bulk import of a Parquet export: read, validate and build the store
+    data = export_scenarios_bytes(make_scenario_store(size), 'parquet')
+    return lambda: ScenarioStore.from_arrays(*read_scenarios(data, 'parquet'))
+
+
+def time_benchmark(run, repeat=DEFAULT_REPEAT, time_budget=DEFAULT_TIME_BUDGET):
+    """Best wall time of up to `repeat` runs, stopping early once time_budget seconds are used."""
+    best = float('inf')
+    spent = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent >= time_budget:
+            break
+    return best
+
+
+def run_suite(names, sizes, repeat=DEFAULT_REPEAT, time_budget=DEFAULT_TIME_BUDGET):
+    """Runs the selected benchmarks at every size; returns {"name[size]": seconds}."""
+    results = {}
+    for name in names:
+        for size in sizes:
+            run = BENCHMARKS[name](size)
+            seconds = time_benchmark(run, repeat, time_budget)
+            results[f'{name}[{size}]'] = seconds
+            print(f"{name:<32} {size:>12,}  {seconds * 1000:12.3f} ms  {seconds / size * 1e9:10.1f} ns/row")
+            del run
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Deals or scenarios per benchmark (default: 10 to 10^6; add 10000000 for the full sweep).")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Run only these benchmarks.")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Runs per benchmark and size; the best is kept.")
+    parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                        help="Seconds after which a benchmark stops repeating (it always runs once).")
+    parser.add_argument('--baseline', help="JSON baseline to compare against; exits with status 1 on a regression.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Slowdown that counts as a regression (default: {DEFAULT_THRESHOLD:.0%}).")
+    parser.add_argument('--save-baseline', help="Write this run's results to a JSON baseline file.")
+    args = parser.parse_args()
+
+    results = run_suite(args.only or list(BENCHMARKS), args.sizes, args.repeat, args.time_budget)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if args.baseline:
+        return report_regressions(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Headless RARORAC scoring of deal files, for batch jobs that run without Streamlit.
+
+Usage:
+    python score_deals.py deals.parquet scored.parquet --chunk-size 200000
+    python score_deals.py deals.csv scored.csv --workers 4
+"""
+import argparse
+import sys
+
+from application_pages.deal_ingest import DEFAULT_CHUNK_SIZE, score_deal_file
+from application_pages.rarorac_parallel import MIN_ROWS_PER_WORKER
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet deal file with the RARORAC model.")
+    parser.add_argument("input_path", help="Deal file (.csv or .parquet) with the seven calculator input columns.")
+    parser.add_argument("output_path", help="Where to write the scored deals (.csv or .parquet).")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help=f"Deals read and scored per chunk (default: {DEFAULT_CHUNK_SIZE}, or "
+                             f"{MIN_ROWS_PER_WORKER:,} per worker with --workers).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used to score each chunk (default: 1). Each worker needs at least "
+                             f"{MIN_ROWS_PER_WORKER:,} deals of the chunk; an explicit --chunk-size smaller "
+                             "than that scores in fewer processes.")
+    parser.add_argument("--break-even", action="store_true",
+                        help="Also output the break-even interest rate, fees, EL rate and capital factor per deal.")
+    parser.add_argument("--lifetime", action="store_true",
+                        help="Also output lifetime and discounted RARORAC; needs a term_periods column (months), "
+                             "with optional amortization and discount_rate columns.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print progress.")
+    args = parser.parse_args(argv)
+
+    progress_callback = None
+    if not args.quiet:
+        progress_callback = lambda scored: print(f"Scored {scored:,} deals", file=sys.stderr)
+
+    summary = score_deal_file(args.input_path, args.output_path, args.chunk_size, progress_callback, args.workers, args.break_even,
+                             args.lifetime)
+    print(f"Total deals: {summary['Total_Deals']:,}")
+    print(f"Meets Hurdle Rate: {summary['Deals_Meeting_Hurdle']:,}")
+    print(f"Below Hurdle Rate: {summary['Deals_Below_Hurdle']:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
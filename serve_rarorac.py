@@ -0,0 +1,41 @@
+"""Headless RARORAC scoring service over HTTP, for systems that call the model directly.
+
+Usage:
+    python serve_rarorac.py --port 8600
+    curl -X POST localhost:8600/score -d '{"loan_amount": 1000000, "interest_rate": 0.05, "fees": 10000,
+        "operating_cost_ratio": 0.2, "expected_loss_rate": 0.01, "ul_capital_factor": 0.08, "hurdle_rate": 0.15}'
+"""
+import argparse
+import asyncio
+import sys
+
+from application_pages.scoring_service import (DEFAULT_HOST, DEFAULT_MAX_BATCH_DEALS, DEFAULT_MAX_BATCH_WAIT,
+                                               DEFAULT_PORT, ScoringService)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve single-deal and batch RARORAC scoring over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT}).")
+    parser.add_argument("--max-batch-deals", type=int, default=DEFAULT_MAX_BATCH_DEALS,
+                        help=f"Deals merged into one vectorized call at most (default: {DEFAULT_MAX_BATCH_DEALS}).")
+    parser.add_argument("--max-batch-wait-ms", type=float, default=DEFAULT_MAX_BATCH_WAIT * 1000,
+                        help=f"How long the first request in a batch waits for others (default: {DEFAULT_MAX_BATCH_WAIT * 1000:g} ms).")
+    args = parser.parse_args(argv)
+
+    service = ScoringService(args.host, args.port, args.max_batch_deals, args.max_batch_wait_ms / 1000)
+
+    async def serve():
+        await service.start()
+        print(f"Scoring service listening on http://{service.host}:{service.port}", file=sys.stderr)
+        await service.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
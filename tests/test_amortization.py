@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.amortization import (
+    AMORTIZATION_TYPES, LIFETIME_RESULT_COLUMNS, calculate_lifetime_rarorac_batch, opening_balances, period_cash_flows,
+    score_lifetime_frame,
+)
+from application_pages.deal_ingest import score_deal_file
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS
+from tests.test_rarorac_batch import random_deals
+
+# 1,200 over three months at 12% a year: 1% a month
+LOAN, RATE, TERM = 1200.0, 0.12, 3
+
+
+def annuity_schedule(loan, monthly_rate, term):
+    """Textbook annuity: a fixed payment, each period's balance grows by interest and falls by the payment."""
+    payment = loan * monthly_rate / (1 - (1 + monthly_rate) ** -term)
+    balances = [loan]
+    for _ in range(term - 1):
+        balances.append(balances[-1] * (1 + monthly_rate) - payment)
+    return balances
+
+
+@pytest.mark.parametrize("amortization, expected", [
+    ('bullet', [1200.0, 1200.0, 1200.0]),
+    ('linear', [1200.0, 800.0, 400.0]),
+    ('annuity', annuity_schedule(LOAN, 0.01, TERM)),
+])
+def test_opening_balances_match_hand_computed_schedules(amortization, expected):
+    balance = opening_balances([LOAN], RATE, [TERM], amortization)
+    np.testing.assert_allclose(balance[0], expected, rtol=1e-12)
+    flows = period_cash_flows(LOAN, RATE, 0.0, 0.0, 0.0, 0.0, [TERM], amortization)
+    # Every schedule repays the whole loan by maturity
+    assert flows['Principal_Repaid'].sum() == pytest.approx(LOAN, rel=1e-12)
+
+
+def test_schedules_stop_at_each_deals_maturity():
+    balance = opening_balances([100.0, 100.0], 0.0, [2, 4], 'linear')
+    np.testing.assert_allclose(balance, [[100.0, 50.0, 0.0, 0.0], [100.0, 75.0, 50.0, 25.0]])
+
+
+def test_zero_rate_annuity_repays_like_a_linear_loan():
+    np.testing.assert_allclose(opening_balances([LOAN], 0.0, [TERM], 'annuity'), opening_balances([LOAN], 0.0, [TERM], 'linear'))
+
+
+def test_lifetime_results_match_a_hand_computed_linear_loan():
+    metrics = calculate_lifetime_rarorac_batch(LOAN, RATE, 10.0, 0.3, 0.02, 0.1, 0.1, TERM, 'linear', discount_rate=RATE)
+    # Balances 1,200 + 800 + 400 = 2,400 outstanding-months
+    income = 0.01 * 2400 + 10.0
+    reward = income * 0.7 - 0.02 / 12 * 2400
+    capital_years = 0.1 * 2400 / 12
+    discounted_balance = 1200 / 1.01 + 800 / 1.01 ** 2 + 400 / 1.01 ** 3
+    discounted_reward = (0.01 * discounted_balance + 10.0 / 1.01) * 0.7 - 0.02 / 12 * discounted_balance
+    assert metrics['Lifetime_Income'][0] == pytest.approx(34.0)
+    assert metrics['Lifetime_Net_Risk_Adjusted_Reward'][0] == pytest.approx(reward)
+    assert metrics['Capital_Years'][0] == pytest.approx(20.0)
+    assert metrics['Lifetime_RARORAC'][0] == pytest.approx(reward / capital_years)
+    assert metrics['Discounted_RARORAC'][0] == pytest.approx(discounted_reward / (0.1 * discounted_balance / 12))
+    assert metrics['Meets_Hurdle'][0]
+
+
+def test_one_period_annual_bullet_matches_the_single_period_calculator():
+    deals = random_deals(200)
+    metrics = calculate_lifetime_rarorac_batch(*(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS), 1, 'bullet',
+                                               periods_per_year=1)
+    for i, deal in enumerate(deals.itertuples(index=False)):
+        scalar = calculate_rarorac_metrics(*deal)
+        assert metrics['Lifetime_RARORAC'][i] == pytest.approx(scalar['RARORAC'], rel=1e-12, abs=1e-12), i
+        assert metrics['Lifetime_Net_Risk_Adjusted_Reward'][i] == pytest.approx(scalar['Net_Risk_Adjusted_Reward'], rel=1e-12, abs=1e-9)
+        assert metrics['Capital_Years'][i] == pytest.approx(scalar['Risk_Adjusted_Capital'], rel=1e-12)
+        assert bool(metrics['Meets_Hurdle'][i]) == (scalar['Deal_Outcome'] == 'Meets Hurdle Rate')
+
+
+def lifetime_book(n, seed=0):
+    rng = np.random.default_rng(seed)
+    deals = random_deals(n, seed)
+    deals['term_periods'] = rng.integers(1, 121, n)
+    deals['amortization'] = rng.choice(AMORTIZATION_TYPES, n)
+    return deals
+
+
+@pytest.mark.parametrize("per_deal_discount", [False, True])
+def test_results_do_not_depend_on_the_memory_budget(per_deal_discount):
+    deals = lifetime_book(1_000)
+    if per_deal_discount:
+        deals['discount_rate'] = np.random.default_rng(1).uniform(0.0, 0.2, len(deals))
+    # One deal per chunk, a few deals per chunk, and the whole book in one chunk
+    results = [score_lifetime_frame(deals, memory_budget=budget) for budget in (1, 120 * 8 * 3 * 7, 1 << 30)]
+    for other in results[1:]:
+        pd.testing.assert_frame_equal(results[0], other, check_exact=True)
+
+
+def test_scored_file_adds_the_lifetime_columns(tmp_path):
+    deals = lifetime_book(300)
+    deals.to_csv(tmp_path / "deals.csv", index=False)
+    # Chunks of 64 deals change the matrix width per chunk but not the results
+    score_deal_file(str(tmp_path / "deals.csv"), str(tmp_path / "scored.csv"), chunk_size=64, lifetime=True)
+    scored = pd.read_csv(tmp_path / "scored.csv")
+    expected = score_lifetime_frame(deals)
+    for col in LIFETIME_RESULT_COLUMNS[:-1]:
+        np.testing.assert_allclose(scored[col], expected[col], rtol=1e-12)
+    assert scored['Lifetime_Deal_Outcome'].tolist() == expected['Deal_Outcome'].astype(str).tolist()
+    assert 'Deal_Outcome' in scored.columns
+
+
+def test_lifetime_scoring_needs_a_term(tmp_path):
+    random_deals(10).to_csv(tmp_path / "deals.csv", index=False)
+    with pytest.raises(ValueError, match="term_periods"):
+        score_deal_file(str(tmp_path / "deals.csv"), str(tmp_path / "scored.csv"), lifetime=True)
@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from application_pages.background_jobs import JobRegistry
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the job.")
+        time.sleep(0.001)
+
+
+def stepped(context, steps, gates, result):
+    """Reports progress after each step, waiting on the test's gate before moving on."""
+    for step in range(steps):
+        gates[step].wait(5)
+        context.report((step + 1) / steps, f"step {step + 1}")
+    return result
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_progress_is_reported_and_result_collected(executor):
+    jobs = JobRegistry()
+    gates = [threading.Event() for _ in range(3)]
+    job = jobs.submit("Stepped", stepped, 3, gates, "finished", key='stepped', executor=executor)
+    for step, gate in enumerate(gates[:2]):
+        gate.set()
+        wait_until(lambda: job.message == f"step {step + 1}")
+        assert job.status == 'running'
+        assert job.progress == pytest.approx((step + 1) / 3)
+        assert job.result() is None
+    gates[2].set()
+    wait_until(lambda: job.finished)
+    assert (job.status, job.progress, job.result()) == ('done', 1.0, "finished")
+    assert jobs.get('stepped') is job
+    assert jobs.active() == []
+
+
+def test_running_job_stops_at_its_next_report(executor):
+    jobs = JobRegistry()
+    gates = [threading.Event() for _ in range(3)]
+    job = jobs.submit("Stepped", stepped, 3, gates, "finished", executor=executor)
+    gates[0].set()
+    wait_until(lambda: job.progress > 0)
+    jobs.cancel(job.id)
+    assert job.status == 'running' and job.cancel_requested
+    gates[1].set()
+    wait_until(lambda: job.finished)
+    # The report that noticed the cancel is the last one; the third step never runs
+    assert job.status == 'cancelled'
+    assert job.message == "step 2"
+    assert job.progress == pytest.approx(2 / 3)
+    assert job.result() is None
+
+
+def test_queued_job_never_starts(executor):
+    jobs = JobRegistry()
+    gates = [threading.Event()]
+    busy = [jobs.submit("Busy", stepped, 1, gates, None, executor=executor) for _ in range(2)]
+    started = []
+    queued = jobs.submit("Queued", lambda context: started.append(True), executor=executor)
+    queued.cancel()
+    assert queued.status == 'cancelled'
+    gates[0].set()
+    wait_until(lambda: all(job.finished for job in busy))
+    assert started == []
+
+
+def test_replace_cancels_and_supersedes_a_running_job(executor):
+    jobs = JobRegistry()
+    first_gates = [threading.Event() for _ in range(2)]
+    first = jobs.submit("Simulation", stepped, 2, first_gates, "old", key='simulation', executor=executor)
+    first_gates[0].set()
+    wait_until(lambda: first.progress > 0)
+    # Without replace the running job is handed back
+    assert jobs.submit("Simulation", stepped, 1, first_gates, "ignored", key='simulation', executor=executor) is first
+
+    second_gates = [threading.Event()]
+    second = jobs.submit("Simulation", stepped, 1, second_gates, "new", key='simulation', replace=True, executor=executor)
+    assert second is not first
+    assert first.cancel_requested
+    assert jobs.get('simulation') is second
+    first_gates[1].set()
+    second_gates[0].set()
+    wait_until(lambda: first.finished and second.finished)
+    assert (first.status, first.result()) == ('cancelled', None)
+    assert (second.status, second.result()) == ('done', "new")
+
+
+def test_failure_keeps_the_error():
+    jobs = JobRegistry()
+
+    def fail(context):
+        raise ValueError("bad input")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        job = jobs.submit("Failing", fail, executor=executor)
+    assert job.status == 'failed'
+    assert str(job.error) == "bad input"
+    assert job.error.__traceback__ is None
+
+
+def test_cancel_racing_completion_leaves_a_consistent_job(executor):
+    jobs = JobRegistry()
+    for _ in range(200):
+        job = jobs.submit("Quick", lambda context: "done", executor=executor)
+        job.cancel()
+        wait_until(lambda: job.finished)
+        assert (job.status, job.result()) in (('done', "done"), ('cancelled', None))
+        assert job.finished_at is not None
@@ -0,0 +1,74 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from application_pages import deal_ingest
+from application_pages.deal_ingest import score_deal_file
+from application_pages.portfolio_generator import write_synthetic_portfolio
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, score_deals_frame
+from application_pages.rarorac_parallel import MIN_ROWS_PER_WORKER
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_empty_book_still_writes_the_columns(tmp_path, suffix):
+    path = tmp_path / f"empty{suffix}"
+    write_synthetic_portfolio(str(path), 0, seed=7)
+    frame = pd.read_csv(path) if suffix == ".csv" else pd.read_parquet(path)
+    assert len(frame) == 0
+    assert list(frame.columns) == ['deal_id'] + RARORAC_INPUT_COLUMNS
+
+
+@pytest.mark.parametrize("break_even", [False, True])
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_scoring_an_empty_book_writes_the_same_schema_as_a_full_one(tmp_path, suffix, break_even):
+    outputs = {}
+    for rows in (0, 50):
+        deals = tmp_path / f"deals_{rows}{suffix}"
+        write_synthetic_portfolio(str(deals), rows, seed=7)
+        outputs[rows] = tmp_path / f"scored_{rows}{suffix}"
+        score_deal_file(str(deals), str(outputs[rows]), break_even=break_even)
+    if suffix == ".csv":
+        empty, full = (pd.read_csv(outputs[rows]) for rows in (0, 50))
+        assert list(empty.columns) == list(full.columns)
+    else:
+        pq = pytest.importorskip("pyarrow.parquet")
+        assert pq.read_schema(outputs[0]).remove_metadata() == pq.read_schema(outputs[50]).remove_metadata()
+        empty = pd.read_parquet(outputs[0])
+    assert len(empty) == 0
+    assert ('Break_Even_Interest_Rate' in empty.columns) == break_even
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_missing_input_column_is_named(tmp_path, suffix):
+    deals = pd.DataFrame({col: [0.1, 0.2] for col in RARORAC_INPUT_COLUMNS if col != 'fees'})
+    path = tmp_path / f"deals{suffix}"
+    if suffix == ".csv":
+        deals.to_csv(path, index=False)
+    else:
+        deals.to_parquet(path)
+    with pytest.raises(ValueError, match="missing required columns: fees"):
+        score_deal_file(str(path), str(tmp_path / "scored.csv"))
+
+
+def test_chunks_too_small_for_the_workers_warn_and_score_in_process(tmp_path):
+    deals = tmp_path / "deals.csv"
+    write_synthetic_portfolio(str(deals), 2_500, seed=3, chunk_size=1_000)
+    with pytest.warns(RuntimeWarning, match="keep only 1 of 4 workers busy"):
+        parallel = score_deal_file(str(deals), str(tmp_path / "parallel.csv"), chunk_size=1_000, workers=4)
+    serial = score_deal_file(str(deals), str(tmp_path / "serial.csv"), chunk_size=1_000)
+    assert parallel == serial
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "parallel.csv"), pd.read_csv(tmp_path / "serial.csv"))
+
+
+def test_default_chunk_size_keeps_every_worker_busy(tmp_path, monkeypatch):
+    deals = tmp_path / "deals.parquet"
+    write_synthetic_portfolio(str(deals), 2 * MIN_ROWS_PER_WORKER, seed=5)
+    seen = []
+    monkeypatch.setattr(deal_ingest, "score_deals_frame_parallel",
+                        lambda chunk, workers, executor: seen.append(len(chunk)) or score_deals_frame(chunk))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        score_deal_file(str(deals), str(tmp_path / "scored.parquet"), workers=2)
+    assert deal_ingest.default_chunk_size(2) == 2 * MIN_ROWS_PER_WORKER
+    assert seen == [2 * MIN_ROWS_PER_WORKER]
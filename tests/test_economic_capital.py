@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from application_pages.economic_capital import allocate_economic_capital, simulate_portfolio_losses
+
+
+def sample_book(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(1e4, 1e6, n), rng.uniform(0.002, 0.05, n)
+
+
+def test_es_contributions_add_up_to_es():
+    exposure, probability_of_default = sample_book()
+    summary, losses, contributions = simulate_portfolio_losses(
+        exposure, probability_of_default, 0.15, num_scenarios=5000, confidence=0.99, seed=1, scenario_chunk=512
+    )
+    tail = np.sort(losses)[-summary['Tail_Scenarios']:]
+    assert summary['Tail_Scenarios'] == 50
+    assert contributions.sum() == summary['ES']
+    assert summary['ES'] == pytest.approx(tail.mean(), rel=1e-12)
+    assert summary['VaR'] == tail[0]
+    assert summary['Expected_Loss'] == pytest.approx(losses.mean())
+    assert (contributions >= 0).all()
+
+
+def test_results_do_not_depend_on_workers_or_obligor_chunk():
+    exposure, probability_of_default = sample_book()
+    options = dict(num_scenarios=3000, confidence=0.99, seed=2, scenario_chunk=256)
+    serial = simulate_portfolio_losses(exposure, probability_of_default, 0.2, **options)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        pooled = simulate_portfolio_losses(exposure, probability_of_default, 0.2, executor=executor, **options)
+    rechunked = simulate_portfolio_losses(exposure, probability_of_default, 0.2, obligor_chunk=64, **options)
+
+    assert pooled[0] == serial[0]
+    np.testing.assert_array_equal(pooled[1], serial[1])
+    np.testing.assert_array_equal(pooled[2], serial[2])
+    # Tail membership and default counts are the same; losses differ only by summation order
+    np.testing.assert_allclose(rechunked[1], serial[1], rtol=1e-13)
+    np.testing.assert_array_equal(rechunked[2], serial[2])
+
+
+@pytest.mark.parametrize("capital_measure, target", [('es', 'ES'), ('var', 'VaR')])
+def test_allocated_capital_adds_up_to_the_measure(capital_measure, target):
+    loan_amount, expected_loss_rate = sample_book(seed=3)
+    summary, allocation = allocate_economic_capital(
+        loan_amount, expected_loss_rate * 0.45, capital_measure=capital_measure,
+        num_scenarios=4000, confidence=0.995, seed=4,
+    )
+    assert allocation['Economic_Capital'].sum() == pytest.approx(summary[target] - summary['Model_Expected_Loss'], rel=1e-9)
+    assert summary['Economic_Capital'] == pytest.approx(summary[target] - summary['Model_Expected_Loss'])
+    np.testing.assert_allclose(allocation['Economic_Capital_Factor'] * loan_amount, allocation['Economic_Capital'])
+
+
+def test_invalid_inputs_are_rejected():
+    with pytest.raises(ValueError, match="Confidence"):
+        simulate_portfolio_losses([1.0], 0.01, 0.1, confidence=1.0)
+    with pytest.raises(ValueError, match="Probabilities of default"):
+        simulate_portfolio_losses([1.0], 1.5, 0.1)
+    with pytest.raises(ValueError, match="Capital measure"):
+        allocate_economic_capital([1.0], 0.01, capital_measure='cvar')
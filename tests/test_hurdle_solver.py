@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from application_pages.hurdle_solver import bisect_break_even, solve_break_even, solve_break_even_frame, solve_break_even_numeric
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, calculate_rarorac_metrics_batch
+from tests.test_rarorac_batch import random_deals
+
+# Brackets wide enough to hold every break-even of random_deals
+BRACKETS = {
+    'interest_rate': ('Break_Even_Interest_Rate', -1e3, 1e3),
+    'fees': ('Break_Even_Fees', -1e10, 1e10),
+    'expected_loss_rate': ('Max_Expected_Loss_Rate', -1e3, 1e3),
+    'ul_capital_factor': ('Max_UL_Capital_Factor', 1e-12, 1e6),
+}
+
+
+@pytest.mark.parametrize("param", list(BRACKETS))
+def test_closed_form_matches_bisection(param):
+    deals = random_deals(500)
+    inputs = {col: deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS}
+    column, lower, upper = BRACKETS[param]
+    closed = solve_break_even(**inputs)[column]
+    numeric = solve_break_even_numeric(param, lower, upper, **inputs)
+    solved = np.isfinite(closed)
+    assert solved.sum() > 200
+    np.testing.assert_allclose(numeric[solved], closed[solved], rtol=1e-9, atol=1e-9 * abs(upper))
+
+
+def test_break_even_inputs_reprice_to_the_hurdle():
+    deals = random_deals(500)
+    solved = solve_break_even_frame(deals)
+    for param, (column, _, _) in BRACKETS.items():
+        rows = np.isfinite(solved[column].to_numpy())
+        trial = {col: deals[col].to_numpy()[rows] for col in RARORAC_INPUT_COLUMNS}
+        trial[param] = solved[column].to_numpy()[rows]
+        rarorac = calculate_rarorac_metrics_batch(*(trial[col] for col in RARORAC_INPUT_COLUMNS))['RARORAC']
+        np.testing.assert_allclose(rarorac, trial['hurdle_rate'], rtol=1e-9, atol=1e-9)
+
+
+def test_bisection_without_a_sign_change_returns_nan():
+    roots = bisect_break_even(lambda x: x * x - 4.0, [0.0, 3.0, -5.0], [5.0, 5.0, 0.0])
+    assert roots[0] == pytest.approx(2.0)
+    assert np.isnan(roots[1])
+    assert roots[2] == pytest.approx(-2.0)
+
+
+def test_a_deal_that_can_never_meet_the_hurdle_has_no_numeric_break_even():
+    # Operating costs take all the income, so no interest rate helps
+    deal = dict(loan_amount=1e6, interest_rate=0.05, fees=1e3, operating_cost_ratio=1.0,
+                expected_loss_rate=0.01, ul_capital_factor=0.1, hurdle_rate=0.15)
+    assert np.isnan(solve_break_even(**deal)['Break_Even_Interest_Rate'])
+    assert np.isnan(solve_break_even_numeric('interest_rate', -1e3, 1e3, **deal))
+
+
+@pytest.mark.parametrize("param", ["hurdle_rate", "tenor"])
+def test_numeric_solver_rejects_unknown_inputs(param):
+    with pytest.raises(ValueError, match="Cannot solve"):
+        solve_break_even_numeric(param, 0.0, 1.0, 1e6, 0.05, 1e3, 0.3, 0.01, 0.1, 0.15)
+
+
+@pytest.mark.parametrize("loan_amount, ul_capital_factor", [(1e6, 0.0), (0.0, 0.1)])
+def test_deals_without_capital_always_meet_the_hurdle(loan_amount, ul_capital_factor):
+    deal = dict(loan_amount=loan_amount, interest_rate=0.0, fees=0.0, operating_cost_ratio=0.9,
+                expected_loss_rate=0.5, ul_capital_factor=ul_capital_factor, hurdle_rate=0.15)
+    assert calculate_rarorac_metrics(**deal)['Deal_Outcome'] == 'Meets Hurdle Rate'
+    solved = solve_break_even(**deal)
+    assert solved['Break_Even_Interest_Rate'] == -np.inf
+    assert solved['Break_Even_Fees'] == -np.inf
+    assert solved['Max_Expected_Loss_Rate'] == np.inf
+    # With a loan, any capital at all exposes the negative reward, so only zero capital meets the hurdle
+    if loan_amount == 0:
+        assert solved['Max_UL_Capital_Factor'] == np.inf
+    else:
+        assert np.isnan(solved['Max_UL_Capital_Factor'])
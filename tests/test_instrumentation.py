@@ -0,0 +1,28 @@
+import os
+import threading
+
+from application_pages.instrumentation import shared_metrics
+
+
+def test_concurrent_prometheus_file_writes(tmp_path):
+    path = tmp_path / "rarorac.prom"
+    errors = []
+
+    def write():
+        try:
+            for _ in range(100):
+                shared_metrics.write_prometheus_file(str(path))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # Only the finished file is left behind, readable by a collector running as another user
+    assert os.listdir(tmp_path) == ["rarorac.prom"]
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    assert path.read_text().endswith("\n")
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from application_pages.monte_carlo import iter_rarorac_simulation, simulate_rarorac
+
+DEAL = dict(loan_amount=1e6, interest_rate=0.05, fees=1e3, operating_cost_ratio=0.3,
+            expected_loss_rate=0.01, ul_capital_factor=0.1, hurdle_rate=0.15)
+
+
+def test_a_seed_and_chunk_size_reproduce_the_same_draws():
+    first_summary, first = simulate_rarorac(**DEAL, num_draws=25_000, seed=42, chunk_size=10_000)
+    second_summary, second = simulate_rarorac(**DEAL, num_draws=25_000, seed=42, chunk_size=10_000)
+    np.testing.assert_array_equal(first, second)
+    assert first_summary == second_summary
+    _, other = simulate_rarorac(**DEAL, num_draws=25_000, seed=43, chunk_size=10_000)
+    assert not np.array_equal(first, other)
+
+
+def test_chunks_reuse_their_seed_whatever_the_number_of_draws():
+    # Chunk i draws from the i-th child seed, so a longer run extends a shorter one
+    _, short = simulate_rarorac(**DEAL, num_draws=20_000, seed=7, chunk_size=10_000)
+    _, long = simulate_rarorac(**DEAL, num_draws=35_000, seed=7, chunk_size=10_000)
+    np.testing.assert_array_equal(long[:20_000], short)
+
+
+@pytest.mark.parametrize("chunk_size", [1_000, 7_777, 50_000])
+def test_progress_ends_at_the_final_summary_for_any_chunk_size(chunk_size):
+    updates = []
+    summary, rarorac = simulate_rarorac(**DEAL, num_draws=50_000, seed=1, chunk_size=chunk_size,
+                                        progress_callback=lambda draws, running: updates.append((draws, running)))
+    assert len(updates) == -(-50_000 // chunk_size)
+    assert [draws for draws, _ in updates] == sorted({draws for draws, _ in updates})
+    draws, running = updates[-1]
+    assert draws == running['Draws'] == summary['Draws'] == rarorac.size == 50_000
+    assert running['Hurdle_Pass_Probability'] == pytest.approx(summary['Hurdle_Pass_Probability'], rel=1e-12)
+    assert running['RARORAC_Mean'] == pytest.approx(summary['RARORAC_Mean'], rel=1e-9)
+
+
+def test_draws_are_centred_on_the_deal():
+    chunks = list(iter_rarorac_simulation(**DEAL, num_draws=200_000, seed=3))
+    expected_loss_rate = np.concatenate([c['Default_Rate'] * c['Loss_Given_Default'] for c in chunks])
+    interest_rate = np.concatenate([c['Interest_Rate'] for c in chunks])
+    # PD and LGD are drawn independently, so their product keeps the deal's expected loss rate
+    assert expected_loss_rate.mean() == pytest.approx(DEAL['expected_loss_rate'], rel=0.02)
+    assert interest_rate.mean() == pytest.approx(DEAL['interest_rate'], abs=1e-4)
+
+
+@pytest.mark.parametrize("options, message", [
+    (dict(num_draws=0), "must be positive"),
+    (dict(expected_loss_rate=0.0), "Expected loss rate"),
+    (dict(lgd_std=0.6), "Loss given default"),
+])
+def test_invalid_assumptions_are_rejected(options, message):
+    with pytest.raises(ValueError, match=message):
+        next(iter_rarorac_simulation(**dict(DEAL, **options)))
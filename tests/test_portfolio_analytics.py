@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.portfolio_analytics import RISK_BUCKET_LABELS, PortfolioAnalytics, herfindahl_index, risk_bucket_codes
+from application_pages.rarorac_batch import score_deals_frame
+from tests.test_rarorac_batch import random_deals
+
+
+def scored_book(n=5_000, seed=0):
+    deals = random_deals(n, seed)
+    rng = np.random.default_rng(seed)
+    deals['desk'] = rng.choice(['Corporate', 'SME', 'Real Estate', None], n)
+    return pd.concat([deals, score_deals_frame(deals)], axis=1)
+
+
+def pandas_hhi(exposure):
+    shares = exposure / exposure.sum()
+    return float((shares ** 2).sum())
+
+
+@pytest.mark.parametrize("group", ['desk', 'Risk_Bucket'])
+def test_group_by_matches_pandas(group):
+    book = scored_book()
+    analytics = PortfolioAnalytics.from_frame(book, group_columns=['desk'])
+    if group == 'Risk_Bucket':
+        book[group] = np.array(RISK_BUCKET_LABELS, dtype=object)[risk_bucket_codes(book['expected_loss_rate'])]
+    result = analytics.by(group).set_index(group)
+    expected = book.groupby(group, dropna=False).agg(
+        Deals=('loan_amount', 'size'),
+        Exposure=('loan_amount', 'sum'),
+        Risk_Adjusted_Capital=('Risk_Adjusted_Capital', 'sum'),
+        Net_Risk_Adjusted_Reward=('Net_Risk_Adjusted_Reward', 'sum'),
+        Success_Rate=('Meets_Hurdle', 'mean'),
+    )
+    expected['Exposure_Share'] = expected['Exposure'] / expected['Exposure'].sum()
+    expected['Capital_Weighted_RARORAC'] = expected['Net_Risk_Adjusted_Reward'] / expected['Risk_Adjusted_Capital']
+    # pandas sorts the groups; the engine keeps them in order of first appearance
+    result = result.loc[expected.index]
+    for col in expected.columns:
+        np.testing.assert_allclose(result[col].to_numpy(dtype=np.float64), expected[col].to_numpy(dtype=np.float64), rtol=1e-10, err_msg=col)
+    assert analytics.group_hhi(group) == pytest.approx(pandas_hhi(expected['Exposure']), rel=1e-12)
+
+
+def test_totals_match_pandas():
+    book = scored_book()
+    totals = PortfolioAnalytics.from_frame(book).totals()
+    rarorac = book['RARORAC']
+    finite = np.isfinite(rarorac)
+    assert totals['Deals'] == len(book)
+    assert totals['Capital_Weighted_RARORAC'] == pytest.approx(book['Net_Risk_Adjusted_Reward'].sum() / book['Risk_Adjusted_Capital'].sum())
+    assert totals['Exposure_Weighted_RARORAC'] == pytest.approx(np.average(rarorac[finite], weights=book['loan_amount'][finite]))
+    assert totals['Success_Rate'] == pytest.approx(book['Meets_Hurdle'].mean())
+    assert totals['Deal_HHI'] == pytest.approx(pandas_hhi(book['loan_amount']))
+    buckets = book.groupby(risk_bucket_codes(book['expected_loss_rate']))['loan_amount'].sum()
+    assert totals['Risk_Bucket_HHI'] == pytest.approx(pandas_hhi(buckets))
+
+
+def test_risk_buckets_and_hhi_edge_cases():
+    codes = risk_bucket_codes([-0.01, 0.0, 0.005, 0.0199, 0.02, 0.5, np.nan])
+    assert [RISK_BUCKET_LABELS[c] for c in codes] == ["0-0.5%", "0-0.5%", "0.5-1%", "1-2%", "2-5%", "10%+", "10%+"]
+    assert herfindahl_index([1.0, 1.0, 1.0, 1.0]) == pytest.approx(0.25)
+    assert herfindahl_index([5.0, 0.0]) == 1.0
+    assert np.isnan(herfindahl_index([0.0, 0.0]))
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.portfolio_binning import bin_portfolio, portfolio_scatter_chart, sample_outliers
+
+
+def skewed_book(n, seed=0):
+    rng = np.random.default_rng(seed)
+    book = pd.DataFrame({'risk': rng.lognormal(-4.0, 1.0, n), 'rarorac': rng.normal(0.15, 0.1, n)})
+    # Zero-capital deals have infinite RARORAC and cannot be placed on the grid
+    book.loc[::97, 'rarorac'] = np.inf
+    return book
+
+
+@pytest.mark.parametrize("bins", [10, 60])
+def test_bins_and_unplaced_deals_add_up_to_the_book(bins):
+    book = skewed_book(20_000)
+    bin_frame, x_edges, y_edges = bin_portfolio(book['risk'], book['rarorac'], bins=bins)
+    finite = np.isfinite(book['rarorac']).sum()
+    assert bin_frame['Count'].sum() == finite < len(book)
+    assert len(bin_frame) <= bins ** 2 and (bin_frame['Count'] > 0).all()
+    assert len(x_edges) == len(y_edges) == bins + 1
+
+
+@pytest.mark.parametrize("bins", [10, 60])
+def test_outliers_are_exactly_the_deals_in_sparse_bins(bins):
+    book = skewed_book(20_000)
+    bin_frame, x_edges, y_edges = bin_portfolio(book['risk'], book['rarorac'], bins=bins)
+    outliers = sample_outliers(book, 'risk', 'rarorac', x_edges, y_edges, max_points=len(book), sparse_bin_count=2)
+    sparse = bin_frame.loc[bin_frame['Count'] <= 2, 'Count'].sum()
+    assert len(outliers) == sparse > 0
+    # Dense bins plus the sparse deals drawn individually account for every placed deal
+    assert bin_frame.loc[bin_frame['Count'] > 2, 'Count'].sum() + len(outliers) == bin_frame['Count'].sum()
+    assert np.isfinite(outliers['rarorac']).all()
+
+
+def test_outlier_sample_is_capped_and_reproducible():
+    book = skewed_book(20_000)
+    _, x_edges, y_edges = bin_portfolio(book['risk'], book['rarorac'], bins=60)
+    first = sample_outliers(book, 'risk', 'rarorac', x_edges, y_edges, max_points=10, sparse_bin_count=50)
+    second = sample_outliers(book, 'risk', 'rarorac', x_edges, y_edges, max_points=10, sparse_bin_count=50)
+    assert len(first) == 10
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_large_books_are_charted_as_bins_not_rows():
+    book = skewed_book(20_000)
+    chart = portfolio_scatter_chart(book, 'risk', 'rarorac', 'Risk', 'Return', 'Book', threshold=5_000, bins=60).to_dict()
+    rows = sum(len(values) for values in chart['datasets'].values())
+    assert rows <= 60 ** 2 + 500
+    small = portfolio_scatter_chart(book.head(100), 'risk', 'rarorac', 'Risk', 'Return', 'Book').to_dict()
+    assert sum(len(values) for values in small['datasets'].values()) == 100
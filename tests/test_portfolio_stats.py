@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from application_pages.portfolio_stats import PortfolioSummary, QuantileSketch
+
+
+def test_quantiles_are_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(0.0, 2.0, 20_000) * np.where(np.arange(20_000) % 4, 1, -1)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add_many(values)
+    ordered = np.sort(values)
+    for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0):
+        exact = ordered[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.0101)
+
+
+def test_remove_undoes_add():
+    values = [3.0, -2.0, 0.0, np.inf, 1e-3, 250.0, 7.5]
+    sketch = QuantileSketch()
+    sketch.add_many(values)
+    reference = QuantileSketch()
+    reference.add_many(values[:4])
+    for value in values[4:]:
+        sketch.remove(value)
+    assert sketch.count == reference.count == 4
+    assert [sketch.quantile(q) for q in (0, 0.5, 1)] == [reference.quantile(q) for q in (0, 0.5, 1)]
+    assert sketch.count_above(1.0) == 2
+    sketch.remove_many(values[:4])
+    assert sketch.count == 0
+    assert np.isnan(sketch.quantile(0.5))
+
+
+def test_portfolio_summary_matches_exact_aggregates():
+    rng = np.random.default_rng(1)
+    risk, rarorac = rng.uniform(0, 0.1, 1000), rng.normal(0.1, 0.05, 1000)
+    meets = rarorac >= 0.12
+    summary = PortfolioSummary()
+    summary.add_many(risk, rarorac, meets)
+    summary.remove_many(risk[:100], rarorac[:100], meets[:100])
+    assert summary.count == 900
+    assert summary.success_rate == pytest.approx(meets[100:].mean())
+    assert summary.mean_risk == pytest.approx(risk[100:].mean())
+    assert summary.mean_rarorac == pytest.approx(rarorac[100:].mean())
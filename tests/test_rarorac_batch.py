@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.rarorac_batch import (
+    DEAL_OUTCOMES, RARORAC_INPUT_COLUMNS, RARORAC_RESULT_COLUMNS, calculate_rarorac_metrics_batch, score_deals_frame,
+)
+
+
+def random_deals(n, seed=0):
+    rng = np.random.default_rng(seed)
+    deals = {
+        'loan_amount': rng.uniform(1e4, 1e7, n),
+        'interest_rate': rng.uniform(0.0, 0.2, n),
+        'fees': rng.uniform(0.0, 5e4, n),
+        'operating_cost_ratio': rng.uniform(0.0, 0.8, n),
+        'expected_loss_rate': rng.uniform(0.0, 0.1, n),
+        'ul_capital_factor': rng.uniform(0.01, 0.2, n),
+        'hurdle_rate': rng.uniform(0.0, 0.3, n),
+    }
+    # Zero capital, from a zero factor or a zero loan, must follow the scalar rule too
+    deals['ul_capital_factor'][::7] = 0.0
+    deals['loan_amount'][3::11] = 0.0
+    return pd.DataFrame(deals)
+
+
+def test_batch_matches_scalar_calculator():
+    deals = random_deals(500)
+    batch = calculate_rarorac_metrics_batch(*(deals[col].to_numpy() for col in RARORAC_INPUT_COLUMNS))
+    for i, deal in enumerate(deals.itertuples(index=False)):
+        scalar = calculate_rarorac_metrics(*deal)
+        for col in RARORAC_RESULT_COLUMNS:
+            if col == 'Meets_Hurdle':
+                assert DEAL_OUTCOMES[int(batch[col][i])] == scalar['Deal_Outcome']
+            else:
+                assert batch[col][i] == pytest.approx(scalar[col], rel=1e-12, abs=1e-9), (i, col)
+
+
+def test_zero_capital_gives_infinite_rarorac_and_meets_hurdle():
+    metrics = calculate_rarorac_metrics_batch(
+        np.array([1e6, 0.0]), 0.05, 1000.0, 0.3, 0.01, np.array([0.0, 0.1]), 0.15
+    )
+    scalar = calculate_rarorac_metrics(1e6, 0.05, 1000.0, 0.3, 0.01, 0.0, 0.15)
+    assert scalar['RARORAC'] == np.inf
+    assert metrics['RARORAC'].tolist() == [np.inf, np.inf]
+    assert metrics['Meets_Hurdle'].tolist() == [True, True]
+    assert scalar['Deal_Outcome'] == 'Meets Hurdle Rate'
+
+
+def test_score_deals_frame_labels_outcomes():
+    deals = random_deals(50, seed=1)
+    scored = score_deals_frame(deals)
+    assert scored.index.equals(deals.index)
+    expected = [calculate_rarorac_metrics(*deal)['Deal_Outcome'] for deal in deals.itertuples(index=False)]
+    assert scored['Deal_Outcome'].astype(str).tolist() == expected
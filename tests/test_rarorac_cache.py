@@ -0,0 +1,49 @@
+from application_pages.instrumentation import MetricsRegistry
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.rarorac_cache import RaroracResultCache
+
+PARAMS = (1e6, 0.05, 1000.0, 0.3, 0.01, 0.08, 0.15)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_counters_follow_hits_misses_evictions_and_expirations():
+    clock = FakeClock()
+    cache = RaroracResultCache(max_entries=2, ttl_seconds=60, clock=clock)
+    first = cache.get_or_compute(PARAMS, calculate_rarorac_metrics)
+    assert first == calculate_rarorac_metrics(*PARAMS)
+    # Integer and float inputs are the same deal
+    assert cache.get_or_compute((1_000_000, 0.05, 1000, 0.3, 0.01, 0.08, 0.15), calculate_rarorac_metrics) == first
+    cache.get_or_compute(PARAMS[:-1] + (0.2,), calculate_rarorac_metrics)
+    cache.get_or_compute(PARAMS[:-1] + (0.3,), calculate_rarorac_metrics)
+    clock.now = 61
+    cache.get_or_compute(PARAMS[:-1] + (0.3,), calculate_rarorac_metrics)
+    stats = cache.stats()
+    assert (stats['Hits'], stats['Misses'], stats['Evictions'], stats['Expirations'], stats['Entries']) == (1, 4, 1, 1, 2)
+    assert stats['Hit_Rate'] == 0.2
+
+
+def test_callers_get_their_own_copy():
+    cache = RaroracResultCache()
+    cache.get_or_compute(PARAMS, calculate_rarorac_metrics)['RARORAC'] = -1.0
+    assert cache.get_or_compute(PARAMS, calculate_rarorac_metrics)['RARORAC'] == calculate_rarorac_metrics(*PARAMS)['RARORAC']
+
+
+def test_registered_cache_is_exported():
+    registry = MetricsRegistry()
+    cache = RaroracResultCache()
+    registry.register_cache("results", cache.stats)
+    cache.get_or_compute(PARAMS, calculate_rarorac_metrics)
+    cache.get_or_compute(PARAMS, calculate_rarorac_metrics)
+    assert registry.cache_stats()["results"]["Hits"] == 1
+    text = registry.render_prometheus()
+    assert 'rarorac_cache_hits_total{cache="results"} 1' in text
+    assert 'rarorac_cache_misses_total{cache="results"} 1' in text
+    assert 'rarorac_cache_evictions_total{cache="results"} 0' in text
+    assert 'rarorac_cache_entries{cache="results"} 1' in text
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS, RARORAC_RESULT_COLUMNS, calculate_rarorac_metrics_batch
+from application_pages.rarorac_incremental import IncrementalRarorac, invalidated_metrics
+from tests.test_rarorac_batch import random_deals
+
+PARAMS = dict(loan_amount=1e6, interest_rate=0.05, fees=1000.0, operating_cost_ratio=0.3,
+              expected_loss_rate=0.01, ul_capital_factor=0.08, hurdle_rate=0.15)
+
+
+def assert_same_metrics(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        np.testing.assert_array_equal(actual[name], value, err_msg=name)
+
+
+def test_hurdle_change_only_reruns_the_hurdle_test():
+    assert invalidated_metrics(['hurdle_rate']) == ['Meets_Hurdle']
+    engine = IncrementalRarorac.from_params(PARAMS)
+    assert engine.update(hurdle_rate=0.5) == ['Meets_Hurdle']
+    assert engine.evaluations['RARORAC'] == 1
+    assert engine.evaluations['Meets_Hurdle'] == 2
+    assert_same_metrics(engine.metrics, calculate_rarorac_metrics(**{**PARAMS, 'hurdle_rate': 0.5}))
+
+
+@pytest.mark.parametrize("change", [{'fees': 0.0}, {'ul_capital_factor': 0.0}, {'loan_amount': 2.5e6, 'hurdle_rate': 0.0}])
+def test_scalar_updates_match_a_fresh_calculation(change):
+    engine = IncrementalRarorac.from_params(PARAMS)
+    engine.update(**change)
+    assert_same_metrics(engine.metrics, calculate_rarorac_metrics(**{**PARAMS, **change}))
+
+
+def test_row_updates_match_batch_and_leave_caller_arrays_alone():
+    deals = random_deals(200, seed=2)
+    fees = deals['fees'].to_numpy()
+    original_fees = fees.copy()
+    engine = IncrementalRarorac.from_frame(deals)
+    rows = np.arange(0, 200, 3)
+    engine.update(rows=rows, fees=fees[rows] * 2, hurdle_rate=0.1)
+
+    np.testing.assert_array_equal(fees, original_fees)
+    expected_inputs = {col: deals[col].to_numpy().copy() for col in RARORAC_INPUT_COLUMNS}
+    expected_inputs['fees'][rows] *= 2
+    expected_inputs['hurdle_rate'][rows] = 0.1
+    expected = calculate_rarorac_metrics_batch(*(expected_inputs[col] for col in RARORAC_INPUT_COLUMNS))
+    assert_same_metrics(engine.metrics, {name: expected[name] for name in RARORAC_RESULT_COLUMNS})
+
+
+def test_unknown_input_is_rejected():
+    engine = IncrementalRarorac.from_params(PARAMS)
+    with pytest.raises(ValueError, match="Unknown inputs: fee"):
+        engine.update(fee=1.0)
@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.rarorac_batch import RARORAC_INPUT_COLUMNS
+from application_pages.scenario_exchange import (
+    SCENARIO_FILE_FORMATS, available_formats, export_scenarios_bytes, import_scenarios, read_scenarios, validate_scenario_columns,
+    write_scenarios,
+)
+from application_pages.scenario_store import ScenarioStore
+from tests.test_scenario_store import save_scenarios
+
+
+def assert_same_scenarios(actual, expected):
+    # Compared as arrays, since scenarios saved without results hold NaN
+    actual_names, actual_values, actual_outcomes = actual
+    expected_names, expected_values, expected_outcomes = expected
+    assert actual_names == expected_names
+    np.testing.assert_array_equal(actual_values, expected_values)
+    np.testing.assert_array_equal(actual_outcomes, expected_outcomes)
+
+
+def sample_store():
+    store = ScenarioStore()
+    save_scenarios(store, 5)
+    # Zero capital (infinite RARORAC) and a scenario saved without results must survive the trip
+    store.save("no capital", {'loan_amount': 1e6, 'ul_capital_factor': 0.0}, {'RARORAC': np.inf, 'Deal_Outcome': 'Meets Hurdle Rate'})
+    store.save("inputs only", {'loan_amount': 5e5}, None)
+    store.delete("deal 3")
+    return store
+
+
+@pytest.mark.parametrize("file_format", available_formats())
+def test_bytes_round_trip(file_format):
+    store = sample_store()
+    assert_same_scenarios(read_scenarios(export_scenarios_bytes(store, file_format), file_format), store.to_arrays())
+
+
+@pytest.mark.parametrize("file_format", available_formats())
+def test_file_import_overwrites_or_replaces(tmp_path, file_format):
+    path = tmp_path / f"scenarios{SCENARIO_FILE_FORMATS[file_format][0]}"
+    source = sample_store()
+    write_scenarios(source, path)
+
+    target = ScenarioStore()
+    save_scenarios(target, 2)
+    target.save("extra", {'loan_amount': 1.0}, None)
+    assert import_scenarios(target, path) == len(source)
+    assert target.names() == ["deal 0", "deal 1", "extra", "deal 2", "deal 4", "no capital", "inputs only"]
+    assert target["deal 0"] == source["deal 0"]
+
+    assert import_scenarios(target, path, replace=True) == len(source)
+    assert_same_scenarios(target.to_arrays(), source.to_arrays())
+
+
+def test_inputs_only_file_is_scored_on_import():
+    store = ScenarioStore()
+    save_scenarios(store, 3)
+    names, values, _ = store.to_arrays()
+    inputs = pd.DataFrame(values[:, :len(RARORAC_INPUT_COLUMNS)], columns=RARORAC_INPUT_COLUMNS)
+    inputs.insert(0, 'scenario_name', names)
+
+    imported = ScenarioStore()
+    import_scenarios(imported, inputs.to_csv(index=False).encode(), 'csv')
+    assert_same_scenarios(imported.to_arrays(), store.to_arrays())
+
+
+def test_newer_schema_version_is_rejected():
+    data = export_scenarios_bytes(sample_store(), 'csv').replace(b'schema_version=1', b'schema_version=99', 1)
+    with pytest.raises(ValueError, match="schema version 99"):
+        read_scenarios(data, 'csv')
+
+
+@pytest.mark.parametrize("file_format", available_formats())
+@pytest.mark.parametrize("names, message", [
+    (["a", "", "c"], "non-empty text name"),
+    (["a", None, "c"], "non-empty text name"),
+    (["a", "b", "a"], "repeated: a"),
+])
+def test_bad_names_are_rejected(file_format, names, message):
+    store = ScenarioStore()
+    save_scenarios(store, 3)
+    _, values, _ = store.to_arrays()
+    frame = pd.DataFrame(values[:, :len(RARORAC_INPUT_COLUMNS)], columns=RARORAC_INPUT_COLUMNS)
+    frame.insert(0, 'scenario_name', pd.Series(names, dtype=object))
+    buffer = io.BytesIO()
+    if file_format == 'csv':
+        buffer.write(frame.to_csv(index=False).encode())
+    elif file_format == 'parquet':
+        frame.to_parquet(buffer)
+    else:
+        frame.to_feather(buffer)
+    with pytest.raises(ValueError, match=message):
+        read_scenarios(buffer.getvalue(), file_format)
+
+
+@pytest.mark.parametrize("names", [["a", ""], ["a", 3], ["a", float("nan")], ["b", "b"]])
+def test_bad_names_are_rejected_without_arrow(names):
+    inputs = {col: np.ones(2) for col in RARORAC_INPUT_COLUMNS}
+    with pytest.raises(ValueError, match="non-empty text name|must be unique"):
+        validate_scenario_columns(names, inputs)
+
+
+def test_unknown_outcomes_show_as_unknown_everywhere():
+    store = sample_store()
+    assert store["inputs only"]["results"]["Deal_Outcome"] == "Unknown"
+    assert store.to_frame().set_index("Scenario Name").loc["inputs only", "Deal Outcome"] == "Unknown"
+    page = store.page_frame(sort_by='Deal_Outcome')
+    assert page["Deal Outcome"].iloc[0] == "Unknown"
+    assert page["Deal Outcome"].notna().all()
+    assert list(store.column('Deal_Outcome')).count("Unknown") == 1
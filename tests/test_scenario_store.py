@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.scenario_repository import ScenarioRepository
+from application_pages.scenario_store import SCENARIO_VALUE_COLUMNS, ScenarioStore
+
+PARAMS = dict(loan_amount=1e6, interest_rate=0.05, fees=1000.0, operating_cost_ratio=0.3,
+              expected_loss_rate=0.01, ul_capital_factor=0.08, hurdle_rate=0.15)
+
+
+def save_scenarios(store, count):
+    for i in range(count):
+        parameters = {**PARAMS, 'fees': 1000.0 * i}
+        store.save(f"deal {i}", parameters, calculate_rarorac_metrics(**parameters))
+
+
+def test_rename_keeps_the_data_and_order():
+    store = ScenarioStore()
+    save_scenarios(store, 3)
+    before = store["deal 1"]
+    store.rename("deal 1", "renamed")
+    assert store.names() == ["deal 0", "renamed", "deal 2"]
+    assert store["renamed"] == before
+    assert "deal 1" not in store
+    with pytest.raises(ValueError, match="already exists"):
+        store.rename("deal 0", "renamed")
+
+
+def test_delete_compacts_once_half_the_rows_are_dead():
+    store = ScenarioStore()
+    save_scenarios(store, 10)
+    expected = {name: store[name] for name in store.names() if name not in ("deal 0", "deal 3", "deal 4")}
+    for name in ("deal 0", "deal 3", "deal 4"):
+        store.delete(name)
+    assert store._deleted == 3
+    assert store.names() == list(expected)
+
+    for name in ("deal 1", "deal 2", "deal 5"):
+        store.delete(name)
+        del expected[name]
+    # Six of ten rows deleted: storage was compacted and every name maps to its row again
+    assert store._deleted == 0
+    assert store._names == list(expected)
+    assert {name: store[name] for name in store.names()} == expected
+    assert store.column('fees').tolist() == [store[name]['parameters']['fees'] for name in expected]
+
+
+def test_summary_follows_saves_deletes_and_clear():
+    store = ScenarioStore()
+    save_scenarios(store, 6)
+    store.delete("deal 2")
+    store.save("deal 4", PARAMS, calculate_rarorac_metrics(**PARAMS))
+    rarorac = store.column('RARORAC')
+    assert store.summary.count == len(store) == 5
+    assert store.summary.mean_rarorac == pytest.approx(rarorac.mean())
+    store.clear()
+    assert len(store) == 0
+    assert store.summary.count == 0
+
+
+def test_arrays_round_trip():
+    store = ScenarioStore()
+    save_scenarios(store, 4)
+    store.delete("deal 1")
+    names, values, outcomes = store.to_arrays()
+    copy = ScenarioStore.from_arrays(names, values, outcomes)
+    assert copy.names() == names
+    assert dict(copy.items()) == dict(store.items())
+    with pytest.raises(ValueError, match="shape"):
+        ScenarioStore.from_arrays(names, values[:, :-1])
+
+
+def test_repository_persists_and_other_stores_see_changes(tmp_path):
+    repository = ScenarioRepository(tmp_path / "scenarios.db")
+    first, second = ScenarioStore(repository), ScenarioStore(repository)
+    save_scenarios(first, 4)
+    assert second.names() == first.names()
+
+    second.rename("deal 0", "renamed")
+    second.delete("deal 2")
+    assert first.names() == ["renamed", "deal 1", "deal 3"]
+    with pytest.raises(ValueError, match="already exists"):
+        first.rename("deal 1", "renamed")
+    assert first.names() == second.names()
+
+    values = np.full((1, len(SCENARIO_VALUE_COLUMNS)), 0.5)
+    first.save_many(["bulk"], values, np.array([1], dtype=np.int8))
+    expected = dict(first.items())
+    repository.close()
+
+    reopened = ScenarioRepository(tmp_path / "scenarios.db")
+    store = ScenarioStore(reopened)
+    assert len(store) == 4
+    assert store.names() == ["renamed", "deal 1", "deal 3", "bulk"]
+    assert dict(store.items()) == expected
+
+    other = ScenarioStore(reopened)
+    other.clear()
+    assert len(store) == 0
+    assert reopened.count() == 0
+    reopened.close()
+
+
+def test_repository_pages_match_memory_without_loading_every_row(tmp_path):
+    rng = np.random.default_rng(0)
+    count = 20_000
+    names = [f"deal {i:05d}" for i in rng.permutation(count)]
+    values = rng.uniform(0, 1, (count, len(SCENARIO_VALUE_COLUMNS)))
+    rarorac = values[:, SCENARIO_VALUE_COLUMNS.index('RARORAC')]
+    # Ties, zero-capital (infinite) and missing RARORACs, and unknown outcomes must page the same way
+    rarorac[:] = np.round(rarorac, 2)
+    rarorac[::97] = np.inf
+    rarorac[5::89] = np.nan
+    outcomes = rng.integers(-1, 2, count).astype(np.int8)
+    repository = ScenarioRepository(tmp_path / "scenarios.db")
+    repository.save_many(names, values, outcomes)
+    in_memory = ScenarioStore.from_arrays(names, values, outcomes)
+
+    rows_read = []
+    read_page = repository.read_page
+
+    def counting_read_page(*args, **kwargs):
+        page = read_page(*args, **kwargs)
+        rows_read.append(len(page[1]))
+        return page
+
+    repository.read_page = counting_read_page
+    store = ScenarioStore(repository)
+    assert len(store) == count
+    assert store.cache_key == ('repository', repository.uid, repository.revision)
+    queries = [
+        dict(),
+        dict(sort_by='RARORAC', descending=True),
+        dict(sort_by='RARORAC', rarorac_min=0.5),
+        dict(sort_by='Scenario_Name', descending=True, outcome='Meets Hurdle Rate'),
+        dict(sort_by='Deal_Outcome', descending=True, rarorac_max=0.2),
+        dict(sort_by='loan_amount', outcome='Below Hurdle Rate', rarorac_min=0.1, rarorac_max=0.9),
+    ]
+    for query in queries:
+        filters = {key: query[key] for key in ('outcome', 'rarorac_min', 'rarorac_max') if key in query}
+        matching = store.count_matching(**filters)
+        assert matching == in_memory.count_matching(**filters)
+        last_page = (matching - 1) // 50
+        # Sequential pages continue from the previous page's last key; the others seek
+        for page in (0, 1, 2, 40, last_page, last_page + 1):
+            expected = in_memory.page_frame(page=page, page_size=50, **query)
+            pd.testing.assert_frame_equal(store.page_frame(page=page, page_size=50, **query), expected)
+
+    assert not store._loaded and not store._names
+    assert max(rows_read) <= 50
+    assert sum(rows_read) < count // 10
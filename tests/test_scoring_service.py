@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+import pytest
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.scoring_service import ScoringService
+
+DEAL = {
+    'loan_amount': 1_000_000, 'interest_rate': 0.05, 'fees': 10_000, 'operating_cost_ratio': 0.2,
+    'expected_loss_rate': 0.01, 'ul_capital_factor': 0.08, 'hurdle_rate': 0.15,
+}
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers['content-length']))
+    return int(status_line.split()[1]), headers, json.loads(body)
+
+
+async def _request(reader, writer, method, path, body=None, headers=None):
+    data = body if isinstance(body, bytes) else (json.dumps(body).encode() if body is not None else b'')
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+    for name, value in (headers or {}).items():
+        head += f"{name}: {value}\r\n"
+    writer.write(head.encode('latin-1') + b"\r\n" + data)
+    await writer.drain()
+    return await _read_response(reader)
+
+
+def run_with_service(test, **options):
+    """Runs test(service) against a service listening on a free localhost port."""
+    async def main():
+        service = await ScoringService(port=0, **options).start()
+        try:
+            return await test(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+def test_score_matches_calculator():
+    async def test(service):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        status, _, payload = await _request(reader, writer, 'POST', '/score', DEAL)
+        writer.close()
+        return status, payload
+
+    status, payload = run_with_service(test)
+    expected = calculate_rarorac_metrics(**DEAL)
+    assert status == 200
+    assert payload['Deal_Outcome'] == expected['Deal_Outcome']
+    assert payload['RARORAC'] == pytest.approx(expected['RARORAC'])
+
+
+def test_keep_alive_serves_several_requests_on_one_connection():
+    async def test(service):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        responses = [await _request(reader, writer, 'POST', '/score', DEAL) for _ in range(3)]
+        responses.append(await _request(reader, writer, 'GET', '/health', headers={'Connection': 'close'}))
+        closed = await reader.read() == b''
+        writer.close()
+        return responses, closed, service.connections
+
+    responses, closed, connections = run_with_service(test)
+    assert [status for status, _, _ in responses] == [200, 200, 200, 200]
+    assert [headers['connection'] for _, headers, _ in responses] == ['keep-alive'] * 3 + ['close']
+    assert closed
+    assert connections == 1
+
+
+def test_concurrent_requests_are_batched():
+    async def test(service):
+        async def one(i):
+            reader, writer = await asyncio.open_connection(service.host, service.port)
+            response = await _request(reader, writer, 'POST', '/score', dict(DEAL, loan_amount=100_000 * (i + 1)))
+            writer.close()
+            return response
+        responses = await asyncio.gather(*(one(i) for i in range(20)))
+        return responses, service.batcher.stats()
+
+    responses, stats = run_with_service(test, max_batch_wait=0.05)
+    assert stats['Requests'] == 20
+    assert stats['Batches'] < 20
+    for i, (status, _, payload) in enumerate(responses):
+        assert status == 200
+        assert payload['RARORAC'] == pytest.approx(calculate_rarorac_metrics(**dict(DEAL, loan_amount=100_000 * (i + 1)))['RARORAC'])
+
+
+def test_batch_endpoint_accepts_records_and_columns():
+    async def test(service):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        records = await _request(reader, writer, 'POST', '/score/batch', {'deals': [DEAL, dict(DEAL, ul_capital_factor=0)]})
+        columns = await _request(reader, writer, 'POST', '/score/batch', {key: [value, value] for key, value in DEAL.items()})
+        writer.close()
+        return records, columns
+
+    (status, _, records), (column_status, _, columns) = run_with_service(test)
+    assert status == column_status == 200
+    assert len(records['results']) == 2
+    # Zero capital gives an infinite RARORAC, which JSON carries as null
+    assert records['results'][1]['RARORAC'] is None
+    assert columns['RARORAC'] == [pytest.approx(records['results'][0]['RARORAC'])] * 2
+
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ('GET', '/missing', None, 404),
+    ('GET', '/score', None, 405),
+    ('POST', '/score', b'{not json', 400),
+    ('POST', '/score', {'loan_amount': 1}, 400),
+    ('POST', '/score/batch', {'deals': [DEAL, 'deal']}, 400),
+    ('POST', '/score/batch', dict({key: [value] for key, value in DEAL.items()}, fees=[1, 2]), 400),
+])
+def test_client_errors(method, path, body, status):
+    async def test(service):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        response = await _request(reader, writer, method, path, body)
+        writer.close()
+        return response
+
+    response_status, _, payload = run_with_service(test)
+    assert response_status == status
+    assert payload['error']
+
+
+@pytest.mark.parametrize("content_length, status", [('-5', 400), ('abc', 400), ('100', 413)])
+def test_bad_content_length_is_rejected_and_closes_the_connection(content_length, status):
+    async def test(service):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        writer.write(f"POST /score HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode())
+        await writer.drain()
+        response = await _read_response(reader)
+        closed = await reader.read() == b''
+        writer.close()
+        return response, closed
+
+    (response_status, headers, payload), closed = run_with_service(test, max_body_bytes=10)
+    assert response_status == status
+    assert headers['connection'] == 'close'
+    assert closed
+
+
+def test_metrics_report_latency_per_endpoint():
+    async def test(service):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        for _ in range(5):
+            await _request(reader, writer, 'POST', '/score', DEAL)
+        await _request(reader, writer, 'GET', '/missing')
+        response = await _request(reader, writer, 'GET', '/metrics')
+        writer.close()
+        return response
+
+    status, _, metrics = run_with_service(test)
+    assert status == 200
+    score = metrics['Endpoints']['/score']
+    assert score['Requests'] == 5
+    assert score['Errors'] == 0
+    assert 0 <= score['Latency_P50_Ms'] <= score['Latency_P99_Ms']
+    assert metrics['Endpoints']['unknown']['Errors'] == 1
+    assert metrics['Batching']['Deals'] == 5
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.sensitivity import PARAMETER_LABELS, downsample_grid, sensitivity_grid, tornado_analysis
+
+PARAMS = dict(loan_amount=1e6, interest_rate=0.05, fees=1e3, operating_cost_ratio=0.3,
+              expected_loss_rate=0.01, ul_capital_factor=0.1, hurdle_rate=0.15)
+
+
+def test_tornado_rows_are_ordered_by_swing_and_match_the_scalar_calculator():
+    tornado = tornado_analysis(PARAMS, relative_shift=0.2)
+    assert sorted(tornado['Parameter']) == sorted(PARAMETER_LABELS.values())
+    assert (np.diff(tornado['Swing']) <= 0).all()
+    # The hurdle rate never moves RARORAC, so it comes last
+    assert tornado['Parameter'].iloc[-1] == "Hurdle Rate"
+    assert tornado['Swing'].iloc[-1] == 0.0
+    labels = {label: col for col, label in PARAMETER_LABELS.items()}
+    for row in tornado.itertuples():
+        col = labels[row.Parameter]
+        low = calculate_rarorac_metrics(**dict(PARAMS, **{col: PARAMS[col] * 0.8}))['RARORAC']
+        high = calculate_rarorac_metrics(**dict(PARAMS, **{col: PARAMS[col] * 1.2}))['RARORAC']
+        assert (row.RARORAC_Low, row.RARORAC_High) == pytest.approx((low, high), rel=1e-12)
+        assert row.Swing == pytest.approx(abs(high - low), abs=1e-12)
+    assert tornado['Base_RARORAC'].unique() == pytest.approx([calculate_rarorac_metrics(**PARAMS)['RARORAC']])
+
+
+def test_grid_rows_follow_y_and_columns_follow_x():
+    x_values, y_values = np.linspace(0.01, 0.1, 4), np.linspace(0.05, 0.2, 3)
+    grid = sensitivity_grid(PARAMS, 'interest_rate', x_values, 'ul_capital_factor', y_values)
+    assert grid.shape == (3, 4)
+    for i, y in enumerate(y_values):
+        for j, x in enumerate(x_values):
+            expected = calculate_rarorac_metrics(**dict(PARAMS, interest_rate=x, ul_capital_factor=y))['RARORAC']
+            assert grid[i, j] == pytest.approx(expected, rel=1e-12)
+    with pytest.raises(ValueError, match="two different parameters"):
+        sensitivity_grid(PARAMS, 'fees', x_values, 'fees', y_values)
+
+
+@pytest.mark.parametrize("shape", [(1000, 1000), (137, 51), (50, 50), (7, 3)])
+def test_downsampling_keeps_the_grid_endpoints_and_exact_values(shape):
+    y_values, x_values = np.linspace(0.0, 0.3, shape[0]), np.linspace(0.001, 0.2, shape[1])
+    grid = sensitivity_grid(PARAMS, 'interest_rate', x_values, 'ul_capital_factor', y_values)
+    small = downsample_grid(grid, x_values, y_values, max_cells_per_axis=50)
+    xs, ys = np.sort(small['x'].unique()), np.sort(small['y'].unique())
+    assert len(xs) == min(shape[1], 50) and len(ys) == min(shape[0], 50)
+    assert (xs[0], xs[-1], ys[0], ys[-1]) == (x_values[0], x_values[-1], y_values[0], y_values[-1])
+    # Zero capital on the first row is infinite and left blank; every other cell is the grid's own value
+    assert small.loc[small['y'] == 0.0, 'value'].isna().all()
+    for row in small[small['y'] > 0].sample(20, random_state=0, replace=True).itertuples():
+        assert row.value == grid[np.flatnonzero(y_values == row.y)[0], np.flatnonzero(x_values == row.x)[0]]
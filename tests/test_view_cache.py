@@ -0,0 +1,115 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.page1 import calculate_rarorac_metrics
+from application_pages.scenario_repository import ScenarioRepository
+from application_pages.scenario_store import ScenarioStore
+from application_pages.view_cache import ViewCache, estimate_nbytes
+from tests.test_scenario_store import PARAMS, save_scenarios
+
+
+def test_least_recently_used_views_are_evicted_to_stay_within_the_size_bound():
+    cache = ViewCache(max_bytes=100)
+    for key in "abc":
+        cache.get_or_compute(key, lambda: "x" * 30)
+    # Reading 'a' makes 'b' the least recently used view
+    assert cache.get("a") == "x" * 30
+    cache.get_or_compute("d", lambda: "y" * 30)
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+    stats = cache.stats()
+    assert stats['Entries'] == 3 and stats['Bytes'] == 90 <= stats['Max_Bytes']
+    assert (stats['Misses'], stats['Evictions']) == (4, 1)
+
+    # A view bigger than the whole cache is returned but never stored
+    assert cache.get_or_compute("huge", lambda: "z" * 101) == "z" * 101
+    assert cache.get("huge") is None
+    assert cache.stats()['Entries'] == 3
+
+
+def test_each_key_is_computed_once_until_evicted():
+    cache = ViewCache(max_bytes=1_000)
+    calls = []
+    build = lambda: calls.append(1) or "view"
+    for _ in range(5):
+        assert cache.get_or_compute(("page", 1), build) == "view"
+    assert len(calls) == 1
+    assert cache.stats()['Hits'] == 4
+    cache.clear()
+    assert cache.stats() == {'Entries': 0, 'Bytes': 0, 'Max_Bytes': 1_000, 'Hits': 0, 'Misses': 0, 'Evictions': 0, 'Hit_Rate': 0.0}
+
+
+def test_concurrent_sessions_keep_the_byte_count_consistent():
+    cache = ViewCache(max_bytes=500)
+
+    def session(seed):
+        rng = np.random.default_rng(seed)
+        for key in rng.integers(0, 40, 500):
+            cache.get_or_compute(int(key), lambda: "v" * 25)
+
+    threads = [threading.Thread(target=session, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats['Bytes'] == 25 * stats['Entries'] <= 500
+
+
+def test_size_estimates_cover_arrays_frames_and_containers():
+    array = np.zeros(1_000)
+    frame = pd.DataFrame({'a': array})
+    assert estimate_nbytes(array) == 8_000
+    assert estimate_nbytes(frame) >= 8_000
+    assert estimate_nbytes({'spec': "x" * 500, 'table': frame}) > 8_500
+
+
+def cached_view(cache, store):
+    return cache.get_or_compute(('view',) + store.cache_key, lambda: tuple(store.names()))
+
+
+@pytest.mark.parametrize("backed", [False, True])
+def test_every_change_to_the_store_invalidates_its_views(tmp_path, backed):
+    repository = ScenarioRepository(tmp_path / "scenarios.db") if backed else None
+    store = ScenarioStore(repository)
+    cache = ViewCache()
+    save_scenarios(store, 3)
+    changes = [
+        lambda: store.save("new deal", PARAMS, calculate_rarorac_metrics(**PARAMS)),
+        lambda: store.rename("deal 0", "renamed"),
+        lambda: store.delete("deal 1"),
+        store.clear,
+    ]
+    assert cached_view(cache, store) == ("deal 0", "deal 1", "deal 2")
+    for change in changes:
+        key = store.cache_key
+        change()
+        assert store.cache_key != key
+        assert cached_view(cache, store) == tuple(store.names())
+    assert cached_view(cache, store) == ()
+    if repository is not None:
+        repository.close()
+
+
+def test_sessions_share_views_of_the_same_repository_only(tmp_path):
+    repository = ScenarioRepository(tmp_path / "scenarios.db")
+    first, second = ScenarioStore(repository), ScenarioStore(repository)
+    save_scenarios(first, 2)
+    cache = ViewCache()
+    assert cached_view(cache, first) == cached_view(cache, second) == ("deal 0", "deal 1")
+    assert cache.stats()['Hits'] == 1
+    # A change made through one session invalidates the view for every session
+    second.delete("deal 0")
+    assert cached_view(cache, first) == ("deal 1",)
+    assert cache.stats()['Misses'] == 2
+
+    other = ScenarioRepository(tmp_path / "other.db")
+    in_memory = ScenarioStore()
+    save_scenarios(ScenarioStore(other), 1)
+    save_scenarios(in_memory, 1)
+    assert len({first.cache_key, ScenarioStore(other).cache_key, in_memory.cache_key}) == 3
+    repository.close()
+    other.close()